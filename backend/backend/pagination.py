@@ -1,11 +1,207 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+COUNT_CACHE_TIMEOUT = getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 60)
+MIN_KEY, MAX_KEY = -(2**63), 2**63 - 1
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу (created_at, id) без COUNT(*) и OFFSET.
+
+    Первое поле ``ordering`` - позиция (DateTimeField или аннотация),
+    второе - уникальный ключ для разрешения совпадений.
+    """
+
+    ordering = ("-created_at", "id")
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_queryset = queryset
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor[2]
+
+        ordering = self._ordering(reverse)
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self._after(ordering, cursor))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.get_count(),
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def get_count(self):
+        """Количество объектов только по запросу: ?count=cached|estimated"""
+        mode = self.request.query_params.get(self.count_query_param)
+        if mode == "estimated":
+            estimate = self._estimated_count(self.base_queryset)
+            if estimate is not None:
+                return estimate
+        if mode in ("cached", "estimated"):
+            return self._cached_count(self.base_queryset)
+        return None
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii"))
+            position, pk, reverse = json.loads(raw)
+            position = parse_datetime(position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # Курсор приходит от клиента: ключ - целое в пределах bigint,
+        # позиция - время с часовым поясом, как при кодировании
+        if (
+            position is None
+            or is_naive(position)
+            or type(pk) is not int
+            or not MIN_KEY <= pk <= MAX_KEY
+            or reverse not in (0, 1)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, pk, bool(reverse)
+
+    def encode_cursor(self, obj, reverse):
+        position_field, key_field = (
+            field.lstrip("-") for field in self.ordering
+        )
+        raw = json.dumps(
+            [
+                getattr(obj, position_field).isoformat(),
+                getattr(obj, key_field),
+                int(reverse),
+            ]
+        )
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def _ordering(self, reverse):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    def _after(self, ordering, cursor):
+        """Условие "строго после курсора" для заданного направления"""
+        position, pk, _ = cursor
+        position_field, key_field = ordering
+        position_lookup = "lt" if position_field.startswith("-") else "gt"
+        key_lookup = "lt" if key_field.startswith("-") else "gt"
+        position_field = position_field.lstrip("-")
+        key_field = key_field.lstrip("-")
+        return Q(**{f"{position_field}__{position_lookup}": position}) | Q(
+            **{position_field: position, f"{key_field}__{key_lookup}": pk}
+        )
+
+    def _link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(obj, reverse)
+        )
+
+    def _cached_count(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        key = (
+            "pagination-count:"
+            + hashlib.md5(repr((sql, params)).encode("utf-8")).hexdigest()
+        )
+        return cache.get_or_set(key, queryset.count, COUNT_CACHE_TIMEOUT)
+
+    def _estimated_count(self, queryset):
+        """Оценка числа строк планировщиком PostgreSQL"""
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]["Plan Rows"]
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size_query_param = "limit"
+    # Класс постраничного вывода по ключу; включается параметром ?cursor=
+    keyset_class = None
+    keyset = None
+    # Параметры, задающие свой порядок (релевантность поиска): с ними
+    # курсор не применяется, страницы нумеруются
+    ordering_query_params = ()
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return (
+            self.keyset_class is not None
+            and KeysetPagination.cursor_query_param in params
+            and not any(
+                params.get(name, "").strip()
+                for name in self.ordering_query_params
+            )
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class(self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
         return Response(
             {
                 "count": self.page.paginator.count,
@@ -14,3 +210,16 @@ class CustomPageNumberPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class SubscriptionKeysetPagination(KeysetPagination):
+    ordering = ("-subscribed_at", "id")
+
+
+class RecipePagination(CustomPageNumberPagination):
+    keyset_class = KeysetPagination
+    ordering_query_params = ("search",)
+
+
+class SubscriptionPagination(CustomPageNumberPagination):
+    keyset_class = SubscriptionKeysetPagination
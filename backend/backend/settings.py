@@ -4,6 +4,7 @@
 статические файлы, аутентификацию и другие параметры.
 """
 
+import copy
 import hashlib
 import os
 from pathlib import Path
@@ -61,7 +62,9 @@ INSTALLED_APPS = [
 
 # Промежуточное ПО (middleware)
 MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.db_router.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -116,6 +119,49 @@ else:
         }
     }
 
+# Соединения с БД. По умолчанию соединение живет DB_CONN_MAX_AGE секунд
+# между запросами и проверяется перед повторным использованием. Режим пула
+# (DB_POOL=1, только PostgreSQL и psycopg 3) выдает соединения из пула
+# psycopg_pool; постоянные соединения Django в нем отключаются
+DB_POOL = os.environ.get("DB_POOL", "0") == "1"
+if DB_POOL and DATABASES["default"]["ENGINE"].endswith("postgresql"):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+        # Сколько ждать свободного соединения, в секундах
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "3600")),
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("DB_CONN_MAX_AGE", "60")
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = (
+        os.environ.get("DB_CONN_HEALTH_CHECKS", "1") != "0"
+    )
+
+# Реплика для чтения: DB_REPLICA_HOST (PostgreSQL) и/или DB_REPLICA_NAME
+# (имя БД или файл SQLite, например копия db.sqlite3 для локальной
+# проверки). Безопасные запросы читают с реплики, клиент после записи
+# читает из основной БД DB_PRIMARY_STICKINESS секунд
+DB_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+DB_REPLICA_NAME = os.environ.get("DB_REPLICA_NAME")
+if DB_REPLICA_HOST or DB_REPLICA_NAME:
+    DATABASES["replica"] = copy.deepcopy(DATABASES["default"])
+    if DB_REPLICA_HOST:
+        DATABASES["replica"]["HOST"] = DB_REPLICA_HOST
+        DATABASES["replica"]["PORT"] = os.getenv(
+            "DB_REPLICA_PORT", DATABASES["default"]["PORT"]
+        )
+    if DB_REPLICA_NAME:
+        DATABASES["replica"]["NAME"] = DB_REPLICA_NAME
+    # В тестах реплика - та же БД, что и основная
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+DB_PRIMARY_STICKINESS = int(os.environ.get("DB_PRIMARY_STICKINESS", "10"))
+
 # Валидаторы паролей
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -155,19 +201,34 @@ else:
     MEDIA_URL = "/media/"
     MEDIA_ROOT = STATIC_ROOT / "media"
 
+# Количество потоков для создания миниатюр и WebP/AVIF-вариантов изображений
+IMAGE_DERIVATIVE_WORKERS = int(os.environ.get("IMAGE_DERIVATIVE_WORKERS", "2"))
+
 # Настройка автоматического поля ID для моделей
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Пользовательская модель
 AUTH_USER_MODEL = "user.User"
 
+# Наибольший размер тела запроса, совпадает с client_max_body_size в
+# gateway/nginx.conf и infra/nginx.conf
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(
+    os.environ.get("DATA_UPLOAD_MAX_MEMORY_SIZE", str(10 * 1024 * 1024))
+)
+
+# Размер одного рецепта в POST /api/recipes/bulk/ (JSON с изображением в
+# base64): наибольший пакет - DATA_UPLOAD_MAX_MEMORY_SIZE // этот размер
+RECIPE_BULK_ITEM_SIZE = int(
+    os.environ.get("RECIPE_BULK_ITEM_SIZE", str(200 * 1024))
+)
+
 # Настройки REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "core.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "backend.pagination.CustomPageNumberPagination",
     "PAGE_SIZE": 10,
@@ -176,6 +237,77 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Кэш: по умолчанию в памяти процесса, общий Redis при указании REDIS_URL
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Кэш ответов для анонимных GET-запросов рецептов и пользователей. По
+# умолчанию включен только с Redis (см. core.caches.is_shared)
+RESPONSE_CACHE_ENABLED = (
+    os.environ.get("RESPONSE_CACHE_ENABLED", "1" if REDIS_URL else "0") != "0"
+)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Разрешение коротких ссылок: размер и время жизни LRU процесса и время
+# жизни в кэше
+SHORT_LINK_LRU_SIZE = int(os.environ.get("SHORT_LINK_LRU_SIZE", "10000"))
+SHORT_LINK_LRU_TTL = float(os.environ.get("SHORT_LINK_LRU_TTL", "60"))
+SHORT_LINK_CACHE_TIMEOUT = int(
+    os.environ.get("SHORT_LINK_CACHE_TIMEOUT", str(60 * 60 * 24 * 7))
+)
+
+# Кэш пользователей по токену: размер и время жизни LRU процесса и время
+# жизни в кэше Django (только общем, см. core.caches.is_shared)
+AUTH_TOKEN_LRU_SIZE = int(os.environ.get("AUTH_TOKEN_LRU_SIZE", "10000"))
+AUTH_TOKEN_LRU_TTL = float(os.environ.get("AUTH_TOKEN_LRU_TTL", "5"))
+AUTH_TOKEN_CACHE_TIMEOUT = int(
+    os.environ.get("AUTH_TOKEN_CACHE_TIMEOUT", str(60 * 10))
+)
+
+# Метрики запросов API (/api/metrics/): как часто сохранять гистограммы
+# процесса в кэш Django (общий для процессов с REDIS_URL) и сколько
+# хранить данные остановленных процессов.
+# METRICS_TOKEN - токен сборщика (Authorization: Bearer <токен>)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "10"))
+METRICS_RETENTION = int(os.environ.get("METRICS_RETENTION", str(60 * 60)))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Асинхронные обработчики чтения рецептов, ингредиентов и профилей
+# (имеет смысл при запуске под ASGI: backend.asgi)
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "0") == "1"
+
+# Время жизни закэшированного количества объектов при постраничном
+# выводе по курсору (?cursor=&count=cached), в секундах
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.environ.get("PAGINATION_COUNT_CACHE_TIMEOUT", "60")
+)
+
+# Время жизни кэша выгруженного списка покупок, в секундах.
+# Кэш также сбрасывается при изменении корзины пользователя
+SHOPPING_LIST_CACHE_TIMEOUT = int(
+    os.environ.get("SHOPPING_LIST_CACHE_TIMEOUT", str(60 * 60 * 24))
+)
+
+# Поисковый индекс ингредиентов в памяти процесса: как часто сверять
+# его версию с базой данных (в секундах) и лимит нечеткого поиска
+INGREDIENT_INDEX_CHECK_INTERVAL = float(
+    os.environ.get("INGREDIENT_INDEX_CHECK_INTERVAL", "5")
+)
+INGREDIENT_FUZZY_LIMIT = 10
+
 # Настройки Djoser (для работы с пользователями API)
 DJOSER = {
     "LOGIN_FIELD": "email",
@@ -8,16 +8,22 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 from rest_framework.routers import DefaultRouter
 
+from core.async_api import read_dispatch
+from core.views import short_link_redirect
+from ingredient.async_views import ingredient_list
 from ingredient.views import IngredientViewSet
+from recipe.async_views import recipe_detail, recipe_list
 from recipe.views import RecipeViewSet
+from user.async_views import user_detail
 from user.views import CustomUserViewSet, UserAvatarView
-from .views import health
+
+from .views import cache_stats, db_stats, health, metrics
 
 # Создаем роутер Django REST Framework для автоматического создания URL-ов
 маршрутизатор = DefaultRouter()
@@ -49,8 +55,17 @@ from .views import health
     path("api/", include(маршрутизатор.urls)),
     path("api/auth/", include("djoser.urls.authtoken")),
     path("api/users/me/avatar/", UserAvatarView.as_view(), name="user-avatar"),
+    # Короткие ссылки на рецепты
+    re_path(
+        r"^s/(?P<code>[0-9A-Za-z]+)/?$",
+        short_link_redirect,
+        name="short-link",
+    ),
     # Эндпоинты для проверки работоспособности сервера
     path("api/health/", health, name="health-check"),
+    path("api/cache-stats/", cache_stats, name="cache-stats"),
+    path("api/db-stats/", db_stats, name="db-stats"),
+    path("api/metrics/", metrics, name="metrics"),
     # Документация API
     path(
         "swagger/",
@@ -69,6 +84,58 @@ from .views import health
     ),
 ]
 
+# Асинхронные GET-обработчики для запуска под ASGI; остальные методы
+# этих адресов обслуживают те же ViewSet-ы DRF. Имена маршрутов совпадают
+# с именами DRF: метрики конечных точек не зависят от режима
+if settings.ASYNC_READ_VIEWS:
+    маршруты = [
+        re_path(
+            r"^api/recipes/$",
+            read_dispatch(
+                recipe_list,
+                RecipeViewSet.as_view({"get": "list", "post": "create"}),
+            ),
+            name="recipes-list",
+        ),
+        re_path(
+            r"^api/recipes/(?P<pk>[0-9]+)/$",
+            read_dispatch(
+                recipe_detail,
+                RecipeViewSet.as_view(
+                    {
+                        "get": "retrieve",
+                        "put": "update",
+                        "patch": "partial_update",
+                        "delete": "destroy",
+                    }
+                ),
+            ),
+            name="recipes-detail",
+        ),
+        re_path(
+            r"^api/ingredients/$",
+            read_dispatch(
+                ingredient_list, IngredientViewSet.as_view({"get": "list"})
+            ),
+            name="ingredients-list",
+        ),
+        re_path(
+            r"^api/users/(?P<id>[0-9]+)/$",
+            read_dispatch(
+                user_detail,
+                CustomUserViewSet.as_view(
+                    {
+                        "get": "retrieve",
+                        "put": "update",
+                        "patch": "partial_update",
+                        "delete": "destroy",
+                    }
+                ),
+            ),
+            name="users-detail",
+        ),
+    ] + маршруты
+
 # Присваиваем маршруты переменной urlpatterns, которая используется Django
 urlpatterns = маршруты
 
@@ -1,7 +1,55 @@
 from http import HTTPStatus
 
+from django.db import connections
 from django.http.response import HttpResponse
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from core import metrics as request_metrics
+from core import response_cache
+from core.permissions import HasMetricsToken
 
 
 def health(request):
     return HttpResponse("Healthy", status=HTTPStatus.OK)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def cache_stats(request):
+    """Счетчики попаданий и промахов кэша ответов"""
+    return Response(response_cache.stats())
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def db_stats(request):
+    """Режим соединений с БД и статистика пула текущего процесса"""
+    data = {}
+    for connection in connections.all():
+        settings_dict = connection.settings_dict
+        if settings_dict["OPTIONS"].get("pool"):
+            data[connection.alias] = {
+                "mode": "pool",
+                "pool": connection.pool.get_stats(),
+            }
+        else:
+            # CONN_MAX_AGE=None - соединение без ограничения времени жизни
+            max_age = settings_dict["CONN_MAX_AGE"]
+            data[connection.alias] = {
+                "mode": "new" if max_age == 0 else "persistent",
+                "conn_max_age": max_age,
+                "health_checks": settings_dict["CONN_HEALTH_CHECKS"],
+            }
+    return Response(data)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser | HasMetricsToken])
+def metrics(request):
+    """Гистограммы запросов API в текстовом формате Prometheus"""
+    return HttpResponse(
+        request_metrics.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
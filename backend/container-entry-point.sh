@@ -26,7 +26,7 @@ fi
 
 # Load ingredients data
 echo "Loading ingredients data..."
-python3 load_ingredients.py && echo "✅ Ingredients loaded successfully" || echo "❌ Error loading ingredients"
+python3 manage.py load_ingredients && echo "✅ Ingredients loaded successfully" || echo "❌ Error loading ingredients"
 
 # Load demo data if requested
 if [[ "${DEMO_DATA}" == "1" ]]; then
@@ -47,5 +47,6 @@ if [ -z "$DEBUG" ] || [ "$DEBUG" -eq 1 ]; then
   python3 manage.py runserver "0:8000"
 else
   echo "Running in production mode..."
-  gunicorn --bind 0.0.0.0:8000 backend.wsgi
+  # Процессы, потоки и класс обработчиков: gunicorn.conf.py и GUNICORN_*
+  exec gunicorn --config gunicorn.conf.py
 fi
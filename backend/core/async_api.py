@@ -0,0 +1,172 @@
+"""
+Асинхронные обработчики чтения для запуска под ASGI.
+
+Горячие GET-запросы (список и карточка рецепта, поиск ингредиентов,
+профиль пользователя) обслуживаются асинхронным ORM и не занимают поток
+на время ожидания БД. Ответы совпадают с ответами DRF, включая ETag и
+304 (ConditionalGetMixin) и кэш ответов анонимным пользователям
+(AnonymousResponseCacheMixin): валидаторы и версии вычисляет тот же
+ViewSet. Остальные методы и параметры, которые здесь не поддерживаются
+(?cursor=), передаются синхронным представлениям DRF. Включается
+настройкой ASYNC_READ_VIEWS.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .authentication import aget_token_user
+from .conditional import ConditionalGetMixin, not_modified, set_validators
+from .response_cache import AnonymousResponseCacheMixin
+
+READ_METHODS = ("GET", "HEAD")
+
+
+class AuthenticationFailed(Exception):
+    pass
+
+
+async def authenticate(request):
+    """Аутентификация по заголовку Authorization: Token <ключ>"""
+    keyword, _, key = request.headers.get("Authorization", "").partition(" ")
+    if keyword != "Token":
+        return AnonymousUser()
+    user = await aget_token_user(key.strip())
+    if user is None:
+        raise AuthenticationFailed("Invalid token.")
+    if not user.is_active:
+        raise AuthenticationFailed("User inactive or deleted.")
+    return user
+
+
+def json_response(data, status=200):
+    """JSON как у DRF: без экранирования не-ASCII символов"""
+    response = JsonResponse(
+        data,
+        status=status,
+        safe=False,
+        json_dumps_params={"ensure_ascii": False},
+    )
+    # Данные для кэша ответов, как Response.data в DRF
+    response.data = data
+    return response
+
+
+def error_response(detail, status):
+    return json_response({"detail": detail}, status=status)
+
+
+async def paginate(request, queryset):
+    """
+    Страница queryset в формате CustomPageNumberPagination.
+    Возвращает (объекты страницы, функция сборки ответа) или None, если
+    номер страницы неверен.
+    """
+    try:
+        page_size = int(request.GET["limit"])
+    except (KeyError, ValueError):
+        page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+    if page_size <= 0:
+        page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        return None
+    if page < 1:
+        return None
+
+    count = await queryset.acount()
+    start = (page - 1) * page_size
+    if start and start >= count:
+        return None
+    items = [item async for item in queryset[start : start + page_size]]
+
+    url = request.build_absolute_uri()
+    next_link = (
+        replace_query_param(url, "page", page + 1)
+        if start + page_size < count
+        else None
+    )
+    if page == 1:
+        previous_link = None
+    elif page == 2:
+        previous_link = remove_query_param(url, "page")
+    else:
+        previous_link = replace_query_param(url, "page", page - 1)
+
+    def build(results):
+        return {
+            "count": count,
+            "next": next_link,
+            "previous": previous_link,
+            "results": results,
+        }
+
+    return items, build
+
+
+async def _cached(view, handler, request, **kwargs):
+    if not isinstance(view, AnonymousResponseCacheMixin):
+        return await handler(request, **kwargs)
+    key, entry, versions = await sync_to_async(view.cache_lookup)(request)
+    if key is None:
+        return await handler(request, **kwargs)
+    if entry is not None:
+        response = json_response(entry["data"], status=entry["status"])
+        response["X-Cache"] = "HIT"
+        return response
+
+    response = await handler(request, **kwargs)
+    response["X-Cache"] = "MISS"
+    if response.status_code == 200:
+        await sync_to_async(view.cache_store)(key, versions, response.data)
+    return response
+
+
+async def view_response(viewset, action, handler, request, **kwargs):
+    """
+    Ответ async-обработчика handler с валидаторами и кэшем ответов
+    действия action ViewSet-а, как у синхронных list/retrieve
+    """
+    view = viewset(
+        action=action,
+        args=(),
+        kwargs=kwargs,
+        request=request,
+        format_kwarg=None,
+    )
+    validators = None
+    if isinstance(view, ConditionalGetMixin):
+        validators = await sync_to_async(view.get_validators)(request)
+    if validators is None:
+        return await _cached(view, handler, request, **kwargs)
+    response = not_modified(request, validators)
+    if response is None:
+        response = await _cached(view, handler, request, **kwargs)
+    return set_validators(response, validators)
+
+
+def read_dispatch(async_view, sync_view):
+    """
+    GET и HEAD обслуживает async_view, остальные методы - sync_view.
+    async_view может вернуть None, чтобы передать запрос sync_view.
+    """
+    sync_handler = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            try:
+                response = await async_view(request, *args, **kwargs)
+            except AuthenticationFailed as error:
+                response = error_response(str(error), 401)
+                response["WWW-Authenticate"] = "Token"
+                return response
+            if response is not None:
+                return response
+        return await sync_handler(request, *args, **kwargs)
+
+    # CSRF проверяет DRF для сессионной аутентификации
+    view.csrf_exempt = True
+    return view
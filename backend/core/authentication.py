@@ -0,0 +1,113 @@
+"""
+Аутентификация по токену с кэшированием пользователя.
+
+Пользователь по ключу токена ищется в LRU процесса (короткое время
+жизни AUTH_TOKEN_LRU_TTL), затем в кэше Django и только потом в БД.
+Записи удаляются при выходе (удалении токена), а также при любом
+сохранении пользователя: смене пароля, деактивации, изменении профиля,
+а также при изменении его счетчиков (core.counters). Закэшированный
+экземпляр может отставать по счетчикам и вариантам аватара, поэтому
+полное save() эти поля не перезаписывает (User.UPDATE_ONLY_FIELDS).
+LRU других процессов отстает от кэша не дольше AUTH_TOKEN_LRU_TTL.
+Кэш Django используется, только если он общий (core.caches.is_shared),
+иначе отозванный токен действовал бы до AUTH_TOKEN_CACHE_TIMEOUT.
+"""
+
+import copy
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .caches import is_shared
+from .lru import LRUCache
+
+_users = LRUCache(settings.AUTH_TOKEN_LRU_SIZE, settings.AUTH_TOKEN_LRU_TTL)
+
+
+def _cache_key(key):
+    # Ключ токена не хранится в кэше в открытом виде
+    return f"auth-token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def _remember(cache_key, user):
+    _users.set(cache_key, user)
+    # Каждый запрос получает свою копию: представления меняют request.user
+    return copy.copy(user)
+
+
+def get_token_user(key):
+    """Пользователь по ключу токена или None"""
+    cache_key = _cache_key(key)
+    user = _users.get(cache_key)
+    if user is not None:
+        return copy.copy(user)
+    shared = is_shared()
+    user = cache.get(cache_key) if shared else None
+    if user is None:
+        token = Token.objects.select_related("user").filter(key=key).first()
+        if token is None:
+            return None
+        user = token.user
+        if shared:
+            cache.set(cache_key, user, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+    return _remember(cache_key, user)
+
+
+async def aget_token_user(key):
+    """Асинхронный вариант get_token_user"""
+    cache_key = _cache_key(key)
+    user = _users.get(cache_key)
+    if user is not None:
+        return copy.copy(user)
+    shared = is_shared()
+    user = await cache.aget(cache_key) if shared else None
+    if user is None:
+        token = (
+            await Token.objects.select_related("user").filter(key=key).afirst()
+        )
+        if token is None:
+            return None
+        user = token.user
+        if shared:
+            await cache.aset(
+                cache_key, user, settings.AUTH_TOKEN_CACHE_TIMEOUT
+            )
+    return _remember(cache_key, user)
+
+
+def forget_token(key):
+    """Удаляет запись после фиксации транзакции"""
+    cache_key = _cache_key(key)
+
+    def forget():
+        _users.delete(cache_key)
+        cache.delete(cache_key)
+
+    transaction.on_commit(forget)
+
+
+def forget_user(user_id):
+    for key in Token.objects.filter(user_id=user_id).values_list(
+        "key", flat=True
+    ):
+        forget_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication без запросов к БД при прогретом кэше"""
+
+    def authenticate_credentials(self, key):
+        user = get_token_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+        return user, Token(key=key, user=user)
@@ -0,0 +1,276 @@
+"""
+Замер конечных точек API на синтетических данных.
+
+Общая часть команды benchmark_endpoints и тестов
+tests/test_endpoint_benchmark.py: набор запросов, замер времени и
+SQL-запросов, проверка бюджетов и сравнение с базовой линией в JSON.
+"""
+
+import base64
+import json
+import statistics
+import time
+from collections import namedtuple
+
+from django.db import connection
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from recipe.models import Recipe
+
+from .datasets import DATA_DIR
+from .images import wait_for_derivatives
+from .metrics import capture_queries
+from .models import FavoriteRecipe, ShoppingCart
+
+SCALES = {
+    "small": {"users": 20, "recipes": 100, "ingredients": 200},
+    "medium": {"users": 200, "recipes": 2000, "ingredients": 1000},
+    "large": {"users": 1000, "recipes": 20000, "ingredients": 2186},
+}
+
+# Наибольшее допустимое количество SQL-запросов на один запрос API.
+# Бюджет не зависит от объема данных: рост числа запросов вместе с
+# данными - признак N+1
+QUERY_BUDGETS = {
+    "recipes-list-anon": 4,
+    "recipes-list-auth": 4,
+    "recipes-detail-anon": 4,
+    "recipes-detail-auth": 4,
+    "ingredients-search": 2,
+    "users-subscriptions": 3,
+    "favorite-add": 4,
+    "favorite-remove": 3,
+    "shopping-cart-add": 4,
+    "shopping-cart-remove": 3,
+    "download-shopping-cart": 3,
+    "recipe-create": 16,
+    "recipe-update": 16,
+}
+
+Case = namedtuple(
+    "Case", "name method path data client status prepare cleanup"
+)
+
+
+class UnexpectedStatus(Exception):
+    pass
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[max(int(len(values) * fraction + 0.5) - 1, 0)]
+
+
+def endpoint_cases():
+    """Запросы к данным, созданным build_dataset"""
+    recipe = Recipe.objects.order_by("pk").first()
+    user = recipe.author
+    target = Recipe.objects.exclude(author=user).order_by("-pk").first()
+    anonymous = Client()
+    authenticated = Client(
+        headers={"Authorization": f"Token {Token.objects.create(user=user)}"}
+    )
+    image = base64.b64encode((DATA_DIR / "user3.png").read_bytes())
+    ingredient_ids = list(
+        recipe.recipe_ingredients.values_list("ingredient_id", flat=True)
+    )
+
+    def payload(index):
+        return {
+            "name": f"Замер {index}",
+            "text": "Описание",
+            "cooking_time": 10 + index % 5,
+            "image": f"data:image/png;base64,{image.decode()}",
+            "ingredients": [
+                {"id": ingredient_id, "amount": 1 + index % 3}
+                for ingredient_id in ingredient_ids
+            ],
+            "tags": list(recipe.tags.values_list("pk", flat=True)),
+        }
+
+    def unlink(model):
+        return lambda index: model.objects.filter(
+            user=user, recipe=target
+        ).delete()
+
+    def link(model):
+        return lambda index: model.objects.get_or_create(
+            user=user, recipe=target
+        )
+
+    def updated(index, response):
+        # Миниатюры создаются в фоне и не должны искажать замеры
+        wait_for_derivatives()
+
+    def delete_created(index, response):
+        updated(index, response)
+        Recipe.objects.filter(pk=response.json()["id"]).delete()
+
+    def get(name, path, client):
+        return Case(name, "get", path, None, client, 200, None, None)
+
+    detail = f"/api/recipes/{recipe.pk}/"
+    favorite = f"/api/recipes/{target.pk}/favorite/"
+    cart = f"/api/recipes/{target.pk}/shopping_cart/"
+    return [
+        get("recipes-list-anon", "/api/recipes/", anonymous),
+        get("recipes-list-auth", "/api/recipes/", authenticated),
+        get("recipes-detail-anon", detail, anonymous),
+        get("recipes-detail-auth", detail, authenticated),
+        get("ingredients-search", "/api/ingredients/?name=са", anonymous),
+        get(
+            "users-subscriptions",
+            "/api/users/subscriptions/?recipes_limit=3",
+            authenticated,
+        ),
+        Case(
+            "favorite-add",
+            "post",
+            favorite,
+            None,
+            authenticated,
+            201,
+            unlink(FavoriteRecipe),
+            None,
+        ),
+        Case(
+            "favorite-remove",
+            "delete",
+            favorite,
+            None,
+            authenticated,
+            204,
+            link(FavoriteRecipe),
+            None,
+        ),
+        Case(
+            "shopping-cart-add",
+            "post",
+            cart,
+            None,
+            authenticated,
+            201,
+            unlink(ShoppingCart),
+            None,
+        ),
+        Case(
+            "shopping-cart-remove",
+            "delete",
+            cart,
+            None,
+            authenticated,
+            204,
+            link(ShoppingCart),
+            None,
+        ),
+        get(
+            "download-shopping-cart",
+            "/api/recipes/download_shopping_cart/",
+            authenticated,
+        ),
+        Case(
+            "recipe-create",
+            "post",
+            "/api/recipes/",
+            payload,
+            authenticated,
+            201,
+            None,
+            delete_created,
+        ),
+        Case(
+            "recipe-update",
+            "patch",
+            detail,
+            payload,
+            authenticated,
+            200,
+            None,
+            updated,
+        ),
+    ]
+
+
+def measure(case, repeat, warmup):
+    """Наибольшее число запросов и повторов SQL, медиана и p95 в мс"""
+    timings = []
+    queries = duplicates = 0
+    for index in range(warmup + repeat):
+        if case.prepare:
+            case.prepare(index)
+        kwargs = {}
+        if case.data:
+            kwargs = {
+                "data": json.dumps(case.data(index)),
+                "content_type": "application/json",
+            }
+        with capture_queries() as metrics:
+            started = time.perf_counter()
+            response = getattr(case.client, case.method)(case.path, **kwargs)
+            duration = time.perf_counter() - started
+        if response.status_code != case.status:
+            raise UnexpectedStatus(
+                f"{case.name}: expected {case.status}, got "
+                f"{response.status_code}: {response.content[:200]!r}"
+            )
+        if case.cleanup:
+            case.cleanup(index, response)
+        if index < warmup:
+            continue
+        timings.append(duration * 1000)
+        queries = max(queries, metrics.queries)
+        duplicates = max(duplicates, metrics.duplicates)
+    return {
+        "queries": queries,
+        "duplicates": duplicates,
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(_percentile(timings, 0.95), 3),
+    }
+
+
+def save_baseline(path, results):
+    path.write_text(
+        json.dumps(
+            {"vendor": connection.vendor, "results": results},
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+
+
+def budget_failures(results):
+    return [
+        f"{scale}/{name}: {row['queries']} queries, budget "
+        f"{QUERY_BUDGETS[name]}"
+        for scale, rows in results.items()
+        for name, row in rows.items()
+        if row["queries"] > QUERY_BUDGETS[name]
+    ]
+
+
+def regressions(baseline, results, threshold, min_delta_ms):
+    """
+    Рост числа запросов, а также медианы и p95 больше чем на threshold
+    (доля) и на min_delta_ms относительно базовой линии
+    """
+    failures = []
+    for scale, rows in results.items():
+        for name, row in rows.items():
+            base = baseline["results"].get(scale, {}).get(name)
+            if base is None:
+                continue
+            if row["queries"] > base["queries"]:
+                failures.append(
+                    f"{scale}/{name}: queries {base['queries']} -> "
+                    f"{row['queries']}"
+                )
+            for metric in ("median_ms", "p95_ms"):
+                limit = base[metric] * (1 + threshold)
+                delta = row[metric] - base[metric]
+                if row[metric] > limit and delta > min_delta_ms:
+                    failures.append(
+                        f"{scale}/{name}: {metric} {base[metric]:.2f} -> "
+                        f"{row[metric]:.2f}"
+                    )
+    return failures
@@ -0,0 +1,21 @@
+"""Проверка, общий ли кэш Django для всех процессов сервиса."""
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Общий ли кэш для процессов (Redis, Memcached, база данных).
+
+    Версии и сбросы, записанные в кэш в памяти процесса, не видны другим
+    процессам gunicorn, поэтому зависящие от них механизмы (версии
+    ответов и корзин, кэш пользователей по токену, закрепление за
+    основной БД) включаются только с общим бэкендом.
+    """
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_BACKENDS
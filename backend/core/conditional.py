@@ -0,0 +1,86 @@
+"""
+Условные GET-запросы (ETag, Last-Modified, 304).
+
+Валидаторы вычисляются без сериализации тела: по версиям из кэша
+ответов (списки рецептов, отношения пользователя) или одним легким
+запросом к БД (updated_at и флаги текущего пользователя). Если клиент
+прислал актуальный валидатор, ответ 304 возвращается до сериализации.
+Валидаторы на основе версий вычисляются только с общим кэшем
+(core.caches.is_shared).
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .response_cache import get_versions
+
+# Поля пользователя в ответе; avatar_variants заполняется фоновой
+# задачей core.images без изменения остальных полей
+USER_FIELDS = (
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "avatar",
+    "avatar_variants",
+)
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def version_parts(names):
+    versions = get_versions(names)
+    return [versions[name] for name in sorted(names)]
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def not_modified(request, validators):
+    """Ответ 304, если валидаторы клиента актуальны, иначе None"""
+    etag, last_modified = validators
+    return get_conditional_response(
+        request, etag=etag, last_modified=_timestamp(last_modified)
+    )
+
+
+def set_validators(response, validators):
+    """Заголовки ETag/Last-Modified для ответов 200 и 304"""
+    if response.status_code not in (200, 304):
+        return response
+    etag, last_modified = validators
+    timestamp = _timestamp(last_modified)
+    if etag:
+        response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    response["Cache-Control"] = "private, no-cache"
+    patch_vary_headers(response, ("Authorization",))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Проверяет If-None-Match / If-Modified-Since до выполнения действия.
+
+    Представление возвращает из get_validators пару (etag, last_modified)
+    или None, если валидаторы вычислить нельзя (тогда ответ обычный).
+    """
+
+    def get_validators(self, request):
+        return None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        validators = self.get_validators(request)
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        response = not_modified(request, validators)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return set_validators(response, validators)
@@ -1 +1,16 @@
 SHORT_LINK_CODE_MAX_LENGTH = 10
+# Если код из id рецепта занят, пробуются коды со случайным суффиксом
+SHORT_LINK_SUFFIX_LENGTH = 4
+SHORT_LINK_CODE_ATTEMPTS = 5
+
+# Производные изображения: (вариант, размер, формат).
+# Миниатюры обрезаются точно по размеру, для размера None изображение
+# только уменьшается до IMAGE_DERIVATIVE_MAX_SIZE с сохранением пропорций
+IMAGE_DERIVATIVES = (
+    ("thumbnail", (320, 320), "JPEG"),
+    ("thumbnail_webp", (320, 320), "WEBP"),
+    ("webp", None, "WEBP"),
+    ("avif", None, "AVIF"),
+)
+IMAGE_DERIVATIVE_MAX_SIZE = (1280, 1280)
+IMAGE_DERIVATIVES_DIR = "derivatives"
@@ -0,0 +1,61 @@
+"""
+Денормализованные счетчики рецептов и пользователей.
+
+COUNTERS описывает, какая таблица связей считается для каждого поля;
+сигналы изменяют счетчики на +1/-1 выражениями F() в транзакции записи,
+команда recount пересчитывает их по этому же описанию.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from recipe.models import Recipe
+from user.models import User
+
+from .authentication import forget_user
+from .models import FavoriteRecipe, ShoppingCart, Subscription
+
+# Модель: {поле счетчика: (модель связи, внешний ключ на модель)}
+COUNTERS = {
+    Recipe: {
+        "favorites_count": (FavoriteRecipe, "recipe"),
+        "in_carts_count": (ShoppingCart, "recipe"),
+    },
+    User: {
+        "recipes_count": (Recipe, "author"),
+        "subscribers_count": (Subscription, "subscribed_to"),
+    },
+}
+
+
+def change_counter(model, pk, field, delta):
+    """Атомарно изменяет счетчик, не опуская его ниже нуля"""
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    queryset.update(**{field: F(field) + delta})
+    if model is User:
+        # Пользователь токена в кэше хранит прежнее значение счетчика
+        forget_user(pk)
+
+
+def change_counters(model, pks, field, delta):
+    """change_counter для нескольких строк одним UPDATE"""
+    queryset = model.objects.filter(pk__in=pks)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def actual_count(related_model, foreign_key):
+    """Подзапрос с фактическим количеством связанных строк"""
+    return Coalesce(
+        Subquery(
+            related_model.objects.filter(**{foreign_key: OuterRef("pk")})
+            .order_by()
+            .values(foreign_key)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
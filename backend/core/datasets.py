@@ -0,0 +1,419 @@
+"""
+Синтетические наборы данных для замеров производительности и нагрузки.
+
+build_dataset наполняет базу пользователями, ингредиентами, тегами,
+рецептами и связями (избранное, корзина, подписки). Случайные значения
+берутся из генератора с заданным seed, поэтому одинаковые параметры дают
+одинаковые данные. Популярность авторов, рецептов и ингредиентов и
+активность пользователей распределены по закону Ципфа: немногие авторы
+пишут большую часть рецептов, немногие рецепты собирают большую часть
+избранного. Строки пишутся пачками bulk_create или, в PostgreSQL,
+потоком COPY; изображения берутся из небольшого пула файлов. Рецепты
+созданы в разное время за последние RECIPE_AGE_DAYS дней, чтобы
+сортировка по created_at (курсорная пагинация, последние рецепты
+авторов) работала как на живых данных. Сигналы при этом не
+срабатывают: счетчики пересчитываются в конце.
+"""
+
+import itertools
+import json
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from ingredient.models import Ingredient
+from ingredient.search import invalidate_index
+from recipe.models import Recipe, RecipeIngredient, Tag
+from user.models import User
+
+from .images import generate_derivatives, get_variants
+from .models import FavoriteRecipe, ShoppingCart, Subscription
+from .response_cache import RECIPES_LIST, bump_versions
+from .response_cache import TAGS as TAGS_CACHE
+
+DATA_DIR = Path(settings.BASE_DIR) / "data"
+PASSWORD = "benchmark-password"
+USERNAME_PREFIX = "dataset_user"
+RECIPE_IMAGES = ("dish1.jpg", "dish2.jpg", "dish3.jpg")
+AVATARS = ("user1.png", "user2.png", "user3.png")
+# Доля пользователей с аватаром
+AVATAR_SHARE = 0.3
+# За сколько дней до генерации разбросаны даты создания рецептов
+RECIPE_AGE_DAYS = 365
+WORDS = (
+    "борщ",
+    "суп",
+    "салат",
+    "пирог",
+    "блины",
+    "каша",
+    "рагу",
+    "плов",
+    "омлет",
+    "запеканка",
+    "курица",
+    "грибы",
+    "сыр",
+    "томаты",
+    "картофель",
+    "рыба",
+    "ягоды",
+    "шоколад",
+)
+TAGS = (
+    ("Завтрак", "breakfast", "#E26C2D"),
+    ("Обед", "lunch", "#49B64E"),
+    ("Ужин", "dinner", "#8775D2"),
+    ("Десерт", "dessert", "#D2A375"),
+    ("Выпечка", "baking", "#C0C0C0"),
+    ("Постное", "lenten", "#2D9CDB"),
+)
+
+
+def _ingredient_rows(count):
+    with open(DATA_DIR / "ingredients.json", encoding="utf-8") as file:
+        rows = [
+            (item["name"], item["measurement_unit"])
+            for item in json.load(file)
+        ]
+    for index in range(count - len(rows)):
+        name, unit = rows[index % len(rows)]
+        rows.append((f"{name} {index // len(rows) + 2}", unit))
+    return rows[:count]
+
+
+def _image_pool(names, directory):
+    """
+    Файлы пула сохраняются один раз и общие для всех объектов: пары
+    (имя файла, значение поля готовых производных)
+    """
+    pool = []
+    for name in names:
+        target = f"{directory}/dataset-{name}"
+        if not default_storage.exists(target):
+            default_storage.save(
+                target, ContentFile((DATA_DIR / name).read_bytes())
+            )
+        generate_derivatives(target)
+        pool.append(
+            (target, {"source": target, "variants": list(get_variants())})
+        )
+    return pool
+
+
+def _zipf_weights(count, skew, rng):
+    """Веса 1/rank**skew, ранги случайно распределены между элементами"""
+    weights = [1 / (rank + 1) ** skew for rank in range(count)]
+    rng.shuffle(weights)
+    return weights
+
+
+def _distinct(rng, population, cum_weights, count):
+    """До count разных элементов с учетом весов"""
+    chosen = {}
+    for _ in range(count * 10):
+        if len(chosen) >= count:
+            break
+        chosen[rng.choices(population, cum_weights=cum_weights)[0]] = None
+    return list(chosen)
+
+
+def _defaults(model, fields):
+    """Значения столбцов, которые COPY не заполнит сам"""
+    now = timezone.now()
+    values = {}
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.attname in fields:
+            continue
+        if getattr(field, "auto_now", False) or getattr(
+            field, "auto_now_add", False
+        ):
+            values[field.attname] = now
+        elif field.has_default():
+            values[field.attname] = field.get_default()
+        else:
+            values[field.attname] = None
+    return values
+
+
+def _copy(model, fields, rows):
+    defaults = _defaults(model, fields)
+    model_fields = [
+        model._meta.get_field(name) for name in (*fields, *defaults)
+    ]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in model_fields)
+    # Значения приводятся к виду БД так же, как при save(): JSON и т. п.
+    prepare = [
+        partial(field.get_db_prep_save, connection=connection)
+        for field in model_fields
+    ]
+    count = 0
+    with connection.cursor() as cursor, cursor.copy(
+        f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN"
+    ) as copy:
+        for row in rows:
+            copy.write_row(
+                [
+                    prep(value)
+                    for prep, value in zip(prepare, (*row, *defaults.values()))
+                ]
+            )
+            count += 1
+    return count
+
+
+@contextmanager
+def _explicit_values(model, fields):
+    """bulk_create не заменяет текущим временем переданные поля auto_now_add"""
+    changed = [
+        field
+        for field in model._meta.concrete_fields
+        if field.attname in fields and getattr(field, "auto_now_add", False)
+    ]
+    for field in changed:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in changed:
+            field.auto_now_add = True
+
+
+def write_rows(model, fields, rows, batch_size=1000, use_copy=False):
+    """
+    Пишет строки-кортежи значений полей fields, возвращает их количество.
+    Генератор строк читается по частям: в памяти не больше одной пачки.
+    """
+    if use_copy:
+        return _copy(model, fields, rows)
+    count = 0
+    rows = iter(rows)
+    with _explicit_values(model, fields):
+        while chunk := list(itertools.islice(rows, batch_size)):
+            model.objects.bulk_create(
+                [model(**dict(zip(fields, row))) for row in chunk],
+                batch_size=batch_size,
+            )
+            count += len(chunk)
+    return count
+
+
+def _ids(model, **filters):
+    return list(
+        model.objects.filter(**filters)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def build_dataset(
+    users,
+    recipes,
+    ingredients,
+    favorites=None,
+    cart_items=None,
+    subscriptions=None,
+    ingredients_per_recipe=(3, 10),
+    skew=1.1,
+    seed=0,
+    batch_size=1000,
+    use_copy=False,
+    log=None,
+):
+    """
+    Наполняет базу; возвращает количество объектов в наборе.
+
+    favorites, cart_items и subscriptions - общее число строк, по
+    умолчанию 10, 5 и 5 на пользователя. Существующие ингредиенты и
+    теги используются повторно. log получает строки о ходе работы.
+    """
+    rng = random.Random(seed)
+    favorites = users * 10 if favorites is None else favorites
+    cart_items = users * 5 if cart_items is None else cart_items
+    subscriptions = users * 5 if subscriptions is None else subscriptions
+    counts = {}
+
+    def step(name, model, fields, rows):
+        started = time.perf_counter()
+        counts[name] = write_rows(model, fields, rows, batch_size, use_copy)
+        if log:
+            log(
+                f"{name}: {counts[name]} rows in "
+                f"{time.perf_counter() - started:.1f} s"
+            )
+
+    password = make_password(PASSWORD)
+    avatars = _image_pool(AVATARS, "users")
+    step(
+        "users",
+        User,
+        (
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "password",
+            "avatar",
+            "avatar_variants",
+        ),
+        (
+            (
+                f"{USERNAME_PREFIX}{index}",
+                f"{USERNAME_PREFIX}{index}@example.com",
+                f"Имя{index}",
+                f"Фамилия{index}",
+                password,
+                *(
+                    rng.choice(avatars)
+                    if rng.random() < AVATAR_SHARE
+                    else (None, {})
+                ),
+            )
+            for index in range(users)
+        ),
+    )
+    user_ids = _ids(User, username__startswith=USERNAME_PREFIX)
+
+    if not Ingredient.objects.exists():
+        step(
+            "ingredients",
+            Ingredient,
+            ("name", "measurement_unit"),
+            _ingredient_rows(ingredients),
+        )
+        invalidate_index()
+    ingredient_ids = _ids(Ingredient)
+    counts["ingredients"] = len(ingredient_ids)
+
+    if not Tag.objects.exists():
+        Tag.objects.bulk_create(
+            Tag(name=name, slug=slug, color=color)
+            for name, slug, color in TAGS
+        )
+    tag_ids = _ids(Tag)
+
+    # Авторы: немногие пишут большую часть рецептов
+    author_weights = list(
+        itertools.accumulate(_zipf_weights(len(user_ids), skew, rng))
+    )
+    images = _image_pool(RECIPE_IMAGES, "recipes")
+    first_recipe_id = (
+        Recipe.objects.order_by("-pk").values_list("pk", flat=True).first()
+        or 0
+    )
+    now = timezone.now()
+    recipe_age = int(timedelta(days=RECIPE_AGE_DAYS).total_seconds())
+    step(
+        "recipes",
+        Recipe,
+        (
+            "name",
+            "text",
+            "cooking_time",
+            "image",
+            "image_variants",
+            "author_id",
+            "created_at",
+        ),
+        (
+            (
+                " ".join(rng.sample(WORDS, 3)).capitalize(),
+                " ".join(rng.choices(WORDS, k=30)),
+                rng.randint(5, 180),
+                *rng.choice(images),
+                rng.choices(user_ids, cum_weights=author_weights)[0],
+                # Целые секунды: на больших объемах есть и совпадения
+                now - timedelta(seconds=rng.randrange(recipe_age)),
+            )
+            for _ in range(recipes)
+        ),
+    )
+    recipe_ids = _ids(Recipe, pk__gt=first_recipe_id)
+
+    ingredient_weights = list(
+        itertools.accumulate(_zipf_weights(len(ingredient_ids), skew, rng))
+    )
+    step(
+        "recipe_ingredients",
+        RecipeIngredient,
+        ("recipe_id", "ingredient_id", "amount"),
+        (
+            (recipe_id, ingredient_id, rng.randint(1, 500))
+            for recipe_id in recipe_ids
+            for ingredient_id in _distinct(
+                rng,
+                ingredient_ids,
+                ingredient_weights,
+                rng.randint(*ingredients_per_recipe),
+            )
+        ),
+    )
+    step(
+        "recipe_tags",
+        Recipe.tags.through,
+        ("recipe_id", "tag_id"),
+        (
+            (recipe_id, tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in rng.sample(tag_ids, rng.randint(1, 3))
+        ),
+    )
+
+    # Популярность рецептов общая для избранного и корзины
+    recipe_weights = list(
+        itertools.accumulate(_zipf_weights(len(recipe_ids), skew, rng))
+    )
+    activity = _zipf_weights(len(user_ids), skew, rng)
+    activity_total = sum(activity)
+
+    def links(total, targets, cum_weights, exclude_self=False):
+        for user_id, weight in zip(user_ids, activity):
+            # Округление со случайным знаком сохраняет ожидаемую сумму
+            count = int(total * weight / activity_total + rng.random())
+            picked = _distinct(
+                rng, targets, cum_weights, min(count, len(targets))
+            )
+            for target_id in picked:
+                if exclude_self and target_id == user_id:
+                    continue
+                yield user_id, target_id
+
+    step(
+        "favorites",
+        FavoriteRecipe,
+        ("user_id", "recipe_id"),
+        links(favorites, recipe_ids, recipe_weights),
+    )
+    step(
+        "cart_items",
+        ShoppingCart,
+        ("user_id", "recipe_id"),
+        links(cart_items, recipe_ids, recipe_weights),
+    )
+    # На популярных авторов и подписываются чаще
+    step(
+        "subscriptions",
+        Subscription,
+        ("user_id", "subscribed_to_id"),
+        links(subscriptions, user_ids, author_weights, exclude_self=True),
+    )
+
+    started = time.perf_counter()
+    call_command("recount", batch_size=batch_size, stdout=StringIO())
+    if log:
+        log(f"counters recounted in {time.perf_counter() - started:.1f} s")
+    bump_versions(RECIPES_LIST, TAGS_CACHE)
+    return counts
@@ -0,0 +1,117 @@
+"""
+Чтение с реплики БД с гарантией чтения своих записей.
+
+ReplicaRoutingMiddleware разрешает чтение с реплики только для безопасных
+запросов (GET, HEAD, OPTIONS). После записи клиент (по заголовку
+Authorization или сессии) на DB_PRIMARY_STICKINESS секунд закрепляется
+за основной БД, чтобы не увидеть устаревших данных из-за отставания
+реплики. Вне запросов (команды, сигналы после фиксации) и после первой
+записи в запросе все чтения идут в основную БД. Закрепление хранится в
+кэше Django, поэтому с репликой нужен общий кэш (core.caches.is_shared).
+"""
+
+import hashlib
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .caches import is_shared
+
+REPLICA = "replica"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Токены и сессии читаются из основной БД: только что выданный токен
+# может еще не дойти до реплики
+PRIMARY_APP_LABELS = ("authtoken", "sessions")
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _use_replica.get()
+            and model._meta.app_label not in PRIMARY_APP_LABELS
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Дальнейшие чтения этого запроса должны видеть запись
+        _use_replica.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика содержит те же данные, что и основная БД
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _sticky_key(request):
+    identity = request.headers.get("Authorization") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not identity:
+        return None
+    digest = hashlib.md5(identity.encode()).hexdigest()
+    return f"db-primary:{digest}"
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = REPLICA in settings.DATABASES
+        if self.enabled and not is_shared():
+            raise ImproperlyConfigured(
+                "A read replica requires a shared cache: set REDIS_URL so "
+                "primary stickiness reaches every worker"
+            )
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        key = _sticky_key(request)
+        if request.method in SAFE_METHODS:
+            use_replica = key is None or not cache.get(key)
+        else:
+            use_replica = False
+        token = _use_replica.set(use_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        if key and request.method not in SAFE_METHODS:
+            cache.set(key, True, settings.DB_PRIMARY_STICKINESS)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        key = _sticky_key(request)
+        if request.method in SAFE_METHODS:
+            use_replica = key is None or not await cache.aget(key)
+        else:
+            use_replica = False
+        token = _use_replica.set(use_replica)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        if key and request.method not in SAFE_METHODS:
+            await cache.aset(key, True, settings.DB_PRIMARY_STICKINESS)
+        return response
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from .images import derivative_urls, variants_field
+
+
+class ImageVariantsField(serializers.Field):
+    """URL миниатюр и WebP/AVIF-вариантов изображения"""
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        super().__init__(source="*", read_only=True, **kwargs)
+
+    def to_representation(self, instance):
+        urls = derivative_urls(
+            getattr(instance, self.image_field),
+            getattr(instance, variants_field(self.image_field)),
+        )
+        request = self.context.get("request")
+        if request is None:
+            return urls
+        return {
+            variant: request.build_absolute_uri(url)
+            for variant, url in urls.items()
+        }
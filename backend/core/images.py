@@ -0,0 +1,161 @@
+"""
+Производные изображения (миниатюры, WebP, AVIF) для рецептов и аватаров.
+
+Оригинал сохраняется как есть, производные создаются в пуле потоков
+после фиксации транзакции и складываются рядом с оригиналом в каталог
+``derivatives/``. Имена производных вычисляются из имени оригинала,
+поэтому повторный запуск пропускает уже созданные файлы.
+
+Готовые варианты записываются в поле ``<поле>_variants`` модели вместе
+с именем оригинала, и сериализаторы строят URL без обращений к
+хранилищу. После записи отправляется сигнал derivatives_ready, по
+которому сбрасываются версии кэша ответов.
+"""
+
+import functools
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps, features
+
+from .constants import (
+    IMAGE_DERIVATIVE_MAX_SIZE,
+    IMAGE_DERIVATIVES,
+    IMAGE_DERIVATIVES_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+# Отправитель - модель, аргументы: pk
+derivatives_ready = Signal()
+
+_executor = None
+
+
+@functools.cache
+def get_variants():
+    """Доступные варианты: AVIF только если Pillow собран с libavif"""
+    return {
+        name: (size, image_format)
+        for name, size, image_format in IMAGE_DERIVATIVES
+        if image_format != "AVIF" or features.check("avif")
+    }
+
+
+def derivative_name(name, variant):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    _, image_format = get_variants()[variant]
+    extension = "jpg" if image_format == "JPEG" else image_format.lower()
+    if variant != extension:
+        stem = f"{stem}.{variant}"
+    filename = f"{stem}.{extension}"
+    return posixpath.join(directory, IMAGE_DERIVATIVES_DIR, filename)
+
+
+def variants_field(field_name):
+    return f"{field_name}_variants"
+
+
+def derivative_urls(field_file, ready, storage=default_storage):
+    """URL производных, отмеченных готовыми для текущего оригинала"""
+    if not field_file or not ready or ready["source"] != field_file.name:
+        return {}
+    return {
+        variant: storage.url(derivative_name(field_file.name, variant))
+        for variant in ready["variants"]
+        if variant in get_variants()
+    }
+
+
+def record_derivatives(model, pk, field_name, name):
+    """Отмечает производные готовыми, если оригинал не сменился"""
+    ready = {"source": name, "variants": list(get_variants())}
+    updated = (
+        model.objects.filter(pk=pk, **{field_name: name})
+        .exclude(**{variants_field(field_name): ready})
+        .update(**{variants_field(field_name): ready})
+    )
+    if updated:
+        derivatives_ready.send(sender=model, pk=pk)
+    return bool(updated)
+
+
+def generate_derivatives(name, overwrite=False, storage=default_storage):
+    """Создает недостающие производные, возвращает число новых файлов"""
+    missing = {
+        variant: options
+        for variant, options in get_variants().items()
+        if overwrite or not storage.exists(derivative_name(name, variant))
+    }
+    if not missing:
+        return 0
+
+    with storage.open(name, "rb") as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+
+    for variant, (size, image_format) in missing.items():
+        image = original.copy()
+        if size is not None:
+            image = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail(
+                IMAGE_DERIVATIVE_MAX_SIZE, Image.Resampling.LANCZOS
+            )
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, quality=80)
+        target = derivative_name(name, variant)
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(buffer.getvalue()))
+    return len(missing)
+
+
+def _generate_safely(model, pk, field_name, name):
+    close_old_connections()
+    try:
+        generate_derivatives(name)
+        record_derivatives(model, pk, field_name, name)
+    except Exception:
+        logger.exception("Failed to generate derivatives for %s", name)
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+            thread_name_prefix="image-derivatives",
+        )
+    return _executor
+
+
+def wait_for_derivatives():
+    """Дожидается запущенных задач; следующая задача создаст новый пул"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def schedule_derivatives(instance, field_name):
+    """Ставит генерацию в пул потоков после фиксации транзакции"""
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+    args = (type(instance), instance.pk, field_name, field_file.name)
+    transaction.on_commit(
+        lambda: get_executor().submit(_generate_safely, *args)
+    )
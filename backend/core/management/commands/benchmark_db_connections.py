@@ -0,0 +1,129 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+MODES = ("new", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Задержка запроса к API без сети и сериализации: новое соединение "
+        "на каждый запрос, постоянные соединения и пул psycopg"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=MODES,
+            default=list(MODES),
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests per mode",
+        )
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=1,
+            help="Queries per request",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=1,
+            help="Concurrent request threads",
+        )
+        parser.add_argument("--pool-size", type=int, default=4)
+
+    def handle(self, *args, **options):
+        base = connections[DEFAULT_DB_ALIAS].settings_dict
+        postgresql = base["ENGINE"].endswith("postgresql")
+
+        self.stdout.write(
+            f"{'mode':>10} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8} "
+            f"{'rps':>8}"
+        )
+        for mode in options["modes"]:
+            if mode == "pool" and not postgresql:
+                self.stderr.write("pool: skipped, requires PostgreSQL")
+                continue
+            options_dict = {
+                key: value
+                for key, value in base["OPTIONS"].items()
+                if key != "pool"
+            }
+            if mode == "pool":
+                options_dict["pool"] = {
+                    "min_size": options["pool_size"],
+                    "max_size": options["pool_size"],
+                }
+            alias = f"benchmark-{mode}"
+            connections.settings[alias] = {
+                **base,
+                "CONN_MAX_AGE": 60 if mode == "persistent" else 0,
+                "CONN_HEALTH_CHECKS": mode == "persistent",
+                "OPTIONS": options_dict,
+            }
+            try:
+                self._run(mode, alias, options)
+            except (DatabaseError, ImproperlyConfigured) as error:
+                raise CommandError(f"{mode}: {error}") from error
+            finally:
+                self._close(alias)
+
+    def _run(self, mode, alias, options):
+        queries = options["queries"]
+        opened = set()
+
+        def request(_):
+            # Как в обработчике запроса: проверка соединений в начале и в
+            # конце запроса (close_old_connections), между ними - запросы
+            connection = connections[alias]
+            opened.add(connection)
+            started = time.perf_counter()
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                for _ in range(queries):
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+            connection.close_if_unusable_or_obsolete()
+            return time.perf_counter() - started
+
+        # Прогрев: открытие пула и первых соединений не входит в замер
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            list(executor.map(request, range(options["threads"])))
+            started = time.perf_counter()
+            timings = sorted(
+                duration * 1000
+                for duration in executor.map(
+                    request, range(options["requests"])
+                )
+            )
+            elapsed = time.perf_counter() - started
+
+        # Соединения потоков исполнителя закрываются из основного потока
+        for connection in opened:
+            connection.inc_thread_sharing()
+            connection.close()
+            connection.dec_thread_sharing()
+
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+        self.stdout.write(
+            f"{mode:>10} {statistics.median(timings):>8.2f} {p99:>8.2f} "
+            f"{statistics.mean(timings):>8.2f} "
+            f"{len(timings) / elapsed:>8.1f}"
+        )
+
+    def _close(self, alias):
+        connection = connections[alias]
+        if connection.settings_dict["OPTIONS"].get("pool"):
+            connection.close_pool()
+        del connections[alias]
+        del connections.settings[alias]
@@ -0,0 +1,151 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from core.benchmark import (
+    SCALES,
+    UnexpectedStatus,
+    budget_failures,
+    endpoint_cases,
+    measure,
+    regressions,
+    save_baseline,
+)
+from core.datasets import build_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер конечных точек API на синтетических данных разного объема: "
+        "бюджеты SQL-запросов, медиана и p95, сравнение с базовой линией"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales",
+            nargs="+",
+            choices=SCALES,
+            default=["small", "medium"],
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=30,
+            help="Timed requests per endpoint",
+        )
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--save",
+            type=Path,
+            help="Write results as a JSON baseline",
+        )
+        parser.add_argument(
+            "--compare",
+            type=Path,
+            help="Fail on regressions against a JSON baseline",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed relative slowdown of median and p95",
+        )
+        parser.add_argument(
+            "--min-delta-ms",
+            type=float,
+            default=1.0,
+            help="Ignore slowdowns smaller than this, in milliseconds",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = json.loads(options["compare"].read_text())
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read baseline: {error}")
+
+        # Отдельная тестовая БД, кэш и каталог медиа: рабочие данные не
+        # затрагиваются
+        setup_test_environment()
+        old_config = setup_databases(
+            verbosity=0, interactive=False, serialized_aliases=set()
+        )
+        try:
+            with (
+                tempfile.TemporaryDirectory() as media_root,
+                override_settings(
+                    MEDIA_ROOT=media_root,
+                    CACHES={
+                        "default": {
+                            "BACKEND": (
+                                "django.core.cache.backends.locmem.LocMemCache"
+                            ),
+                            "LOCATION": "benchmark-endpoints",
+                        }
+                    },
+                ),
+            ):
+                results = {
+                    scale: self._run_scale(scale, options)
+                    for scale in options["scales"]
+                }
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options["save"]:
+            save_baseline(options["save"], results)
+            self.stdout.write(f"Baseline written to {options['save']}")
+
+        failures = budget_failures(results)
+        if baseline is not None:
+            failures += regressions(
+                baseline,
+                results,
+                options["threshold"],
+                options["min_delta_ms"],
+            )
+        if failures:
+            raise CommandError("\n".join(failures))
+
+    def _run_scale(self, scale, options):
+        call_command("flush", interactive=False, verbosity=0)
+        started = time.perf_counter()
+        counts = build_dataset(**SCALES[scale], seed=options["seed"])
+        self.stdout.write(
+            f"\n{scale}: {counts['recipes']} recipes, {counts['users']} "
+            f"users, {counts['ingredients']} ingredients "
+            f"(built in {time.perf_counter() - started:.1f} s)"
+        )
+        self.stdout.write(
+            f"{'endpoint':<24} {'queries':>7} {'dups':>5} {'median ms':>10} "
+            f"{'p95 ms':>8}"
+        )
+        results = {}
+        for case in endpoint_cases():
+            try:
+                results[case.name] = measure(
+                    case, options["repeat"], options["warmup"]
+                )
+            except UnexpectedStatus as error:
+                raise CommandError(str(error))
+            row = results[case.name]
+            self.stdout.write(
+                f"{case.name:<24} {row['queries']:>7} "
+                f"{row['duplicates']:>5} {row['median_ms']:>10.2f} "
+                f"{row['p95_ms']:>8.2f}"
+            )
+        return results
@@ -0,0 +1,102 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from urllib.parse import quote
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    "/api/recipes/",
+    "/api/recipes/?page=2",
+    "/api/ingredients/?name=са",
+    "/api/users/1/",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочное сравнение развертываний (например, WSGI и ASGI): "
+        "пропускная способность и p99 при растущей конкурентности"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets",
+            nargs="+",
+            help="name=base_url, e.g. wsgi=http://localhost:8000",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Request path, may be repeated (default: hot read paths)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1, 4, 16, 64],
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests per target and concurrency level",
+        )
+        parser.add_argument("--token", help="API token for authenticated runs")
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["targets"]:
+            name, separator, base_url = target.partition("=")
+            if not separator:
+                raise CommandError(f"Expected name=base_url, got {target}")
+            targets.append((name, base_url.rstrip("/")))
+        paths = options["paths"] or DEFAULT_PATHS
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+
+        self.stdout.write(
+            f"{'target':>8} {'conc':>5} {'rps':>8} {'p50 ms':>8} "
+            f"{'p99 ms':>8} {'errors':>6}"
+        )
+        for concurrency in options["concurrency"]:
+            for name, base_url in targets:
+                urls = [
+                    urllib.request.Request(
+                        base_url + quote(path, safe="/?=&"), headers=headers
+                    )
+                    for path in islice(cycle(paths), options["requests"])
+                ]
+                self._run(name, urls, concurrency, options["timeout"])
+
+    def _run(self, name, requests, concurrency, timeout):
+        def fetch(request):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as resp:
+                    resp.read()
+                    ok = resp.status < 500
+            except urllib.error.HTTPError as error:
+                ok = error.code < 500
+            except OSError:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(fetch, requests))
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(duration * 1000 for duration, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+        self.stdout.write(
+            f"{name:>8} {concurrency:>5} {len(results) / elapsed:>8.1f} "
+            f"{statistics.median(timings):>8.1f} {p99:>8.1f} {errors:>6}"
+        )
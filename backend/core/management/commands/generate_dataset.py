@@ -0,0 +1,107 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.datasets import USERNAME_PREFIX, build_dataset
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Наполняет базу синтетическими данными заданного объема с "
+        "воспроизводимым случайным распределением"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--recipes", type=int, default=10000)
+        parser.add_argument(
+            "--ingredients",
+            type=int,
+            default=2186,
+            help="Used only when the ingredient table is empty",
+        )
+        parser.add_argument(
+            "--favorites",
+            type=int,
+            help="Total rows, 10 per user by default",
+        )
+        parser.add_argument(
+            "--cart-items",
+            type=int,
+            help="Total rows, 5 per user by default",
+        )
+        parser.add_argument(
+            "--subscriptions",
+            type=int,
+            help="Total rows, 5 per user by default",
+        )
+        parser.add_argument(
+            "--ingredients-per-recipe",
+            type=int,
+            nargs=2,
+            default=(3, 10),
+            metavar=("MIN", "MAX"),
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of author, recipe and user popularity",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--method",
+            choices=("auto", "bulk", "copy"),
+            default="auto",
+            help="Write with bulk_create or COPY (PostgreSQL only)",
+        )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Delete all data before generating",
+        )
+
+    def handle(self, *args, **options):
+        is_postgresql = connection.vendor == "postgresql"
+        if options["method"] == "copy" and not is_postgresql:
+            raise CommandError("COPY is only available on PostgreSQL")
+        use_copy = options["method"] == "copy" or (
+            options["method"] == "auto" and is_postgresql
+        )
+
+        if options["flush"]:
+            call_command("flush", interactive=False, verbosity=0)
+        elif User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).exists():
+            raise CommandError(
+                "Generated users already exist, use --flush to replace them"
+            )
+
+        started = time.perf_counter()
+        counts = build_dataset(
+            users=options["users"],
+            recipes=options["recipes"],
+            ingredients=options["ingredients"],
+            favorites=options["favorites"],
+            cart_items=options["cart_items"],
+            subscriptions=options["subscriptions"],
+            ingredients_per_recipe=options["ingredients_per_recipe"],
+            skew=options["skew"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            use_copy=use_copy,
+            log=self.stdout.write,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{counts['users']} users, {counts['recipes']} recipes, "
+                f"{counts['favorites']} favorites written with "
+                f"{'COPY' if use_copy else 'bulk_create'} in "
+                f"{time.perf_counter() - started:.1f} s"
+            )
+        )
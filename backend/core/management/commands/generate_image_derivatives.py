@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from core.images import generate_derivatives, record_derivatives
+from recipe.models import Recipe
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = "Создает миниатюры и WebP/AVIF-варианты для загруженных изображений"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of parallel worker threads",
+        )
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Regenerate derivatives that already exist",
+        )
+
+    def handle(self, *args, **options):
+        images = [
+            *(
+                (Recipe, pk, "image", name)
+                for pk, name in Recipe.objects.exclude(image="")
+                .values_list("pk", "image")
+                .iterator()
+            ),
+            *(
+                (User, pk, "avatar", name)
+                for pk, name in User.objects.exclude(avatar="")
+                .exclude(avatar__isnull=True)
+                .values_list("pk", "avatar")
+                .iterator()
+            ),
+        ]
+        overwrite = options["overwrite"]
+        created = failed = 0
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = [
+                (image, pool.submit(generate_derivatives, image[3], overwrite))
+                for image in images
+            ]
+            for image, future in futures:
+                try:
+                    created += future.result()
+                except (OSError, Image.DecompressionBombError) as error:
+                    failed += 1
+                    self.stderr.write(f"{image[3]}: {error}")
+                else:
+                    # Готовность записывается и для уже созданных файлов
+                    record_derivatives(*image)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Images processed: {len(images)}, "
+                f"derivatives created: {created}, failed: {failed}"
+            )
+        )
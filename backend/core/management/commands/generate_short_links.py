@@ -0,0 +1,74 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError
+
+from core.models import ShortLink
+from core.short_links import encode, get_short_code, warm
+from recipe.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Создает короткие ссылки для всех рецептов пакетами"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Also put every code into the Django cache",
+        )
+
+    def handle(self, *args, **options):
+        existing = ShortLink.objects.count()
+        suffixed = 0
+        skipped = []
+        last_pk = 0
+        while True:
+            batch = list(
+                Recipe.objects.filter(pk__gt=last_pk, short_link__isnull=True)
+                .order_by("pk")
+                .values_list("pk", flat=True)[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            ShortLink.objects.bulk_create(
+                (
+                    ShortLink(recipe_id=pk, short_code=encode(pk))
+                    for pk in batch
+                ),
+                ignore_conflicts=True,
+            )
+            # Код из id занят другим рецептом: вставка пропущена молча
+            for pk in Recipe.objects.filter(
+                pk__in=batch, short_link__isnull=True
+            ).values_list("pk", flat=True):
+                try:
+                    get_short_code(pk)
+                except IntegrityError:
+                    skipped.append(pk)
+                else:
+                    suffixed += 1
+
+        created = ShortLink.objects.count() - existing
+
+        if options["warm_cache"]:
+            links = ShortLink.objects.values_list(
+                "short_code", "recipe_id"
+            ).iterator(chunk_size=options["batch_size"])
+            while batch := list(islice(links, options["batch_size"])):
+                warm(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Short links created: {created}, with suffix: {suffixed}"
+            )
+        )
+        if skipped:
+            self.stderr.write(
+                self.style.WARNING(
+                    "Short links not created for recipes: "
+                    + ", ".join(map(str, skipped))
+                )
+            )
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core.counters import COUNTERS, actual_count
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает денормализованные счетчики рецептов и пользователей"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report rows with drifted counters",
+        )
+
+    def handle(self, *args, **options):
+        for model, counters in COUNTERS.items():
+            fixed = self._recount(
+                model, counters, options["batch_size"], options["dry_run"]
+            )
+            action = "drifted" if options["dry_run"] else "fixed"
+            self.stdout.write(f"{model._meta.label}: {fixed} rows {action}")
+
+    def _recount(self, model, counters, batch_size, dry_run):
+        expressions = {
+            field: actual_count(related_model, foreign_key)
+            for field, (related_model, foreign_key) in counters.items()
+        }
+        drifted_filter = Q()
+        for field in counters:
+            drifted_filter |= ~Q(**{field: expressions[field]})
+
+        fixed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                return fixed
+            last_pk = batch[-1]
+
+            with transaction.atomic():
+                drifted = list(
+                    model.objects.filter(pk__in=batch)
+                    .filter(drifted_filter)
+                    .values_list("pk", flat=True)
+                )
+                if drifted and not dry_run:
+                    model.objects.filter(pk__in=drifted).update(**expressions)
+            fixed += len(drifted)
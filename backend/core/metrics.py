@@ -0,0 +1,325 @@
+"""
+Метрики запросов API в формате Prometheus.
+
+MetricsMiddleware для каждого запроса считает через
+connection.execute_wrapper количество SQL-запросов, их суммарное время и
+повторы одного и того же SQL (признак N+1), а также время отрисовки
+ответа DRF (response.render(), без serializer.data) и общее время
+ответа. Значения складываются в гистограммы с меткой конечной точки:
+имя маршрута, например recipes-list или users-subscriptions.
+
+Гистограммы копятся в памяти процесса и раз в METRICS_FLUSH_INTERVAL
+секунд сохраняются в кэш Django. /api/metrics/ отдает ряды каждого
+процесса с меткой process (хост:pid): счетчики ряда только растут, а
+ряды перезапущенного процесса пропадают через METRICS_RETENTION, не
+уменьшая остальные, поэтому rate() и sum() в Prometheus корректны. С
+общим кэшем (Redis) ответ любого процесса содержит ряды всех процессов,
+с кэшем в памяти процесса - только ряды ответившего процесса.
+"""
+
+import os
+import socket
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from . import response_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+PROCESSES_KEY = "metrics:processes"
+
+# Имя: (описание, границы корзин, метки)
+HISTOGRAMS = {
+    "foodgram_request_duration_seconds": (
+        "Request latency",
+        LATENCY_BUCKETS,
+        ("endpoint", "method"),
+    ),
+    "foodgram_db_queries": (
+        "SQL queries per request",
+        QUERY_BUCKETS,
+        ("endpoint",),
+    ),
+    "foodgram_db_duplicate_queries": (
+        "Repeated SQL statements per request (N+1 candidates)",
+        QUERY_BUCKETS,
+        ("endpoint",),
+    ),
+    "foodgram_db_duration_seconds": (
+        "Total SQL time per request",
+        LATENCY_BUCKETS,
+        ("endpoint",),
+    ),
+    "foodgram_render_duration_seconds": (
+        "DRF response render() time per request",
+        LATENCY_BUCKETS,
+        ("endpoint",),
+    ),
+}
+
+
+class Histograms:
+    """Гистограммы процесса: {имя: {значения меток: [корзины, сумма]}}"""
+
+    def __init__(self):
+        self._series = {name: {} for name in HISTOGRAMS}
+        self._lock = threading.Lock()
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        with self._lock:
+            series = self._series[name].setdefault(
+                labels, [0] * (len(buckets) + 2)
+            )
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {labels: list(values) for labels, values in rows.items()}
+                for name, rows in self._series.items()
+            }
+
+
+_histograms = Histograms()
+_process = f"{socket.gethostname()}:{os.getpid()}"
+_flushed_at = 0.0
+
+
+def _process_key(process):
+    return f"metrics:process:{process}"
+
+
+def flush_due():
+    elapsed = time.monotonic() - _flushed_at
+    return elapsed >= settings.METRICS_FLUSH_INTERVAL
+
+
+def flush():
+    """Сохраняет гистограммы процесса в кэш"""
+    global _flushed_at, _process
+    _flushed_at = time.monotonic()
+    # После fork у процесса другой pid
+    _process = f"{socket.gethostname()}:{os.getpid()}"
+    cache.set(
+        _process_key(_process),
+        _histograms.snapshot(),
+        settings.METRICS_RETENTION,
+    )
+    # Список процессов обновляется без блокировки: потерянная при гонке
+    # запись восстановится при следующем сохранении
+    processes = cache.get(PROCESSES_KEY) or {}
+    processes[_process] = time.time()
+    cutoff = time.time() - settings.METRICS_RETENTION
+    processes = {
+        process: seen for process, seen in processes.items() if seen > cutoff
+    }
+    cache.set(PROCESSES_KEY, processes, settings.METRICS_RETENTION)
+
+
+def collect():
+    """Гистограммы всех процессов: {имя: {(процесс, *метки): значения}}"""
+    flush()
+    processes = cache.get(PROCESSES_KEY) or {}
+    keys = {_process_key(process): process for process in processes}
+    series = {name: {} for name in HISTOGRAMS}
+    for key, snapshot in cache.get_many(keys).items():
+        for name, rows in snapshot.items():
+            if name not in series:
+                continue
+            for labels, values in rows.items():
+                series[name][(keys[key], *labels)] = values
+    return series
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    inner = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{inner}}}" if inner else ""
+
+
+def render():
+    """Текстовый формат Prometheus 0.0.4"""
+    lines = []
+    for name, rows in collect().items():
+        description, buckets, label_names = HISTOGRAMS[name]
+        label_names = ("process", *label_names)
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, values in sorted(rows.items()):
+            # Значение учитывается во всех корзинах с границей не меньше
+            # него, поэтому счетчики корзин уже накопительные
+            for bound, count in zip(buckets, values):
+                lines.append(
+                    f"{name}_bucket"
+                    f"{_labels(label_names, labels, [('le', bound)])} "
+                    f"{count}"
+                )
+            lines.append(
+                f"{name}_bucket"
+                f"{_labels(label_names, labels, [('le', '+Inf')])} "
+                f"{values[-2]}"
+            )
+            lines.append(
+                f"{name}_sum{_labels(label_names, labels)} {values[-1]}"
+            )
+            lines.append(
+                f"{name}_count{_labels(label_names, labels)} {values[-2]}"
+            )
+
+    stats = response_cache.stats()
+    for kind in ("hits", "misses"):
+        name = f"foodgram_response_cache_{kind}_total"
+        lines.append(f"# HELP {name} Anonymous response cache {kind}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {stats[kind]}")
+    return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    """Обертка execute_wrapper: счетчики SQL и времени одного запроса"""
+
+    def __init__(self):
+        self.queries = 0
+        self.duplicates = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self._statements = set()
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        if sql in self._statements:
+            self.duplicates += 1
+        else:
+            self._statements.add(sql)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+
+    def render_finished(self, response):
+        self.render_time += time.perf_counter() - self._render_started
+
+
+def _wrap(metrics):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(metrics))
+    return stack
+
+
+@contextmanager
+def capture_queries():
+    """SQL всех соединений текущего потока внутри блока with"""
+    metrics = RequestMetrics()
+    with _wrap(metrics):
+        yield metrics
+
+
+def _endpoint(request):
+    match = request.resolver_match
+    if match is None:
+        return "unresolved"
+    if match.url_name:
+        return match.url_name
+    return f"{match.func.__module__}.{match.func.__name__}"
+
+
+def _record(request, metrics, duration):
+    endpoint = _endpoint(request)
+    _histograms.observe(
+        "foodgram_request_duration_seconds",
+        (endpoint, request.method),
+        duration,
+    )
+    _histograms.observe("foodgram_db_queries", (endpoint,), metrics.queries)
+    _histograms.observe(
+        "foodgram_db_duplicate_queries", (endpoint,), metrics.duplicates
+    )
+    _histograms.observe(
+        "foodgram_db_duration_seconds", (endpoint,), metrics.db_time
+    )
+    _histograms.observe(
+        "foodgram_render_duration_seconds",
+        (endpoint,),
+        metrics.render_time,
+    )
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = request._metrics = RequestMetrics()
+        started = time.perf_counter()
+        with _wrap(metrics):
+            response = self.get_response(request)
+        _record(request, metrics, time.perf_counter() - started)
+        if flush_due():
+            flush()
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        metrics = request._metrics = RequestMetrics()
+        started = time.perf_counter()
+        # Соединения привязаны к потоку: обертки ставятся в потоке, где
+        # асинхронный ORM этого запроса выполняет SQL
+        stack = await sync_to_async(_wrap)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        _record(request, metrics, time.perf_counter() - started)
+        if flush_due():
+            await sync_to_async(flush)()
+        return response
+
+    def process_template_response(self, request, response):
+        # Ответы DRF отрисовываются после этого вызова
+        metrics = getattr(request, "_metrics", None)
+        if metrics is not None:
+            metrics.render_started()
+            response.add_post_render_callback(metrics.render_finished)
+        return response
@@ -1,9 +1,10 @@
 from django.db import models
 
-from .constants import SHORT_LINK_CODE_MAX_LENGTH
 from recipe.models import Recipe
 from user.models import User
 
+from .constants import SHORT_LINK_CODE_MAX_LENGTH
+
 
 class Subscription(models.Model):
     user = models.ForeignKey(
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from rest_framework import permissions
+
+
+class HasMetricsToken(permissions.BasePermission):
+    """
+    Доступ по заголовку Authorization: Bearer <METRICS_TOKEN>
+    для сборщика метрик Prometheus.
+    """
+
+    def has_permission(self, request, view) -> bool:
+        keyword, _, token = request.headers.get("Authorization", "").partition(
+            " "
+        )
+        return bool(
+            settings.METRICS_TOKEN
+            and keyword == "Bearer"
+            and constant_time_compare(token, settings.METRICS_TOKEN)
+        )
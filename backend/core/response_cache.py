@@ -0,0 +1,161 @@
+"""
+Кэш ответов API для анонимных GET-запросов.
+
+Запись в кэше хранит данные ответа и версии ресурсов, от которых они
+зависят (рецепт, автор, теги, поколение списка рецептов). Запись
+считается действительной, только пока все эти версии не изменились;
+версии меняются сигналами после фиксации транзакции записи.
+Версиям нужен общий кэш (core.caches.is_shared), поэтому без REDIS_URL
+кэш ответов по умолчанию выключен.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+RECIPES_LIST = "recipes-list"
+TAGS = "tags"
+HITS_KEY = "response-cache:hits"
+MISSES_KEY = "response-cache:misses"
+
+
+def recipe_version(recipe_id):
+    return f"recipe:{recipe_id}"
+
+
+def user_version(user_id):
+    return f"user:{user_id}"
+
+
+def relations_version(user_id):
+    """Избранное, корзина и подписки пользователя"""
+    return f"relations:{user_id}"
+
+
+def _version_key(name):
+    return f"response-cache-version:{name}"
+
+
+def get_versions(names):
+    keys = {_version_key(name): name for name in names}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_versions(*names):
+    """Сбрасывает версии после фиксации текущей транзакции"""
+    transaction.on_commit(
+        lambda: cache.set_many(
+            {_version_key(name): uuid.uuid4().hex for name in names},
+            timeout=None,
+        )
+    )
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def stats():
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
+
+
+def response_key(request):
+    """Ключ по пути и нормализованной строке запроса"""
+    query = "&".join(
+        f"{name}={value}"
+        for name, values in sorted(request.GET.lists())
+        for value in sorted(values)
+    )
+    digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return f"response-cache:{digest}"
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Кэширует ответы list/retrieve для анонимных пользователей.
+
+    Представление перечисляет версии, от которых зависит ответ:
+    известные по адресу запроса и требующие запроса к БД (например,
+    автор рецепта). Все версии читаются до выполнения запроса.
+    """
+
+    def get_cache_versions(self, request):
+        """Версии, известные по адресу; None - ответ не кэшируется"""
+        return []
+
+    def get_miss_cache_versions(self, request):
+        """Версии, которые ищутся в БД; читаются только при промахе"""
+        return []
+
+    def cache_lookup(self, request):
+        """
+        (ключ, запись, версии) для запроса. Ключ None - ответ не
+        кэшируется; при попадании возвращается запись, при промахе -
+        версии для сохранения ответа.
+        """
+        names = self.get_cache_versions(request)
+        if (
+            not settings.RESPONSE_CACHE_ENABLED
+            or request.user.is_authenticated
+            or names is None
+        ):
+            return None, None, None
+
+        key = response_key(request)
+        entry = cache.get(key)
+        if (
+            entry is not None
+            and get_versions(entry["versions"]) == entry["versions"]
+        ):
+            _count(HITS_KEY)
+            return key, entry, None
+
+        _count(MISSES_KEY)
+        # Версии читаются до запроса к БД: изменение во время выполнения
+        # сделает сохраненную запись недействительной
+        versions = get_versions(
+            [*names, *self.get_miss_cache_versions(request)]
+        )
+        return key, None, versions
+
+    def cache_store(self, key, versions, data):
+        cache.set(
+            key,
+            {"versions": versions, "data": data, "status": 200},
+            settings.RESPONSE_CACHE_TIMEOUT,
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key, entry, versions = self.cache_lookup(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        if entry is not None:
+            response = Response(entry["data"], status=entry["status"])
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        response["X-Cache"] = "MISS"
+        if response.status_code == 200:
+            self.cache_store(key, versions, response.data)
+        return response
@@ -0,0 +1,120 @@
+"""
+Короткие ссылки на рецепты.
+
+Код - запись id рецепта в base62. Если он уже занят другим рецептом
+(код, выданный раньше или заданный в админке), к нему добавляется
+случайный суффикс. Разрешение кода в id рецепта идет через LRU в памяти
+процесса, затем через кэш Django и только потом через БД: при прогретом
+кэше переход по ссылке не обращается к базе данных. LRU других
+процессов отстает от кэша не дольше SHORT_LINK_LRU_TTL.
+"""
+
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError
+
+from recipe.constants import SHORT_LINK_LETTERS
+
+from .constants import (
+    SHORT_LINK_CODE_ATTEMPTS,
+    SHORT_LINK_CODE_MAX_LENGTH,
+    SHORT_LINK_SUFFIX_LENGTH,
+)
+from .lru import LRUCache
+from .models import ShortLink
+
+BASE = len(SHORT_LINK_LETTERS)
+
+
+def encode(recipe_id):
+    code = ""
+    while True:
+        recipe_id, remainder = divmod(recipe_id, BASE)
+        code = SHORT_LINK_LETTERS[remainder] + code
+        if not recipe_id:
+            return code
+
+
+def is_valid_code(code):
+    return 0 < len(code) <= SHORT_LINK_CODE_MAX_LENGTH and all(
+        letter in SHORT_LINK_LETTERS for letter in code
+    )
+
+
+def short_link_path(code):
+    return f"/s/{code}"
+
+
+def _candidates(recipe_id):
+    """Код из id, затем он же со случайными суффиксами"""
+    code = encode(recipe_id)
+    yield code
+    prefix = code[: SHORT_LINK_CODE_MAX_LENGTH - SHORT_LINK_SUFFIX_LENGTH]
+    for _ in range(SHORT_LINK_CODE_ATTEMPTS - 1):
+        yield prefix + "".join(
+            secrets.choice(SHORT_LINK_LETTERS)
+            for _ in range(SHORT_LINK_SUFFIX_LENGTH)
+        )
+
+
+def get_short_code(recipe_id):
+    """
+    Код рецепта; ранее выданный код сохраняется. IntegrityError - все
+    варианты кода заняты другими рецептами.
+    """
+    for attempt, code in enumerate(_candidates(recipe_id), start=1):
+        try:
+            link, _ = ShortLink.objects.get_or_create(
+                recipe_id=recipe_id, defaults={"short_code": code}
+            )
+        except IntegrityError:
+            # get_or_create уже перечитал ссылку рецепта: занят код
+            if attempt == SHORT_LINK_CODE_ATTEMPTS:
+                raise
+        else:
+            return link.short_code
+
+
+_resolved = LRUCache(
+    settings.SHORT_LINK_LRU_SIZE, ttl=settings.SHORT_LINK_LRU_TTL
+)
+
+
+def _cache_key(code):
+    return f"short-link:{code}"
+
+
+def resolve(code):
+    """id рецепта по коду или None"""
+    recipe_id = _resolved.get(code)
+    if recipe_id is not None:
+        return recipe_id
+    recipe_id = cache.get(_cache_key(code))
+    if recipe_id is None:
+        recipe_id = (
+            ShortLink.objects.filter(short_code=code)
+            .values_list("recipe_id", flat=True)
+            .first()
+        )
+        if recipe_id is None:
+            return None
+        cache.set(
+            _cache_key(code), recipe_id, settings.SHORT_LINK_CACHE_TIMEOUT
+        )
+    _resolved.set(code, recipe_id)
+    return recipe_id
+
+
+def warm(links):
+    """Заносит пары (код, id рецепта) в кэш Django"""
+    cache.set_many(
+        {_cache_key(code): recipe_id for code, recipe_id in links},
+        settings.SHORT_LINK_CACHE_TIMEOUT,
+    )
+
+
+def forget(code):
+    _resolved.delete(code)
+    cache.delete(_cache_key(code))
@@ -0,0 +1,171 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from recipe.models import Recipe, RecipeIngredient, Tag
+from recipe.shopping_list import bump_cart_versions, bump_recipe_cart_versions
+from user.models import User
+
+from . import short_links
+from .authentication import forget_token, forget_user
+from .counters import change_counter
+from .images import derivatives_ready, schedule_derivatives
+from .models import FavoriteRecipe, ShoppingCart, ShortLink, Subscription
+from .response_cache import (
+    RECIPES_LIST,
+    TAGS,
+    bump_versions,
+    recipe_version,
+    relations_version,
+    user_version,
+)
+
+
+def _image_saved(instance, field_name, update_fields):
+    if update_fields is not None and field_name not in update_fields:
+        return
+    schedule_derivatives(instance, field_name)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(sender, instance, update_fields=None, **kwargs):
+    _image_saved(instance, "image", update_fields)
+
+
+@receiver(post_save, sender=User)
+def user_avatar_saved(sender, instance, update_fields=None, **kwargs):
+    _image_saved(instance, "avatar", update_fields)
+
+
+@receiver(derivatives_ready, sender=Recipe)
+def recipe_derivatives_ready(sender, pk, **kwargs):
+    bump_versions(recipe_version(pk), RECIPES_LIST)
+
+
+@receiver(derivatives_ready, sender=User)
+def avatar_derivatives_ready(sender, pk, **kwargs):
+    # Обновление без save(): пользователь токена тоже устарел
+    bump_versions(user_version(pk), RECIPES_LIST)
+    forget_user(pk)
+
+
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_changed(sender, instance, **kwargs):
+    bump_cart_versions([instance.user_id])
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_changed(sender, instance, **kwargs):
+    bump_recipe_cart_versions(instance.recipe_id)
+
+
+@receiver(post_save, sender=FavoriteRecipe)
+@receiver(post_delete, sender=FavoriteRecipe)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def user_relations_changed(sender, instance, **kwargs):
+    bump_versions(relations_version(instance.user_id))
+
+
+@receiver(post_save, sender=FavoriteRecipe)
+def favorite_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Recipe, instance.recipe_id, "favorites_count", 1)
+
+
+@receiver(post_delete, sender=FavoriteRecipe)
+def favorite_deleted(sender, instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, "favorites_count", -1)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def shopping_cart_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Recipe, instance.recipe_id, "in_carts_count", 1)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_deleted(sender, instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, "in_carts_count", -1)
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.subscribed_to_id, "subscribers_count", 1)
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    change_counter(User, instance.subscribed_to_id, "subscribers_count", -1)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, "recipes_count", 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    change_counter(User, instance.author_id, "recipes_count", -1)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_changed(sender, instance, **kwargs):
+    bump_versions(recipe_version(instance.id), RECIPES_LIST)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredients_changed(sender, instance, **kwargs):
+    bump_versions(recipe_version(instance.recipe_id), RECIPES_LIST)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        bump_versions(TAGS, RECIPES_LIST)
+    else:
+        bump_versions(recipe_version(instance.id), RECIPES_LIST)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_versions(TAGS, RECIPES_LIST)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login, не влияющий на ответы
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    bump_versions(user_version(instance.id), RECIPES_LIST)
+
+
+@receiver(post_save, sender=User)
+def user_auth_changed(sender, instance, update_fields=None, **kwargs):
+    # Смена пароля, деактивация и профиль: закэшированный пользователь
+    # токена устарел
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    forget_user(instance.id)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    forget_token(instance.key)
+
+
+@receiver(post_delete, sender=ShortLink)
+def short_link_deleted(sender, instance, **kwargs):
+    short_links.forget(instance.short_code)
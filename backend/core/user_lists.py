@@ -0,0 +1,78 @@
+"""
+Добавление рецептов в избранное и корзину одним SQL-оператором.
+
+INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING вставляет только
+существующие рецепты, которых еще нет в списке, и возвращает их id;
+DELETE ... RETURNING возвращает id удаленных. Повторный клик не вызывает
+IntegrityError. Сигналы при этом не отправляются, поэтому счетчики
+рецептов, версии корзины и отношений пользователя обновляются здесь,
+в той же транзакции.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from recipe.models import Recipe
+from recipe.shopping_list import bump_cart_versions
+
+from .counters import COUNTERS, change_counters
+from .models import ShoppingCart
+from .response_cache import bump_versions, relations_version
+
+
+def _counter_field(model):
+    for field, (related_model, _) in COUNTERS[Recipe].items():
+        if related_model is model:
+            return field
+    return None
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+@transaction.atomic
+def add_recipes(model, user_id, recipe_ids):
+    """Добавляет рецепты в список, возвращает id добавленных"""
+    recipe_ids = list(dict.fromkeys(recipe_ids))
+    table = model._meta.db_table
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (user_id, recipe_id, created_at) "
+            f"SELECT %s, id, %s FROM {Recipe._meta.db_table} "
+            f"WHERE id IN ({_placeholders(recipe_ids)}) "
+            "ON CONFLICT (user_id, recipe_id) DO NOTHING "
+            "RETURNING recipe_id",
+            [user_id, now, *recipe_ids],
+        )
+        added = [row[0] for row in cursor.fetchall()]
+    _changed(model, user_id, added, 1)
+    return added
+
+
+@transaction.atomic
+def remove_recipes(model, user_id, recipe_ids):
+    """Удаляет рецепты из списка, возвращает id удаленных"""
+    recipe_ids = list(dict.fromkeys(recipe_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {model._meta.db_table} WHERE user_id = %s "
+            f"AND recipe_id IN ({_placeholders(recipe_ids)}) "
+            "RETURNING recipe_id",
+            [user_id, *recipe_ids],
+        )
+        removed = [row[0] for row in cursor.fetchall()]
+    _changed(model, user_id, removed, -1)
+    return removed
+
+
+def _changed(model, user_id, recipe_ids, delta):
+    if not recipe_ids:
+        return
+    bump_versions(relations_version(user_id))
+    field = _counter_field(model)
+    if field:
+        change_counters(Recipe, recipe_ids, field, delta)
+    if model is ShoppingCart:
+        bump_cart_versions([user_id])
@@ -0,0 +1,11 @@
+from django.http import Http404, HttpResponseRedirect
+
+from .short_links import is_valid_code, resolve
+
+
+def short_link_redirect(request, code):
+    """Переход по короткой ссылке на страницу рецепта, без DRF"""
+    recipe_id = resolve(code) if is_valid_code(code) else None
+    if recipe_id is None:
+        raise Http404("Short link not found")
+    return HttpResponseRedirect(f"/recipes/{recipe_id}/")
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 import os
 import sys
-import django
 from pathlib import Path
+
+import django
 from django.core.files import File
 
 # Setup Django environment
@@ -11,8 +12,9 @@ django.setup()
 
 # Import models after Django setup
 from django.contrib.auth import get_user_model  # noqa: E402
-from recipe.models import Recipe, RecipeIngredient  # noqa: E402
+
 from ingredient.models import Ingredient  # noqa: E402
+from recipe.models import Recipe, RecipeIngredient  # noqa: E402
 
 User = get_user_model()
 
@@ -205,7 +207,7 @@ def main():
 
     # Check if ingredients exist
     if Ingredient.objects.count() == 0:
-        print("No ingredients found. Please run load_ingredients.py first.")
+        print("No ingredients found. Please run 'manage.py load_ingredients'.")
         sys.exit(1)
 
     # Create users and recipes
@@ -0,0 +1,163 @@
+"""
+Настройки gunicorn для производственного режима.
+
+Количество процессов и потоков рассчитывается по доступным процессорам
+(с учетом ограничений cgroup контейнера) и памяти. Класс обработчиков
+выбирается переменной GUNICORN_WORKER_CLASS: sync, gthread или asgi
+(uvicorn, включает асинхронные обработчики чтения). Любое рассчитанное
+значение можно переопределить переменными окружения GUNICORN_*.
+"""
+
+import math
+import os
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "asgi": "uvicorn.workers.UvicornWorker",
+}
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    return value == "1" if value else default
+
+
+def _read(path):
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def available_cpus():
+    """Процессоры, доступные процессу: affinity и квота cgroup v2/v1"""
+    cpus = len(os.sched_getaffinity(0))
+    quota = None
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")
+    if cpu_max:
+        limit, period = cpu_max.split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    else:
+        limit = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if limit and period and int(limit) > 0:
+            quota = int(limit) / int(period)
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+def available_memory_mb():
+    """Память контейнера (cgroup) или всей системы, в мегабайтах"""
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        limit = _read(path)
+        # Очень большое значение в cgroup v1 означает отсутствие лимита
+        if limit and limit != "max" and int(limit) < 1 << 60:
+            return int(limit) // (1024 * 1024)
+    meminfo = _read("/proc/meminfo") or ""
+    for line in meminfo.splitlines():
+        if line.startswith("MemTotal:"):
+            return int(line.split()[1]) // 1024
+    return None
+
+
+def default_workers(worker_class, cpus, memory_mb, worker_memory_mb):
+    if worker_class == "sync":
+        # Синхронный процесс простаивает, пока ждет БД
+        workers = 2 * cpus + 1
+    else:
+        # Ожидание покрывают потоки или цикл событий
+        workers = cpus + 1
+    if memory_mb:
+        workers = min(workers, max(1, memory_mb // worker_memory_mb))
+    return workers
+
+
+worker_type = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_type not in WORKER_CLASSES:
+    raise ValueError(
+        f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}"
+    )
+worker_class = WORKER_CLASSES[worker_type]
+
+cpu_count = available_cpus()
+memory_mb = available_memory_mb()
+worker_memory_mb = _env_int("GUNICORN_WORKER_MEMORY_MB", 256)
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = _env_int(
+    "GUNICORN_WORKERS",
+    default_workers(worker_type, cpu_count, memory_mb, worker_memory_mb),
+)
+threads = _env_int("GUNICORN_THREADS", 4 if worker_type == "gthread" else 1)
+
+if worker_type == "asgi":
+    wsgi_app = "backend.asgi:application"
+    os.environ.setdefault("ASYNC_READ_VIEWS", "1")
+    # Постоянные соединения Django не подходят для асинхронного режима:
+    # соединения закрываются после запроса либо берутся из пула (DB_POOL)
+    os.environ.setdefault("DB_CONN_MAX_AGE", "0")
+else:
+    wsgi_app = "backend.wsgi:application"
+
+# Приложение загружается до fork: код и данные делятся между процессами
+# через copy-on-write, ошибки импорта видны сразу при старте
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+# Постоянные соединения с nginx и перезапуск процессов для сдерживания
+# роста памяти; разброс не дает всем процессам перезапуститься разом
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int(
+    "GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10
+)
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+
+# Файл heartbeat в памяти: запись на overlayfs контейнера может зависать
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+errorlog = "-"
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # Соединения, открытые при предзагрузке, не должны делиться между
+    # процессами
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def when_ready(server):
+    server.log.info(
+        "Effective settings: app=%s worker_class=%s workers=%s threads=%s "
+        "preload_app=%s keepalive=%ss max_requests=%s (+0..%s) timeout=%ss "
+        "(cpus=%s, memory=%s MB, per worker %s MB)",
+        wsgi_app,
+        worker_class,
+        workers,
+        threads,
+        preload_app,
+        keepalive,
+        max_requests,
+        max_requests_jitter,
+        timeout,
+        cpu_count,
+        memory_mb,
+        worker_memory_mb,
+    )
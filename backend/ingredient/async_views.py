@@ -0,0 +1,26 @@
+from asgiref.sync import sync_to_async
+
+from core.async_api import json_response, view_response
+
+from .models import Ingredient
+from .search import get_index, search_options
+from .views import IngredientViewSet
+
+
+async def _list(request):
+    """Поиск по индексу процесса; проверка версии индекса читает БД"""
+    name = request.GET.get("name")
+    if not name:
+        ingredients = [
+            item
+            async for item in Ingredient.objects.values(
+                "id", "name", "measurement_unit"
+            )
+        ]
+        return json_response(ingredients)
+    index = await sync_to_async(get_index)()
+    return json_response(index.search(name, **search_options(request.GET)))
+
+
+async def ingredient_list(request):
+    return await view_response(IngredientViewSet, "list", _list, request)
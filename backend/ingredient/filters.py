@@ -1,9 +1,21 @@
 from rest_framework import filters
 
+from .search import get_index, search_options
+
 
 class IngredientFilter(filters.SearchFilter):
+    """
+    Поиск по началу названия через индекс в памяти процесса.
+
+    ?fuzzy=1 добавляет совпадения с опечатками, ?limit=N ограничивает
+    количество результатов.
+    """
+
     def filter_queryset(self, request, queryset, view):
         name = request.query_params.get("name")
-        if name:
+        if not name:
+            return queryset
+        if getattr(view, "action", None) != "list":
             return queryset.filter(name__istartswith=name)
-        return queryset
+
+        return get_index().search(name, **search_options(request.query_params))
@@ -0,0 +1,64 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from ingredient.models import Ingredient
+from ingredient.search import IngredientIndex
+
+
+class Command(BaseCommand):
+    help = "Сравнивает поиск ингредиентов через ORM и через индекс в памяти"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        names = list(Ingredient.objects.values_list("name", flat=True))
+        if not names:
+            self.stderr.write("No ingredients found, load them first.")
+            return
+
+        rng = random.Random(options["seed"])
+        queries = [
+            rng.choice(names)[: rng.randint(1, 5)]
+            for _ in range(options["queries"])
+        ]
+
+        started = time.perf_counter()
+        index = IngredientIndex.from_database()
+        build_time = time.perf_counter() - started
+
+        self._report(
+            "orm",
+            queries,
+            lambda query: list(
+                Ingredient.objects.filter(name__istartswith=query).values(
+                    "id", "name", "measurement_unit"
+                )
+            ),
+        )
+        self._report("index prefix", queries, index.prefix)
+        self._report(
+            "index fuzzy",
+            queries,
+            lambda query: index.search(query, limit=10, fuzzy=True),
+        )
+        self.stdout.write(
+            f"index build: {build_time * 1000:.1f} ms "
+            f"for {len(index.items)} ingredients"
+        )
+
+    def _report(self, label, queries, search):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            search(query)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        timings.sort()
+        self.stdout.write(
+            f"{label:>13}: median {statistics.median(timings):9.1f} us, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:9.1f} us"
+        )
@@ -0,0 +1,207 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ingredient.constants import MEASUREMENT_UNIT_MAX_LENGTH, NAME_MAX_LENGTH
+from ingredient.models import Ingredient
+
+DEFAULT_PATH = settings.BASE_DIR / "data" / "ingredients.csv"
+
+
+def _json_items(file, chunk_size=64 * 1024):
+    """Элементы JSON-массива по одному, без чтения всего файла в память"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def skip_space():
+        nonlocal buffer, position, eof
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or eof:
+                return buffer[position : position + 1]
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = chunk, 0
+
+    def error(message):
+        return json.JSONDecodeError(message, buffer, position)
+
+    if skip_space() != "[":
+        raise error("Expecting '['")
+    position += 1
+    if skip_space() == "]":
+        return
+    while True:
+        skip_space()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # Число на границе порции могло оборваться ("-1e", "12."):
+                # значение закончено, только если за ним идет разделитель
+                after = buffer[end : end + 1]
+                if eof or after in (",", "]") or after.isspace():
+                    break
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+        yield item
+        position = end
+        separator = skip_space()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise error("Expecting ',' or ']'")
+        position += 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает ингредиенты из CSV или JSON пакетами; на PostgreSQL "
+        "через COPY во временную таблицу"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            type=Path,
+            default=DEFAULT_PATH,
+            help="Path to ingredients.csv or ingredients.json",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use bulk_create even on PostgreSQL",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change and roll back",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not path.exists():
+            raise CommandError(f"Ingredients file not found at {path}")
+
+        self.stats = {"created": 0, "skipped": 0, "duplicates": 0}
+        self.invalid = 0
+        rows = self._unique(self._read(path))
+
+        with transaction.atomic():
+            if connection.vendor == "postgresql" and not options["no_copy"]:
+                self._load_with_copy(rows)
+            else:
+                self._load_in_batches(rows, options["batch_size"])
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+
+        prefix = "Dry run: " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}created: {self.stats['created']}, "
+                f"skipped (already exist): {self.stats['skipped']}, "
+                f"duplicates in file: {self.stats['duplicates']}, "
+                f"invalid rows: {self.invalid}"
+            )
+        )
+
+    def _read(self, path):
+        """Построчное чтение файла: пары (название, единица измерения)"""
+        with open(path, encoding="utf-8") as file:
+            if path.suffix == ".json":
+                records = (
+                    (
+                        (item.get("name"), item.get("measurement_unit"))
+                        if isinstance(item, dict)
+                        else ()
+                    )
+                    for item in _json_items(file)
+                )
+            else:
+                records = (tuple(row[:2]) for row in csv.reader(file))
+            try:
+                for record in records:
+                    if self._is_valid(record):
+                        yield record[0].strip(), record[1].strip()
+                    else:
+                        self.invalid += 1
+            except json.JSONDecodeError as error:
+                raise CommandError(f"Invalid JSON in {path}: {error}")
+
+    def _is_valid(self, record):
+        return (
+            len(record) == 2
+            and all(
+                isinstance(value, str) and value.strip() for value in record
+            )
+            and len(record[0].strip()) <= NAME_MAX_LENGTH
+            and len(record[1].strip()) <= MEASUREMENT_UNIT_MAX_LENGTH
+        )
+
+    def _unique(self, rows):
+        seen = set()
+        for row in rows:
+            if row in seen:
+                self.stats["duplicates"] += 1
+                continue
+            seen.add(row)
+            yield row
+
+    def _load_in_batches(self, rows, batch_size):
+        while batch := list(islice(rows, batch_size)):
+            existing = set(
+                Ingredient.objects.filter(
+                    name__in={name for name, _ in batch}
+                ).values_list("name", "measurement_unit")
+            )
+            new = [row for row in batch if row not in existing]
+            Ingredient.objects.bulk_create(
+                (
+                    Ingredient(name=name, measurement_unit=unit)
+                    for name, unit in new
+                ),
+                ignore_conflicts=True,
+            )
+            self.stats["created"] += len(new)
+            self.stats["skipped"] += len(batch) - len(new)
+
+    def _load_with_copy(self, rows):
+        table = Ingredient._meta.db_table
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE ingredient_staging "
+                "(name text, measurement_unit text) ON COMMIT DROP"
+            )
+            # Строки уходят в COPY по мере чтения файла
+            with cursor.copy(
+                "COPY ingredient_staging (name, measurement_unit) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    total += 1
+            cursor.execute(
+                f"INSERT INTO {table} (name, measurement_unit, updated_at) "
+                "SELECT name, measurement_unit, %s FROM ingredient_staging "
+                "ON CONFLICT ON CONSTRAINT unique_ingredient_unit_pair "
+                "DO NOTHING",
+                [timezone.now()],
+            )
+            self.stats["created"] = cursor.rowcount
+        self.stats["skipped"] = total - self.stats["created"]
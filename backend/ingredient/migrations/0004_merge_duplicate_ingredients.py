@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 12:00
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Сводит повторы (название, единица) к ингредиенту с меньшим id перед
+    добавлением уникального ограничения. Строки рецептов переносятся на
+    оставшийся ингредиент, количества повторов в одном рецепте
+    складываются.
+    """
+    Ingredient = apps.get_model("ingredient", "Ingredient")
+    RecipeIngredient = apps.get_model("recipe", "RecipeIngredient")
+    groups = list(
+        Ingredient.objects.values("name", "measurement_unit")
+        .annotate(keep=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    for group in groups:
+        keep = group["keep"]
+        duplicates = list(
+            Ingredient.objects.filter(
+                name=group["name"],
+                measurement_unit=group["measurement_unit"],
+            )
+            .exclude(pk=keep)
+            .values_list("pk", flat=True)
+        )
+        for item in RecipeIngredient.objects.filter(
+            ingredient_id__in=duplicates
+        ).order_by("pk"):
+            kept = RecipeIngredient.objects.filter(
+                recipe_id=item.recipe_id, ingredient_id=keep
+            ).first()
+            if kept is None:
+                item.ingredient_id = keep
+                item.save(update_fields=["ingredient"])
+            else:
+                kept.amount += item.amount
+                kept.save(update_fields=["amount"])
+                item.delete()
+        Ingredient.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ingredient", "0003_ingredient_updated_at"),
+        ("recipe", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ingredient", "0004_merge_duplicate_ingredients"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="ingredient",
+            options={
+                "ordering": ["name"],
+                "verbose_name": "Ingredient",
+                "verbose_name_plural": "Ingredients",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="ingredient",
+            constraint=models.UniqueConstraint(
+                fields=("name", "measurement_unit"),
+                name="unique_ingredient_unit_pair",
+            ),
+        ),
+    ]
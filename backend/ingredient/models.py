@@ -1,6 +1,6 @@
 from django.db import models
 
-from .constants import NAME_MAX_LENGTH, MEASUREMENT_UNIT_MAX_LENGTH
+from .constants import MEASUREMENT_UNIT_MAX_LENGTH, NAME_MAX_LENGTH
 
 
 class Ingredient(models.Model):
@@ -13,6 +13,7 @@ class Ingredient(models.Model):
         max_length=MEASUREMENT_UNIT_MAX_LENGTH,
         verbose_name="Measurement unit",
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "Ingredient"
@@ -0,0 +1,181 @@
+"""
+Поисковый индекс ингредиентов в памяти процесса.
+
+Индекс строится один раз на процесс из таблицы ингредиентов и отвечает
+на поиск по префиксу (отсортированный массив + bisect) и нечеткий поиск
+(триграммный индекс и расстояние Левенштейна). Актуальность проверяется по
+отметке версии из базы данных (количество строк и max(updated_at))
+не чаще INGREDIENT_INDEX_CHECK_INTERVAL секунд; изменения в текущем
+процессе сбрасывают индекс сразу.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import Ingredient
+
+
+def normalize(text):
+    return " ".join(text.casefold().split())
+
+
+def trigrams(text):
+    """Триграммы с дополнением только в начале: префикс дает подмножество"""
+    padded = f"  {text}"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(query):
+    if len(query) < 3:
+        return 0
+    return 1 if len(query) < 8 else 2
+
+
+def prefix_distance(query, key, limit):
+    """
+    Наименьшее расстояние Левенштейна между query и префиксами key,
+    None если оно больше limit.
+    """
+    key = key[: len(query) + limit]
+    previous = list(range(len(key) + 1))
+    for row, query_char in enumerate(query, 1):
+        current = [row]
+        for column, key_char in enumerate(key, 1):
+            current.append(
+                min(
+                    previous[column] + 1,
+                    current[column - 1] + 1,
+                    previous[column - 1] + (query_char != key_char),
+                )
+            )
+        if min(current) > limit:
+            return None
+        previous = current
+    distance = min(previous)
+    return distance if distance <= limit else None
+
+
+class IngredientIndex:
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.items = sorted(
+            (
+                {"id": pk, "name": name, "measurement_unit": unit}
+                for pk, name, unit in rows
+            ),
+            key=lambda item: (normalize(item["name"]), item["id"]),
+        )
+        self.keys = [normalize(item["name"]) for item in self.items]
+        self.postings = defaultdict(list)
+        for position, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                self.postings[gram].append(position)
+
+    @classmethod
+    def from_database(cls):
+        version = get_version()
+        rows = Ingredient.objects.values_list("id", "name", "measurement_unit")
+        return cls(rows, version)
+
+    def prefix(self, query, limit=None):
+        query = normalize(query)
+        start = bisect_left(self.keys, query)
+        end = bisect_left(self.keys, query + "\U0010ffff", lo=start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.items[start:end]
+
+    def fuzzy(self, query, limit=10):
+        """
+        Совпадения по началу названия с опечатками, ближайшие первыми.
+
+        Кандидаты отбираются по числу общих триграмм: k правок меняют
+        не более 3k триграмм, затем проверяются расстоянием Левенштейна.
+        """
+        query = normalize(query)
+        typos = max_typos(query)
+        if not typos:
+            return []
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        required = len(query_grams) - 3 * typos
+        scored = []
+        for position, common in shared.items():
+            if common < required:
+                continue
+            distance = prefix_distance(query, self.keys[position], typos)
+            if distance is not None:
+                scored.append(
+                    (distance, -common, self.keys[position], position)
+                )
+        scored.sort()
+        return [self.items[position] for *_, position in scored[:limit]]
+
+    def search(self, query, limit=None, fuzzy=False):
+        """Сначала совпадения по префиксу, затем нечеткие до лимита"""
+        results = self.prefix(query, limit)
+        if not fuzzy or (limit is not None and len(results) >= limit):
+            return results
+        found = {item["id"] for item in results}
+        extra = self.fuzzy(
+            query, limit=(limit or settings.INGREDIENT_FUZZY_LIMIT) * 2
+        )
+        results.extend(item for item in extra if item["id"] not in found)
+        return results[:limit] if limit is not None else results
+
+
+def get_version():
+    stamp = Ingredient.objects.aggregate(
+        count=Count("id"), updated_at=Max("updated_at")
+    )
+    return stamp["count"], stamp["updated_at"]
+
+
+def search_options(params):
+    """Параметры поиска из строки запроса: ?fuzzy=1&limit=N"""
+    fuzzy = params.get("fuzzy") in ("1", "true")
+    try:
+        limit = int(params["limit"])
+    except (KeyError, ValueError):
+        limit = settings.INGREDIENT_FUZZY_LIMIT if fuzzy else None
+    if limit is not None and limit <= 0:
+        limit = None
+    return {"limit": limit, "fuzzy": fuzzy}
+
+
+_lock = threading.Lock()
+_index = None
+_checked_at = 0.0
+
+
+def get_index():
+    """Индекс текущего процесса, перестраивается при смене версии"""
+    global _index, _checked_at
+    now = time.monotonic()
+    # Глобальная ссылка читается один раз: invalidate_index может
+    # обнулить ее без блокировки между проверкой и возвратом
+    index = _index
+    if (
+        index is not None
+        and now - _checked_at < settings.INGREDIENT_INDEX_CHECK_INTERVAL
+    ):
+        return index
+    with _lock:
+        index = _index
+        if index is None or index.version != get_version():
+            index = _index = IngredientIndex.from_database()
+        _checked_at = now
+        return index
+
+
+def invalidate_index():
+    global _index
+    _index = None
@@ -1,12 +1,15 @@
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
 
+from core.conditional import ConditionalGetMixin, make_etag
+
 from .filters import IngredientFilter
 from .models import Ingredient
+from .search import get_index
 from .serializers import IngredientSerializer
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     pagination_class = None
@@ -14,3 +17,31 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [
         IngredientFilter,
     ]
+
+    def get_validators(self, request):
+        if self.action == "list":
+            # Версия индекса процесса сверяется с БД не чаще
+            # INGREDIENT_INDEX_CHECK_INTERVAL; удаление не меняет
+            # max(updated_at), поэтому только ETag
+            return make_etag(*get_index().version), None
+        pk = self.kwargs["pk"]
+        if not pk.isdigit():
+            return None
+        updated_at = (
+            Ingredient.objects.filter(pk=pk)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if updated_at is None:
+            return None
+        return make_etag(pk, updated_at), updated_at
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
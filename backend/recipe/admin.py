@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db.models import Count
 
 from .models import Recipe, RecipeIngredient
 
@@ -13,23 +12,12 @@ class RecipeIngredientInline(admin.TabularInline):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ("name", "author", "cooking_time", "get_favorites_count")
+    list_display = ("name", "author", "cooking_time", "favorites_count")
     search_fields = ("name", "author__username", "author__email")
     list_filter = ("author", "cooking_time")
-    readonly_fields = ("get_favorites_count",)
+    readonly_fields = ("favorites_count",)
     inlines = (RecipeIngredientInline,)
 
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        queryset = queryset.annotate(favorites_count=Count("favorited_by"))
-        return queryset
-
-    def get_favorites_count(self, obj):
-        return obj.favorites_count
-
-    get_favorites_count.short_description = "Favorites"
-    get_favorites_count.admin_order_field = "favorites_count"
-
 
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def restore_search_index(using, **kwargs):
+    from django.db import connections
+
+    from .search import ensure_sqlite_fts
+
+    connection = connections[using]
+    # Таблицы рецептов может еще не быть, если мигрировали другое
+    # приложение
+    if (
+        connection.vendor == "sqlite"
+        and "recipe_recipe" in connection.introspection.table_names()
+    ):
+        ensure_sqlite_fts(connection)
 
 
 class RecipeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "recipe"
+
+    def ready(self):
+        post_migrate.connect(restore_search_index, sender=self)
@@ -0,0 +1,65 @@
+from asgiref.sync import sync_to_async
+from django.utils.translation import gettext
+
+from core.async_api import (
+    authenticate,
+    error_response,
+    json_response,
+    paginate,
+    view_response,
+)
+
+from .filters import RecipeFilter
+from .models import Recipe
+from .serializers import RecipeSerializer
+from .views import RecipeViewSet
+
+
+def _filter(request):
+    """Фильтры django-filter синхронны: проверка формы может читать БД"""
+    filterset = RecipeFilter(
+        request.GET,
+        queryset=Recipe.objects.for_user(request.user),
+        request=request,
+    )
+    if not filterset.is_valid():
+        return None, filterset.errors
+    return filterset.qs, None
+
+
+async def _list(request):
+    queryset, errors = await sync_to_async(_filter)(request)
+    if errors:
+        return json_response(errors, status=400)
+
+    page = await paginate(request, queryset)
+    if page is None:
+        return error_response(gettext("Invalid page."), 404)
+    recipes, build = page
+    serializer = RecipeSerializer(
+        recipes, many=True, context={"request": request}
+    )
+    return json_response(build(serializer.data))
+
+
+async def _detail(request, pk):
+    try:
+        recipe = await Recipe.objects.for_user(request.user).aget(pk=pk)
+    except Recipe.DoesNotExist:
+        return error_response("No Recipe matches the given query.", 404)
+    serializer = RecipeSerializer(recipe, context={"request": request})
+    return json_response(serializer.data)
+
+
+async def recipe_list(request):
+    if "cursor" in request.GET:
+        return None
+    request.user = await authenticate(request)
+    return await view_response(RecipeViewSet, "list", _list, request)
+
+
+async def recipe_detail(request, pk):
+    request.user = await authenticate(request)
+    return await view_response(
+        RecipeViewSet, "retrieve", _detail, request, pk=pk
+    )
@@ -0,0 +1,141 @@
+"""
+Пакетное создание рецептов.
+
+Элементы пакета проверяются сериализатором без обращений к БД, наличие
+всех тегов и ингредиентов пакета - двумя запросами. Рецепты, связи с
+тегами и ингредиенты вставляются тремя bulk_create в одной транзакции.
+bulk_create не отправляет сигналы, поэтому счетчик рецептов автора,
+версии кэша ответов и производные изображения обновляются здесь.
+
+Размер пакета ограничен размером тела запроса: в
+DATA_UPLOAD_MAX_MEMORY_SIZE (и client_max_body_size nginx) должно
+помещаться max_batch_size() рецептов по RECIPE_BULK_ITEM_SIZE байт.
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from core.counters import change_counter
+from core.images import schedule_derivatives
+from core.response_cache import RECIPES_LIST, bump_versions
+from ingredient.models import Ingredient
+from user.models import User
+
+from .models import Recipe, RecipeIngredient, Tag
+from .serializers import RecipeBulkItemSerializer
+
+
+def max_batch_size():
+    return max(
+        1,
+        settings.DATA_UPLOAD_MAX_MEMORY_SIZE // settings.RECIPE_BULK_ITEM_SIZE,
+    )
+
+
+def body_too_large(request):
+    try:
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return False
+    return length > settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+
+
+def create_recipes(items, author, context):
+    """
+    Создает корректные рецепты пакета.
+
+    Возвращает список пар (индекс, рецепт) и словарь ошибок по индексам
+    элементов, не прошедших проверку.
+    """
+    errors = {}
+    valid = []
+    for index, item in enumerate(items):
+        serializer = RecipeBulkItemSerializer(data=item, context=context)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors[index] = serializer.errors
+
+    tag_ids = set(
+        Tag.objects.filter(
+            id__in={tag for _, data in valid for tag in data["tags"]}
+        ).values_list("id", flat=True)
+    )
+    ingredient_ids = set(
+        Ingredient.objects.filter(
+            id__in={
+                item["id"] for _, data in valid for item in data["ingredients"]
+            }
+        ).values_list("id", flat=True)
+    )
+
+    accepted = []
+    for index, data in valid:
+        item_errors = _missing_references(data, tag_ids, ingredient_ids)
+        if item_errors:
+            errors[index] = item_errors
+        else:
+            accepted.append((index, data))
+
+    if accepted:
+        with transaction.atomic():
+            recipes = _insert(author, [data for _, data in accepted])
+    else:
+        recipes = []
+    created = [
+        (index, recipe) for (index, _), recipe in zip(accepted, recipes)
+    ]
+    return created, errors
+
+
+def _missing_references(data, tag_ids, ingredient_ids):
+    errors = {}
+    missing_tags = sorted(set(data["tags"]) - tag_ids)
+    if missing_tags:
+        errors["tags"] = [
+            f"Tag with id {tag} does not exist." for tag in missing_tags
+        ]
+    missing_ingredients = [
+        item["id"]
+        for item in data["ingredients"]
+        if item["id"] not in ingredient_ids
+    ]
+    if missing_ingredients:
+        errors["ingredients"] = [
+            f"Ingredient with id {ingredient} does not exist."
+            for ingredient in missing_ingredients
+        ]
+    return errors
+
+
+def _insert(author, recipes_data):
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            author=author,
+            name=data["name"],
+            text=data["text"],
+            cooking_time=data["cooking_time"],
+            image=data["image"],
+        )
+        for data in recipes_data
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe.id, tag_id=tag)
+        for recipe, data in zip(recipes, recipes_data)
+        for tag in set(data["tags"])
+    )
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe_id=recipe.id,
+            ingredient_id=item["id"],
+            amount=item["amount"],
+        )
+        for recipe, data in zip(recipes, recipes_data)
+        for item in data["ingredients"]
+    )
+
+    change_counter(User, author.id, "recipes_count", len(recipes))
+    bump_versions(RECIPES_LIST)
+    for recipe in recipes:
+        schedule_derivatives(recipe, "image")
+    return recipes
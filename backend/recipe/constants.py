@@ -2,6 +2,22 @@ import string
 
 SHORT_LINK_LETTERS = string.ascii_letters + string.digits
 
-MAX_RECIPE_NAME_LENGTH = 256
+NAME_MAX_LENGTH = 256
+TEXT_MAX_LENGTH = 5000
 
-INGREDIENT_MIN_VALUE = 1
+MIN_COOKING_TIME = 1
+MIN_AMOUNT = 1
+
+# Наибольшее количество рецептов в пакетном добавлении в избранное или
+# корзину (размер пакета POST /api/recipes/bulk/ зависит от размера тела
+# запроса, см. recipe.bulk.max_batch_size)
+RECIPE_BULK_MAX_SIZE = 500
+
+# Конфигурация полнотекстового поиска PostgreSQL и веса полей (A, B)
+SEARCH_CONFIG = "russian"
+SEARCH_NAME_WEIGHT = 10.0
+SEARCH_TEXT_WEIGHT = 1.0
+
+# Режимы фильтра ?tags=: любой из тегов или все теги сразу
+TAGS_MODE_ANY = "any"
+TAGS_MODE_ALL = "all"
@@ -1,17 +1,56 @@
+from django import forms
+from django.core.validators import validate_slug
+from django.db.models import Count, Exists, OuterRef
 from django_filters import rest_framework as filters
 
+from .constants import TAGS_MODE_ALL, TAGS_MODE_ANY
 from .models import Recipe
+from .search import search_recipes
+
+
+class SlugListField(forms.Field):
+    """Список слагов из повторяющегося параметра: ?tags=a&tags=b"""
+
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        return list(dict.fromkeys(slug.strip() for slug in value or ()))
+
+    def validate(self, value):
+        super().validate(value)
+        for slug in value:
+            validate_slug(slug)
+
+
+class TagsFilter(filters.Filter):
+    field_class = SlugListField
 
 
 class RecipeFilter(filters.FilterSet):
+    search = filters.CharFilter(method="filter_search")
     is_favorited = filters.BooleanFilter(method="filter_is_favorited")
     is_in_shopping_cart = filters.BooleanFilter(
         method="filter_is_in_shopping_cart"
     )
+    tags = TagsFilter(method="filter_tags")
+    tags_mode = filters.ChoiceFilter(
+        choices=(
+            (TAGS_MODE_ANY, TAGS_MODE_ANY),
+            (TAGS_MODE_ALL, TAGS_MODE_ALL),
+        ),
+        method="filter_tags_mode",
+    )
 
     class Meta:
         model = Recipe
-        fields = ["is_favorited", "is_in_shopping_cart", "author"]
+        fields = [
+            "is_favorited",
+            "is_in_shopping_cart",
+            "author",
+            "search",
+            "tags",
+            "tags_mode",
+        ]
 
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
@@ -24,3 +63,30 @@ class RecipeFilter(filters.FilterSet):
         if value and user.is_authenticated:
             return queryset.filter(in_shopping_carts__user=user)
         return queryset
+
+    def filter_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        return search_recipes(queryset, value)
+
+    def filter_tags(self, queryset, name, value):
+        """
+        Подзапросы к связующей таблице вместо JOIN: без дублей и DISTINCT.
+        any - EXISTS, all - группировка с HAVING COUNT по числу тегов.
+        """
+        if not value:
+            return queryset
+        links = Recipe.tags.through.objects.filter(tag__slug__in=value)
+        if self.form.cleaned_data.get("tags_mode") == TAGS_MODE_ALL:
+            return queryset.filter(
+                pk__in=links.values("recipe_id")
+                .annotate(matched=Count("tag_id"))
+                .filter(matched=len(value))
+                .values("recipe_id")
+            )
+        return queryset.filter(Exists(links.filter(recipe=OuterRef("pk"))))
+
+    def filter_tags_mode(self, queryset, name, value):
+        """Режим учитывается в filter_tags"""
+        return queryset
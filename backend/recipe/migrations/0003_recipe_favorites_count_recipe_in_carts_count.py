@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model("recipe", "Recipe")
+    counters = {
+        "favorites_count": apps.get_model("core", "FavoriteRecipe"),
+        "in_carts_count": apps.get_model("core", "ShoppingCart"),
+    }
+    Recipe.objects.update(
+        **{
+            field: Coalesce(
+                Subquery(
+                    related.objects.filter(recipe=OuterRef("pk"))
+                    .order_by()
+                    .values("recipe")
+                    .annotate(total=Count("pk"))
+                    .values("total")
+                ),
+                Value(0),
+            )
+            for field, related in counters.items()
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("recipe", "0002_alter_recipe_cooking_time_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="favorites_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Favorites"
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="in_carts_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="In shopping carts"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-18 12:00
+
+from django.db import migrations
+
+from recipe.constants import SEARCH_CONFIG
+
+CREATE_SEARCH_VECTOR = f"""
+ALTER TABLE recipe_recipe ADD COLUMN search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A')
+    || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(text, '')), 'B')
+) STORED;
+CREATE INDEX recipe_search_vector_gin
+ON recipe_recipe USING gin (search_vector);
+"""
+
+DROP_SEARCH_VECTOR = """
+DROP INDEX IF EXISTS recipe_search_vector_gin;
+ALTER TABLE recipe_recipe DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SEARCH_VECTOR)
+    elif schema_editor.connection.vendor == "sqlite":
+        from recipe.search import ensure_sqlite_fts
+
+        ensure_sqlite_fts(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_VECTOR)
+    elif schema_editor.connection.vendor == "sqlite":
+        from recipe.search import FTS_TABLE
+
+        for suffix in ("insert", "delete", "update"):
+            schema_editor.execute(
+                f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}"
+            )
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipe", "0003_recipe_favorites_count_recipe_in_carts_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
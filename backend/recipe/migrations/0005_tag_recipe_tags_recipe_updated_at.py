@@ -0,0 +1,132 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:34
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipe", "0004_recipe_search_vector"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=256, unique=True, verbose_name="Tag name"
+                    ),
+                ),
+                (
+                    "slug",
+                    models.SlugField(
+                        max_length=256, unique=True, verbose_name="Tag slug"
+                    ),
+                ),
+                (
+                    "color",
+                    models.CharField(
+                        max_length=7, verbose_name="Color in HEX format"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tag",
+                "verbose_name_plural": "Tags",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="recipe",
+            options={
+                "ordering": ["-created_at"],
+                "verbose_name": "Recipe",
+                "verbose_name_plural": "Recipes",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="recipeingredient",
+            options={
+                "verbose_name": "Recipe ingredient",
+                "verbose_name_plural": "Recipe ingredients",
+            },
+        ),
+        migrations.RemoveField(
+            model_name="recipe",
+            name="ingredients",
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="author",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="recipes",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Recipe author",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="cooking_time",
+            field=models.PositiveIntegerField(
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Cooking time in minutes",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="image",
+            field=models.ImageField(
+                upload_to="recipes/", verbose_name="Recipe image"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="name",
+            field=models.CharField(max_length=256, verbose_name="Recipe name"),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="text",
+            field=models.TextField(
+                max_length=5000, verbose_name="Recipe description"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="recipeingredient",
+            name="amount",
+            field=models.PositiveIntegerField(
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Amount",
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="tags",
+            field=models.ManyToManyField(
+                related_name="recipes",
+                to="recipe.tag",
+                verbose_name="Recipe tags",
+            ),
+        ),
+    ]
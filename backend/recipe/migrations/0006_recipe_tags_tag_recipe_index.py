@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Покрывающий индекс (tag_id, recipe_id) для фильтра по тегам:
+    уникальный индекс (recipe_id, tag_id) обслуживает EXISTS по рецепту,
+    этот - выбор рецептов по тегу без обращения к таблице.
+    """
+
+    dependencies = [
+        ("recipe", "0005_tag_recipe_tags_recipe_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX recipe_recipe_tags_tag_recipe_idx "
+            "ON recipe_recipe_tags (tag_id, recipe_id)",
+            "DROP INDEX recipe_recipe_tags_tag_recipe_idx",
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipe", "0006_recipe_tags_tag_recipe_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="image_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -1,13 +1,23 @@
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import (
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Value,
+    Window,
+)
+from django.db.models.functions import RowNumber
 
 from ingredient.models import Ingredient
 from user.models import User
+
 from .constants import (
+    MIN_AMOUNT,
+    MIN_COOKING_TIME,
     NAME_MAX_LENGTH,
     TEXT_MAX_LENGTH,
-    MIN_COOKING_TIME,
-    MIN_AMOUNT,
 )
 
 
@@ -29,6 +39,62 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    def with_related(self):
+        """Автор, теги и ингредиенты за фиксированное число запросов"""
+        return self.select_related("author").prefetch_related(
+            "tags",
+            Prefetch(
+                "recipe_ingredients",
+                queryset=RecipeIngredient.objects.select_related("ingredient"),
+            ),
+        )
+
+    def with_user_flags(self, user):
+        """Флаги избранного, корзины и подписки на автора для пользователя"""
+        if not user or not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+                author_is_subscribed=Value(False),
+            )
+
+        from core.models import FavoriteRecipe, ShoppingCart, Subscription
+
+        return self.annotate(
+            is_favorited=Exists(
+                FavoriteRecipe.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+            author_is_subscribed=Exists(
+                Subscription.objects.filter(
+                    user=user, subscribed_to=OuterRef("author")
+                )
+            ),
+        )
+
+    def for_user(self, user):
+        return self.with_related().with_user_flags(user)
+
+    def latest_per_author(self, limit=None):
+        """
+        Последние рецепты авторов, не более limit на автора.
+        Лимит применяется в БД через ROW_NUMBER() OVER (PARTITION BY author).
+        """
+        queryset = self.order_by("-created_at", "-id")
+        if limit is None:
+            return queryset
+        return queryset.annotate(
+            author_position=Window(
+                RowNumber(),
+                partition_by=F("author"),
+                order_by=(F("created_at").desc(), F("id").desc()),
+            )
+        ).filter(author_position__lte=limit)
+
+
 class Recipe(models.Model):
     name = models.CharField(
         max_length=NAME_MAX_LENGTH, verbose_name="Recipe name"
@@ -43,6 +109,8 @@ class Recipe(models.Model):
     image = models.ImageField(
         upload_to="recipes/", verbose_name="Recipe image"
     )
+    # Готовые производные изображения, см. core.images
+    image_variants = models.JSONField(default=dict, editable=False)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -54,6 +122,15 @@ class Recipe(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Счетчики поддерживаются сигналами core.signals, см. команду recount
+    favorites_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Favorites"
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="In shopping carts"
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Recipe"
@@ -87,66 +164,3 @@ class RecipeIngredient(models.Model):
 
     def __str__(self):
         return f"{self.ingredient.name} in {self.recipe.name}"
-
-
-class ShoppingCart(models.Model):
-    user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="shopping_cart"
-    )
-    recipe = models.ForeignKey(
-        Recipe, on_delete=models.CASCADE, related_name="in_shopping_carts"
-    )
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        verbose_name = "Shopping cart item"
-        verbose_name_plural = "Shopping cart items"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["user", "recipe"], name="unique_shopping_cart_recipe"
-            )
-        ]
-        ordering = ["-created_at"]
-
-    def __str__(self):
-        return f"{self.recipe.name} in {self.user.username}'s shopping cart"
-
-
-class FavoriteRecipe(models.Model):
-    user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="favorites"
-    )
-    recipe = models.ForeignKey(
-        Recipe, on_delete=models.CASCADE, related_name="favorited_by"
-    )
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        verbose_name = "Favorite recipe"
-        verbose_name_plural = "Favorite recipes"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["user", "recipe"], name="unique_favorite_recipe"
-            )
-        ]
-        ordering = ["-created_at"]
-
-    def __str__(self):
-        return f"{self.recipe.name} favorited by {self.user.username}"
-
-
-class ShortLink(models.Model):
-    recipe = models.OneToOneField(
-        Recipe, on_delete=models.CASCADE, related_name="short_link"
-    )
-    short_code = models.CharField(
-        max_length=10, unique=True  # импортировать константу из core.constants
-    )
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        verbose_name = "Short link"
-        verbose_name_plural = "Short links"
-
-    def __str__(self):
-        return f"Short link for {self.recipe.name}"
@@ -0,0 +1,117 @@
+"""
+Полнотекстовый поиск рецептов по названию и описанию.
+
+PostgreSQL: генерируемый столбец search_vector (tsvector, название с
+весом A, описание с весом B) с GIN-индексом, создается миграцией.
+SQLite: внешняя FTS5-таблица recipe_recipe_fts, поддерживаемая
+триггерами. Django пересоздает таблицу при изменении схемы в SQLite и
+теряет триггеры, поэтому они проверяются после каждой миграции.
+Результаты сортируются по релевантности, поэтому с поиском список
+рецептов нумерует страницы и не использует курсор (RecipePagination).
+"""
+
+import re
+
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .constants import SEARCH_CONFIG, SEARCH_NAME_WEIGHT, SEARCH_TEXT_WEIGHT
+
+FTS_TABLE = "recipe_recipe_fts"
+
+SQLITE_FTS_SETUP = (
+    (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, text, content='recipe_recipe', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    ),
+    (
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+        "AFTER INSERT ON recipe_recipe BEGIN "
+        f"INSERT INTO {FTS_TABLE} (rowid, name, text) "
+        "VALUES (new.id, new.name, new.text); END"
+    ),
+    (
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+        "AFTER DELETE ON recipe_recipe BEGIN "
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, text) "
+        "VALUES ('delete', old.id, old.name, old.text); END"
+    ),
+    (
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+        "AFTER UPDATE OF name, text ON recipe_recipe BEGIN "
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, text) "
+        "VALUES ('delete', old.id, old.name, old.text); "
+        f"INSERT INTO {FTS_TABLE} (rowid, name, text) "
+        "VALUES (new.id, new.name, new.text); END"
+    ),
+)
+
+
+def ensure_sqlite_fts(using_connection=connection):
+    """Создает FTS5-таблицу и триггеры, перестраивая индекс при потере"""
+    with using_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master "
+            "WHERE type = 'trigger' AND tbl_name = 'recipe_recipe' "
+            "AND name LIKE %s",
+            [f"{FTS_TABLE}_%"],
+        )
+        if cursor.fetchone()[0] == len(SQLITE_FTS_SETUP) - 1:
+            return
+        for statement in SQLITE_FTS_SETUP:
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def fts5_query(query):
+    """Слова запроса как префиксы, объединенные через AND"""
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_recipes(queryset, query):
+    """Фильтрует рецепты по запросу и сортирует по релевантности"""
+    # Чтение может идти с реплики (core.db_router), а не с default
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        tsquery = "websearch_to_tsquery(%s::regconfig, %s)"
+        params = [SEARCH_CONFIG, query]
+        queryset = queryset.annotate(
+            search_match=RawSQL(
+                f'"recipe_recipe"."search_vector" @@ {tsquery}',
+                params,
+                output_field=BooleanField(),
+            ),
+            search_rank=RawSQL(
+                f'ts_rank_cd("recipe_recipe"."search_vector", {tsquery})',
+                params,
+                output_field=FloatField(),
+            ),
+        ).filter(search_match=True)
+    elif vendor == "sqlite":
+        match = fts5_query(query)
+        if not match:
+            return queryset.none()
+        queryset = queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [match],
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s "
+                'AND rowid = "recipe_recipe"."id")',
+                [SEARCH_NAME_WEIGHT, SEARCH_TEXT_WEIGHT, match],
+                output_field=FloatField(),
+            )
+        )
+    else:
+        return queryset.filter(
+            Q(name__icontains=query) | Q(text__icontains=query)
+        )
+    return queryset.order_by("-search_rank", "-created_at", "-id")
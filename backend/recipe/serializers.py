@@ -1,9 +1,17 @@
+import hashlib
+
+from django.db import transaction
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
+from core.fields import ImageVariantsField
+from core.short_links import get_short_code, short_link_path
 from ingredient.models import Ingredient
-from user.serializers import CustomUserSerializer
+from user.serializers import CustomUserSerializer, SubscriptionsListSerializer
+
+from .constants import RECIPE_BULK_MAX_SIZE
 from .models import Recipe, RecipeIngredient, Tag
+from .shopping_list import bump_recipe_cart_versions
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -37,6 +45,11 @@ class RecipeIngredientCreateSerializer(serializers.ModelSerializer):
         return value
 
 
+class RecipeAuthorsListSerializer(SubscriptionsListSerializer):
+    author_id_attr = "author_id"
+    annotation = "author_is_subscribed"
+
+
 class RecipeSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     author = CustomUserSerializer(read_only=True)
@@ -44,6 +57,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         source="recipe_ingredients", many=True, read_only=True
     )
     image = Base64ImageField()
+    image_variants = ImageVariantsField("image")
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
@@ -58,17 +72,29 @@ class RecipeSerializer(serializers.ModelSerializer):
             "is_in_shopping_cart",
             "name",
             "image",
+            "image_variants",
             "text",
             "cooking_time",
         )
+        list_serializer_class = RecipeAuthorsListSerializer
+
+    def to_representation(self, instance):
+        # Флаг подписки вычислен в запросе рецептов (RecipeQuerySet)
+        if hasattr(instance, "author_is_subscribed"):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        return super().to_representation(instance)
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
         request = self.context.get("request")
         if not request or request.user.is_anonymous:
             return False
         return obj.favorited_by.filter(user=request.user).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
         request = self.context.get("request")
         if not request or request.user.is_anonymous:
             return False
@@ -137,6 +163,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             )
         RecipeIngredient.objects.bulk_create(recipe_ingredients)
 
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop("tags")
         ingredients_data = validated_data.pop("ingredients")
@@ -147,6 +174,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags_data = validated_data.pop("tags", None)
         ingredients_data = validated_data.pop("ingredients", None)
@@ -162,20 +190,131 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 {"ingredients": "This field cannot be empty."}
             )
 
-        # Обновляем основные поля рецепта
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        image = validated_data.get("image")
+        if image is not None and _same_file(instance.image, image):
+            del validated_data["image"]
+
+        changed_fields = [
+            attr
+            for attr, value in validated_data.items()
+            if getattr(instance, attr) != value
+        ]
+        for attr in changed_fields:
+            setattr(instance, attr, validated_data[attr])
+
+        tags_changed = tags_data is not None and {
+            tag.id for tag in tags_data
+        } != set(instance.tags.values_list("id", flat=True))
+        ingredients_changed = self._update_recipe_ingredients(
+            instance, ingredients_data
+        )
 
-        # Обновляем теги
-        if tags_data is not None:
+        if changed_fields or tags_changed or ingredients_changed:
+            # Сохраняем только измененные поля: сигнал изображения не
+            # запускается, если оно осталось прежним
+            instance.save(update_fields=[*changed_fields, "updated_at"])
+        if tags_changed:
             instance.tags.set(tags_data)
-
-        # Обновляем ингредиенты
-        instance.recipe_ingredients.all().delete()
-        self._create_recipe_ingredients(instance, ingredients_data)
+        if ingredients_changed:
+            # bulk-операции не отправляют сигналы, сбрасываем кэш
+            # списков покупок
+            bump_recipe_cart_versions(instance.id)
 
         return instance
 
+    def _update_recipe_ingredients(self, recipe, ingredients_data):
+        """
+        Применяет разницу между текущими и новыми ингредиентами:
+        удаляет лишние, обновляет количество, добавляет новые.
+        Возвращает True, если что-то изменилось.
+        """
+        amounts = {item["id"]: item["amount"] for item in ingredients_data}
+        # Рецепт заблокирован представлением (RecipeViewSet.get_queryset)
+        existing = {
+            item.ingredient_id: item
+            for item in recipe.recipe_ingredients.all()
+        }
+
+        removed = existing.keys() - amounts.keys()
+        changed = [
+            item
+            for ingredient_id, item in existing.items()
+            if ingredient_id in amounts
+            and item.amount != amounts[ingredient_id]
+        ]
+        for item in changed:
+            item.amount = amounts[item.ingredient_id]
+        added = [
+            {"id": ingredient_id, "amount": amount}
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id not in existing
+        ]
+
+        if removed:
+            RecipeIngredient.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ["amount"])
+        if added:
+            self._create_recipe_ingredients(recipe, added)
+        return bool(removed or changed or added)
+
     def to_representation(self, instance):
+        # Рецепт перечитывается с автором, тегами, ингредиентами и флагами
+        # пользователя: число запросов не зависит от числа ингредиентов
+        request = self.context.get("request")
+        instance = Recipe.objects.for_user(request and request.user).get(
+            pk=instance.pk
+        )
         return RecipeSerializer(instance, context=self.context).data
+
+
+class RecipeShortLinkSerializer(serializers.BaseSerializer):
+    def to_representation(self, instance):
+        path = short_link_path(get_short_code(instance.id))
+        return {"short-link": self.context["request"].build_absolute_uri(path)}
+
+
+class RecipeBulkItemSerializer(RecipeCreateSerializer):
+    """
+    Рецепт из пакета. Наличие тегов и ингредиентов проверяется сразу
+    для всего пакета, поэтому здесь запросов к БД нет.
+    """
+
+    tags = serializers.ListField(child=serializers.IntegerField())
+
+    def validate_ingredients(self, value):
+        if not value:
+            raise serializers.ValidationError(
+                "Ingredients field is required and cannot be empty."
+            )
+        ingredient_ids = [item["id"] for item in value]
+        if len(ingredient_ids) != len(set(ingredient_ids)):
+            raise serializers.ValidationError("Ingredients must be unique.")
+        return value
+
+
+def _same_file(current, uploaded):
+    """Совпадает ли загруженный файл с уже сохраненным"""
+    if not current:
+        return False
+    try:
+        if current.size != uploaded.size:
+            return False
+        with current.storage.open(current.name, "rb") as stored:
+            stored_digest = hashlib.md5(stored.read()).hexdigest()
+    except OSError:
+        return False
+    uploaded.seek(0)
+    uploaded_digest = hashlib.md5(uploaded.read()).hexdigest()
+    uploaded.seek(0)
+    return stored_digest == uploaded_digest
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=RECIPE_BULK_MAX_SIZE,
+    )
@@ -0,0 +1,196 @@
+"""
+Выгрузка списка покупок в текстовом, CSV и JSON форматах.
+
+Готовый файл кэшируется по ключу с версией корзины пользователя.
+С общим кэшем (Redis) версия хранится в нем и меняется после фиксации
+изменений строк ShoppingCart пользователя или ингредиентов рецептов из
+его корзины, поэтому повторная выгрузка не обращается к базе данных.
+Без общего кэша (core.caches.is_shared) версия вычисляется одним
+запросом по строкам корзины.
+"""
+
+import csv
+import hashlib
+import json
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from core.caches import is_shared
+
+from .models import RecipeIngredient
+
+SHOPPING_LIST_FORMATS = {
+    "txt": "text/plain; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+
+def _version_key(user_id):
+    return f"shopping-cart-version:{user_id}"
+
+
+def get_cart_version(user_id):
+    if not is_shared():
+        return _cart_state(user_id)
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _cart_state(user_id):
+    """Версия по строкам корзины и времени изменения ее рецептов"""
+    from core.models import ShoppingCart
+
+    state = ShoppingCart.objects.filter(user_id=user_id).aggregate(
+        count=Count("id"),
+        added=Max("created_at"),
+        changed=Max("recipe__updated_at"),
+    )
+    return hashlib.md5(repr(sorted(state.items())).encode()).hexdigest()
+
+
+def _set_cart_versions(user_ids):
+    cache.set_many(
+        {_version_key(user_id): uuid.uuid4().hex for user_id in user_ids},
+        timeout=None,
+    )
+
+
+def bump_cart_versions(user_ids):
+    """Сбрасывает версии корзин после фиксации текущей транзакции"""
+    if not is_shared():
+        return
+    user_ids = list(user_ids)
+    transaction.on_commit(partial(_set_cart_versions, user_ids))
+
+
+def _bump_recipe_carts(recipe_id):
+    from core.models import ShoppingCart
+
+    _set_cart_versions(
+        ShoppingCart.objects.filter(recipe_id=recipe_id).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+def bump_recipe_cart_versions(recipe_id):
+    """
+    Сбрасывает версии корзин всех пользователей с этим рецептом после
+    фиксации транзакции. Повторные вызовы для рецепта в одной транзакции
+    (сигналы каждой строки ингредиентов) дают один запрос к корзинам.
+    """
+    if not is_shared():
+        return
+    callback = partial(_bump_recipe_carts, recipe_id)
+    connection = transaction.get_connection()
+    if connection.in_atomic_block and any(
+        isinstance(func, partial)
+        and func.func is _bump_recipe_carts
+        and func.args == callback.args
+        for _, func, _ in connection.run_on_commit
+    ):
+        return
+    transaction.on_commit(callback)
+
+
+def get_etag(user_id, version, file_format):
+    digest = hashlib.md5(
+        f"{user_id}:{version}:{file_format}".encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def get_cached_file(user_id, version, file_format):
+    return cache.get(_file_key(user_id, version, file_format))
+
+
+def stream_shopping_list(user_id, version, file_format):
+    """Отдает файл частями и кэширует его после полной выгрузки"""
+    chunks = []
+    for chunk in RENDERERS[file_format](_ingredients(user_id)):
+        chunk = chunk.encode("utf-8")
+        chunks.append(chunk)
+        yield chunk
+    cache.set(
+        _file_key(user_id, version, file_format),
+        b"".join(chunks),
+        settings.SHOPPING_LIST_CACHE_TIMEOUT,
+    )
+
+
+def _file_key(user_id, version, file_format):
+    return f"shopping-list:{user_id}:{version}:{file_format}"
+
+
+def _ingredients(user_id):
+    return (
+        RecipeIngredient.objects.filter(
+            recipe__in_shopping_carts__user_id=user_id
+        )
+        .values("ingredient__name", "ingredient__measurement_unit")
+        .annotate(total_amount=Sum("amount"))
+        .order_by("ingredient__name")
+        .iterator()
+    )
+
+
+def _render_txt(ingredients):
+    yield "Shopping List\n"
+    for item in ingredients:
+        yield (
+            f"\n{item['ingredient__name']} "
+            f"({item['ingredient__measurement_unit']}) - "
+            f"{item['total_amount']}"
+        )
+
+
+class _Echo:
+    """Буфер для csv.writer, возвращающий записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def _render_csv(ingredients):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(("name", "measurement_unit", "amount"))
+    for item in ingredients:
+        yield writer.writerow(
+            (
+                item["ingredient__name"],
+                item["ingredient__measurement_unit"],
+                item["total_amount"],
+            )
+        )
+
+
+def _render_json(ingredients):
+    separator = "["
+    for item in ingredients:
+        yield separator + json.dumps(
+            {
+                "name": item["ingredient__name"],
+                "measurement_unit": item["ingredient__measurement_unit"],
+                "amount": item["total_amount"],
+            },
+            ensure_ascii=False,
+        )
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+RENDERERS = {
+    "txt": _render_txt,
+    "csv": _render_csv,
+    "json": _render_json,
+}
@@ -1,38 +1,200 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from backend.pagination import RecipePagination
+from core.caches import is_shared
+from core.conditional import ConditionalGetMixin, make_etag, version_parts
 from core.models import FavoriteRecipe, ShoppingCart
+from core.response_cache import (
+    RECIPES_LIST,
+    TAGS,
+    AnonymousResponseCacheMixin,
+    recipe_version,
+    relations_version,
+    user_version,
+)
+from core.user_lists import add_recipes, remove_recipes
+from user.serializers import RecipeMinifiedSerializer
+
+from .bulk import body_too_large, create_recipes, max_batch_size
 from .filters import RecipeFilter
-from .models import Recipe, RecipeIngredient
+from .models import Recipe
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (
-    RecipeCreateUpdateSerializer,
-    RecipeListSerializer,
-    RecipeMinifiedSerializer,
+    RecipeCreateSerializer,
+    RecipeIdsSerializer,
+    RecipeSerializer,
     RecipeShortLinkSerializer,
 )
+from .shopping_list import (
+    SHOPPING_LIST_FORMATS,
+    get_cached_file,
+    get_cart_version,
+    get_etag,
+    stream_shopping_list,
+)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ConditionalGetMixin, AnonymousResponseCacheMixin, viewsets.ModelViewSet
+):
     queryset = Recipe.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
+    pagination_class = RecipePagination
 
     def get_permissions(self):
         if self.action in ["list", "retrieve", "get_link"]:
             return [AllowAny()]
         return [IsAuthorOrReadOnly()]
 
+    def get_queryset(self):
+        if self.action in ("list", "retrieve"):
+            return Recipe.objects.for_user(self.request.user)
+        if self.action in ("update", "partial_update"):
+            # Сериализатор сравнивает данные с рецептом, прочитанным под
+            # блокировкой: параллельные изменения применяются по очереди
+            return Recipe.objects.select_for_update()
+        return super().get_queryset()
+
+    def get_cache_versions(self, request):
+        if self.action == "list":
+            return [RECIPES_LIST]
+        if not self.kwargs["pk"].isdigit():
+            return None
+        return [recipe_version(int(self.kwargs["pk"])), TAGS]
+
+    def get_miss_cache_versions(self, request):
+        if self.action != "retrieve":
+            return []
+        author_id = (
+            Recipe.objects.filter(pk=self.kwargs["pk"])
+            .values_list("author_id", flat=True)
+            .first()
+        )
+        return [] if author_id is None else [user_version(author_id)]
+
+    def get_validators(self, request):
+        if not is_shared():
+            return None
+        user = request.user
+        if self.action == "list":
+            versions = [RECIPES_LIST]
+            if user.is_authenticated:
+                versions.append(relations_version(user.id))
+            return make_etag(user.id, *version_parts(versions)), None
+
+        pk = self.kwargs["pk"]
+        if not pk.isdigit():
+            return None
+        row = (
+            Recipe.objects.with_user_flags(user)
+            .filter(pk=pk)
+            .values_list(
+                "updated_at",
+                "author_id",
+                # Заполняется фоновой задачей без изменения updated_at
+                "image_variants",
+                "is_favorited",
+                "is_in_shopping_cart",
+                "author_is_subscribed",
+            )
+            .first()
+        )
+        if row is None:
+            return None
+        versions = [recipe_version(int(pk)), user_version(row[1]), TAGS]
+        return make_etag(user.id, *row, *version_parts(versions)), None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            partial(self.cached_response, super().list),
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            partial(self.cached_response, super().retrieve),
+            request,
+            *args,
+            **kwargs,
+        )
+
     def get_serializer_class(self):
         if self.action in ("create", "update", "partial_update"):
-            return RecipeCreateUpdateSerializer
-        return RecipeListSerializer
+            return RecipeCreateSerializer
+        return RecipeSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def bulk(self, request):
+        """Создание пакета рецептов с ошибками по каждому элементу"""
+        # Тело JSON читается DRF без проверки DATA_UPLOAD_MAX_MEMORY_SIZE
+        if body_too_large(request):
+            return Response(
+                {
+                    "errors": "Request body exceeds "
+                    f"{settings.DATA_UPLOAD_MAX_MEMORY_SIZE} bytes"
+                },
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"errors": "Expected a non-empty list of recipes"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > max_batch_size():
+            return Response(
+                {"errors": f"At most {max_batch_size()} recipes per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        created, errors = create_recipes(
+            items, request.user, self.get_serializer_context()
+        )
+        data = {
+            "created": [
+                {"index": index, "id": recipe.id, "name": recipe.name}
+                for index, recipe in created
+            ],
+            "errors": [
+                {"index": index, "errors": errors[index]}
+                for index in sorted(errors)
+            ],
+        }
+        if not created:
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+        if errors:
+            return Response(data, status=status.HTTP_207_MULTI_STATUS)
+        return Response(data, status=status.HTTP_201_CREATED)
 
     @action(
         detail=True,
@@ -60,59 +222,100 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def download_shopping_cart(self, request):
-        """Download shopping cart as a text file."""
-        ingredients = (
-            RecipeIngredient.objects.filter(
-                recipe__in_shopping_carts__user=request.user
+        """Download shopping cart as a txt, csv or json file."""
+        file_format = request.query_params.get("file_format", "txt")
+        if file_format not in SHOPPING_LIST_FORMATS:
+            return Response(
+                {
+                    "file_format": "Supported formats: "
+                    + ", ".join(SHOPPING_LIST_FORMATS)
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            .values("ingredient__name", "ingredient__measurement_unit")
-            .annotate(total_amount=Sum("amount"))
-            .order_by("ingredient__name")
-        )
 
-        shopping_list_lines = ["Shopping List\n"]
+        user_id = request.user.id
+        version = get_cart_version(user_id)
+        etag = get_etag(user_id, version, file_format)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
 
-        for item in ingredients:
-            shopping_list_lines.append(
-                f"{item['ingredient__name']} "
-                f"({item['ingredient__measurement_unit']}) - "
-                f"{item['total_amount']}"
+        content = get_cached_file(user_id, version, file_format)
+        if content is not None:
+            response = HttpResponse(
+                content, content_type=SHOPPING_LIST_FORMATS[file_format]
             )
-
-        shopping_list = "\n".join(shopping_list_lines)
-
-        response = HttpResponse(shopping_list, content_type="text/plain")
+        else:
+            response = StreamingHttpResponse(
+                stream_shopping_list(user_id, version, file_format),
+                content_type=SHOPPING_LIST_FORMATS[file_format],
+            )
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
         response["Content-Disposition"] = (
-            'attachment; filename="shopping_list.txt"'
+            f'attachment; filename="shopping_list.{file_format}"'
         )
         return response
 
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="favorite",
+    )
+    def favorite_batch(self, request):
+        return self._add_or_remove_recipes(request, FavoriteRecipe)
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[permissions.IsAuthenticated],
+        url_path="shopping_cart",
+    )
+    def shopping_cart_batch(self, request):
+        return self._add_or_remove_recipes(request, ShoppingCart)
+
     def _add_or_remove_recipe(self, request, pk, model_class, list_name):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        user = request.user
+        """Один оператор INSERT/DELETE; рецепт читается только для ответа"""
+        if not pk.isdigit():
+            raise Http404
+        recipe_id = int(pk)
 
         if request.method == "POST":
-            _, created = model_class.objects.get_or_create(
-                user=user, recipe=recipe
-            )
-            if not created:
+            if not add_recipes(model_class, request.user.id, [recipe_id]):
+                # Ничего не вставлено: рецепта нет или он уже в списке
+                get_object_or_404(Recipe, pk=recipe_id)
                 return Response(
                     {"errors": f"Recipe is already in your {list_name}"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            serializer = RecipeMinifiedSerializer(recipe)
+            serializer = RecipeMinifiedSerializer(
+                Recipe.objects.get(pk=recipe_id),
+                context=self.get_serializer_context(),
+            )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         # DELETE method
-        item = model_class.objects.filter(user=user, recipe=recipe)
-        if not item.exists():
+        if not remove_recipes(model_class, request.user.id, [recipe_id]):
+            get_object_or_404(Recipe, pk=recipe_id)
             return Response(
                 {"errors": f"Recipe is not in your {list_name}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        item.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def _add_or_remove_recipes(self, request, model_class):
+        """Пакет рецептов одним оператором; в ответе id измененных"""
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data["recipes"]
+        if request.method == "POST":
+            changed = add_recipes(model_class, request.user.id, recipe_ids)
+        else:
+            changed = remove_recipes(model_class, request.user.id, recipe_ids)
+        return Response({"recipes": changed})
+
     @action(detail=True, methods=["get"], url_path="get-link")
     def get_link(self, request, pk=None):
         recipe = self.get_object()
@@ -29,7 +29,7 @@ fi
 
 # Load ingredients data
 echo "Loading ingredients data..."
-python3 load_ingredients.py && echo "✅ Ingredients loaded successfully" || echo "❌ Error loading ingredients"
+python3 manage.py load_ingredients && echo "✅ Ingredients loaded successfully" || echo "❌ Error loading ingredients"
 
 # Load demo data if requested
 if [[ "${DEMO_DATA}" == "1" ]]; then
@@ -0,0 +1,157 @@
+import base64
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from rest_framework.test import APIClient
+
+from core.benchmark import SCALES
+from core.models import FavoriteRecipe, ShoppingCart, Subscription
+from ingredient.models import Ingredient
+from recipe.models import Recipe, RecipeIngredient, Tag
+from user.models import User
+
+# Прозрачный PNG 1x1
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwAD"
+    "hgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("endpoint benchmark")
+    group.addoption(
+        "--endpoint-scale",
+        action="append",
+        choices=SCALES,
+        help="Dataset scale for test_endpoint_benchmark (default: small)",
+    )
+    group.addoption("--endpoint-repeat", type=int, default=5)
+    group.addoption("--endpoint-warmup", type=int, default=1)
+    group.addoption(
+        "--endpoint-save",
+        type=Path,
+        help="Write endpoint timings as a JSON baseline",
+    )
+    group.addoption(
+        "--endpoint-compare",
+        type=Path,
+        help="Fail on regressions against a JSON baseline",
+    )
+    group.addoption(
+        "--endpoint-threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown of median and p95",
+    )
+    group.addoption(
+        "--endpoint-min-delta-ms",
+        type=float,
+        default=1.0,
+        help="Ignore slowdowns smaller than this, in milliseconds",
+    )
+
+
+@pytest.fixture(autouse=True)
+def test_settings(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.MD5PasswordHasher"
+    ]
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    # Файловый кэш общий для процессов, как Redis
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        }
+    }
+
+
+def make_user(index):
+    return User.objects.create_user(
+        username=f"user{index}",
+        email=f"user{index}@example.com",
+        password="test-password-123",
+        first_name=f"Имя{index}",
+        last_name=f"Фамилия{index}",
+    )
+
+
+@pytest.fixture
+def user(db):
+    return make_user(0)
+
+
+@pytest.fixture
+def author(db):
+    return make_user(1)
+
+
+@pytest.fixture
+def tags(db):
+    return [
+        Tag.objects.create(name=name, slug=slug, color="#000000")
+        for name, slug in (("Завтрак", "breakfast"), ("Обед", "lunch"))
+    ]
+
+
+@pytest.fixture
+def ingredients(db):
+    return [
+        Ingredient.objects.create(
+            name=f"Ингредиент {index}", measurement_unit="г"
+        )
+        for index in range(5)
+    ]
+
+
+@pytest.fixture
+def make_recipe(author, tags, ingredients):
+    def make_recipe(index, recipe_author=None):
+        recipe = Recipe(
+            name=f"Рецепт {index}",
+            text="Описание",
+            cooking_time=10,
+            author=recipe_author or author,
+        )
+        recipe.image.save(f"recipe{index}.png", ContentFile(PNG), save=False)
+        recipe.save()
+        recipe.tags.set(tags)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=10)
+            for ingredient in ingredients
+        )
+        return recipe
+
+    return make_recipe
+
+
+@pytest.fixture
+def recipes(make_recipe, user, author):
+    """15 рецептов; часть в избранном и корзине пользователя"""
+    recipes = [make_recipe(index) for index in range(15)]
+    for recipe in recipes[::2]:
+        FavoriteRecipe.objects.create(user=user, recipe=recipe)
+        ShoppingCart.objects.create(user=user, recipe=recipe)
+    Subscription.objects.create(user=user, subscribed_to=author)
+    return recipes
+
+
+@pytest.fixture
+def anonymous_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
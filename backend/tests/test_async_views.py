@@ -0,0 +1,129 @@
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches
+from rest_framework.authtoken.models import Token
+
+from backend import urls
+
+pytestmark = pytest.mark.django_db
+
+RECIPES_URL = "/api/recipes/"
+
+
+@pytest.fixture
+def use_async_views(settings):
+    """Включает асинхронные маршруты после запросов к синхронным"""
+    enabled = settings.ASYNC_READ_VIEWS
+
+    def use_async_views():
+        settings.ASYNC_READ_VIEWS = True
+        importlib.reload(urls)
+        clear_url_caches()
+
+    yield use_async_views
+    settings.ASYNC_READ_VIEWS = enabled
+    importlib.reload(urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def token(user):
+    return Token.objects.create(user=user).key
+
+
+def sync_get(client, url, token=None, etag=None):
+    headers = {}
+    if token:
+        headers["Authorization"] = f"Token {token}"
+    if etag:
+        headers["If-None-Match"] = etag
+    return client.get(url, headers=headers)
+
+
+def async_get(url, token=None, etag=None):
+    return async_to_sync(sync_get)(AsyncClient(), url, token, etag)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        RECIPES_URL,
+        f"{RECIPES_URL}?limit=3&page=2",
+        f"{RECIPES_URL}?is_favorited=1",
+        "/api/ingredients/?name=Инг",
+    ],
+)
+def test_list_matches_sync_view(
+    use_async_views, anonymous_client, token, recipes, url
+):
+    expected = [
+        sync_get(anonymous_client, url).json(),
+        sync_get(anonymous_client, url, token).json(),
+    ]
+    use_async_views()
+
+    assert [async_get(url).json(), async_get(url, token).json()] == expected
+
+
+def test_detail_matches_sync_view(
+    use_async_views, anonymous_client, token, author, recipes
+):
+    urls = [f"{RECIPES_URL}{recipes[0].pk}/", f"/api/users/{author.pk}/"]
+    expected = [
+        sync_get(anonymous_client, url, key).json()
+        for url in urls
+        for key in (None, token)
+    ]
+    use_async_views()
+
+    assert [
+        async_get(url, key).json() for url in urls for key in (None, token)
+    ] == expected
+
+
+def test_invalid_token_rejected(use_async_views, recipes):
+    use_async_views()
+
+    response = async_get(RECIPES_URL, "invalid")
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"] == "Token"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [RECIPES_URL, "recipe", "author", "/api/ingredients/?name=Инг"],
+)
+def test_not_modified(
+    use_async_views, shared_cache, token, author, recipes, url
+):
+    url = {
+        "recipe": f"{RECIPES_URL}{recipes[0].pk}/",
+        "author": f"/api/users/{author.pk}/",
+    }.get(url, url)
+    use_async_views()
+
+    response = async_get(url, token)
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "private, no-cache"
+
+    response = async_get(url, token, response["ETag"])
+    assert response.status_code == 304
+    assert not response.content
+
+
+def test_anonymous_response_cached(
+    settings, use_async_views, recipes, django_assert_num_queries
+):
+    settings.RESPONSE_CACHE_ENABLED = True
+    url = f"{RECIPES_URL}{recipes[0].pk}/"
+    use_async_views()
+
+    first = async_get(url)
+    assert first["X-Cache"] == "MISS"
+    with django_assert_num_queries(0):
+        second = async_get(url)
+    assert second["X-Cache"] == "HIT"
+    assert second.json() == first.json()
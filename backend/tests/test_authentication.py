@@ -0,0 +1,104 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import authentication, lru
+from core.models import Subscription
+from user.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user)}"
+    )
+    return client
+
+
+def expire_lru(monkeypatch):
+    now = lru.time.monotonic()
+    monkeypatch.setattr(
+        lru.time,
+        "monotonic",
+        lambda: now + authentication._users.ttl + 1,
+    )
+
+
+def deactivate_elsewhere(user):
+    # Другой процесс: сигналы этого процесса не срабатывают
+    User.objects.filter(pk=user.pk).update(is_active=False)
+
+
+def test_process_cache_not_used_for_tokens(monkeypatch, token_client, user):
+    assert token_client.get("/api/users/me/").status_code == 200
+    key = Token.objects.get(user=user).key
+    assert cache.get(authentication._cache_key(key)) is None
+
+    deactivate_elsewhere(user)
+    expire_lru(monkeypatch)
+
+    assert token_client.get("/api/users/me/").status_code == 401
+
+
+def test_shared_cache_used_for_tokens(
+    monkeypatch, shared_cache, token_client, user, django_assert_num_queries
+):
+    assert token_client.get("/api/users/me/").status_code == 200
+    expire_lru(monkeypatch)
+
+    key = Token.objects.get(user=user).key
+    with django_assert_num_queries(0):
+        assert authentication.get_token_user(key) == user
+
+
+def test_cached_user_keeps_counters_on_save(token_client, user, author):
+    assert token_client.get("/api/users/me/").status_code == 200
+    # Подписка меняет счетчик UPDATE-ом, пользователь токена в LRU
+    # остается прежним до фиксации транзакции
+    author_client = APIClient()
+    author_client.force_authenticate(author)
+    response = author_client.post(f"/api/users/{user.id}/subscribe/")
+    assert response.status_code == 201
+    user.refresh_from_db()
+    assert user.subscribers_count == 1
+
+    response = token_client.post(
+        "/api/users/set_email/",
+        {
+            "new_email": "new@example.com",
+            "current_password": "test-password-123",
+        },
+    )
+    assert response.status_code == 204
+
+    user.refresh_from_db()
+    assert user.email == "new@example.com"
+    assert user.subscribers_count == 1
+
+
+def test_counter_change_forgets_cached_user(
+    shared_cache,
+    token_client,
+    user,
+    author,
+    django_capture_on_commit_callbacks,
+):
+    assert token_client.get("/api/users/me/").status_code == 200
+    key = authentication._cache_key(Token.objects.get(user=user).key)
+    assert cache.get(key) is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Subscription.objects.create(user=author, subscribed_to=user)
+
+    assert cache.get(key) is None
+    assert authentication._users.get(key) is None
+    assert (
+        authentication.get_token_user(
+            Token.objects.get(user=user).key
+        ).subscribers_count
+        == 1
+    )
@@ -0,0 +1,66 @@
+import base64
+import json
+
+import pytest
+
+from recipe.models import Recipe
+
+from .conftest import PNG
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/recipes/bulk/"
+IMAGE = "data:image/png;base64," + base64.b64encode(PNG).decode()
+
+
+@pytest.fixture
+def make_items(tags, ingredients):
+    def make_items(count):
+        return [
+            {
+                "name": f"Пакетный рецепт {index}",
+                "text": "Описание",
+                "cooking_time": 5,
+                "image": IMAGE,
+                "tags": [tag.id for tag in tags],
+                "ingredients": [
+                    {"id": ingredient.id, "amount": 10}
+                    for ingredient in ingredients
+                ],
+            }
+            for index in range(count)
+        ]
+
+    return make_items
+
+
+def test_bulk_size_derived_from_body_limit(settings, user_client, make_items):
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024
+    settings.RECIPE_BULK_ITEM_SIZE = 2 * 1024
+
+    response = user_client.post(URL, make_items(6), format="json")
+
+    assert response.status_code == 400
+    assert response.data == {"errors": "At most 5 recipes per request"}
+
+
+def test_bulk_body_over_limit_rejected(settings, user_client, make_items):
+    items = make_items(5)
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = len(json.dumps(items)) // 2
+
+    response = user_client.post(URL, items, format="json")
+
+    assert response.status_code == 413
+    assert not Recipe.objects.exists()
+
+
+def test_bulk_query_count(
+    user_client, user, make_items, django_assert_num_queries
+):
+    # Теги, ингредиенты, три bulk_create, счетчик автора, токены автора
+    # для сброса кэша аутентификации и точка сохранения транзакции
+    with django_assert_num_queries(9):
+        response = user_client.post(URL, make_items(50), format="json")
+
+    assert response.status_code == 201
+    assert Recipe.objects.filter(author=user).count() == 50
@@ -0,0 +1,121 @@
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.images import record_derivatives
+from recipe.models import Recipe
+from user.models import User
+
+pytestmark = pytest.mark.django_db
+
+RECIPES_URL = "/api/recipes/"
+INGREDIENTS_URL = "/api/ingredients/"
+ME_URL = "/api/users/me/"
+
+
+def get(client, url, etag=None, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(url, params, headers=headers)
+
+
+def test_recipe_list_revalidated_from_versions(
+    shared_cache, user_client, recipes, django_assert_num_queries
+):
+    etag = get(user_client, RECIPES_URL)["ETag"]
+
+    with django_assert_num_queries(0):
+        response = get(user_client, RECIPES_URL, etag)
+    assert response.status_code == 304
+
+
+def test_recipe_list_etag_follows_user_relations(
+    shared_cache, user_client, recipes, django_capture_on_commit_callbacks
+):
+    etag = get(user_client, RECIPES_URL)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(f"{RECIPES_URL}{recipes[1].pk}/favorite/")
+    assert response.status_code == 201
+
+    response = get(user_client, RECIPES_URL, etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_recipe_list_without_validators_on_process_cache(user_client, recipes):
+    response = get(user_client, RECIPES_URL)
+    assert response.status_code == 200
+    assert "ETag" not in response
+
+
+def test_ingredient_search_revalidated_from_index(
+    anonymous_client, ingredients, django_assert_num_queries
+):
+    etag = get(anonymous_client, INGREDIENTS_URL, name="Инг")["ETag"]
+
+    with django_assert_num_queries(0):
+        response = get(anonymous_client, INGREDIENTS_URL, etag, name="Инг")
+    assert response.status_code == 304
+
+
+def derivatives_recorded_elsewhere(model, pk, field_name, name):
+    # Фоновая задача другого процесса: сигналы этого процесса не
+    # срабатывают, версии не сбрасываются
+    model.objects.filter(pk=pk).update(
+        **{
+            field_name: name,
+            f"{field_name}_variants": {"source": name, "variants": ["thumb"]},
+        }
+    )
+
+
+def test_recipe_detail_etag_follows_image_variants(
+    shared_cache, user_client, recipes
+):
+    recipe = recipes[0]
+    url = f"{RECIPES_URL}{recipe.pk}/"
+    etag = get(user_client, url)["ETag"]
+
+    derivatives_recorded_elsewhere(
+        Recipe, recipe.pk, "image", recipe.image.name
+    )
+
+    response = get(user_client, url, etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_user_detail_etag_follows_avatar_variants(user_client, author):
+    url = f"/api/users/{author.pk}/"
+    derivatives_recorded_elsewhere(User, author.pk, "avatar", "users/a.png")
+    etag = get(user_client, url)["ETag"]
+
+    User.objects.filter(pk=author.pk).update(
+        avatar_variants={
+            "source": "users/a.png",
+            "variants": ["thumb", "webp"],
+        }
+    )
+
+    response = get(user_client, url, etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_me_etag_follows_avatar_variants(
+    user, django_capture_on_commit_callbacks
+):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user)}"
+    )
+    User.objects.filter(pk=user.pk).update(avatar="users/a.png")
+    etag = get(client, ME_URL)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert record_derivatives(User, user.pk, "avatar", "users/a.png")
+
+    response = get(client, ME_URL, etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert response.json()["avatar_variants"]
@@ -0,0 +1,119 @@
+import pytest
+from django.core.management import call_command
+
+from core.models import FavoriteRecipe, ShoppingCart, Subscription
+from recipe.models import Recipe
+from tests.conftest import make_user
+from user.models import User
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/recipes/"
+
+
+@pytest.fixture
+def items(make_recipe):
+    return [make_recipe(index) for index in range(3)]
+
+
+def counts(model, field, objects):
+    values = dict(
+        model.objects.filter(pk__in=[obj.pk for obj in objects]).values_list(
+            "pk", field
+        )
+    )
+    return [values[obj.pk] for obj in objects]
+
+
+@pytest.mark.parametrize(
+    ("path", "field"),
+    [("favorite", "favorites_count"), ("shopping_cart", "in_carts_count")],
+)
+def test_add_and_remove_one(user_client, items, path, field):
+    url = f"{URL}{items[0].pk}/{path}/"
+    assert user_client.post(url).status_code == 201
+    # Повторное добавление не меняет счетчик
+    assert user_client.post(url).status_code == 400
+    assert counts(Recipe, field, items) == [1, 0, 0]
+
+    assert user_client.delete(url).status_code == 204
+    assert user_client.delete(url).status_code == 400
+    assert counts(Recipe, field, items) == [0, 0, 0]
+
+
+@pytest.mark.parametrize(
+    ("path", "field"),
+    [("favorite", "favorites_count"), ("shopping_cart", "in_carts_count")],
+)
+def test_add_and_remove_batch(user_client, items, path, field):
+    url = f"{URL}{path}/"
+    ids = [recipe.pk for recipe in items[:2]]
+    response = user_client.post(url, {"recipes": ids}, format="json")
+    assert sorted(response.data["recipes"]) == ids
+    response = user_client.post(
+        url, {"recipes": [recipe.pk for recipe in items]}, format="json"
+    )
+    assert response.data["recipes"] == [items[2].pk]
+    assert counts(Recipe, field, items) == [1, 1, 1]
+
+    response = user_client.delete(url, {"recipes": ids}, format="json")
+    assert sorted(response.data["recipes"]) == ids
+    assert counts(Recipe, field, items) == [0, 0, 1]
+
+
+def test_subscribers_and_recipes_counts(user, author, items):
+    subscription = Subscription.objects.create(user=user, subscribed_to=author)
+    assert counts(User, "subscribers_count", [author, user]) == [1, 0]
+    assert counts(User, "recipes_count", [author, user]) == [3, 0]
+
+    subscription.delete()
+    items[0].delete()
+    assert counts(User, "subscribers_count", [author, user]) == [0, 0]
+    assert counts(User, "recipes_count", [author, user]) == [2, 0]
+
+
+def test_cascade_delete_updates_counters(user, author, items):
+    other = make_user(2)
+    for follower in (user, other):
+        FavoriteRecipe.objects.create(user=follower, recipe=items[0])
+        ShoppingCart.objects.create(user=follower, recipe=items[1])
+        Subscription.objects.create(user=follower, subscribed_to=author)
+
+    other.delete()
+
+    assert counts(Recipe, "favorites_count", items) == [1, 0, 0]
+    assert counts(Recipe, "in_carts_count", items) == [0, 1, 0]
+    assert counts(User, "subscribers_count", [author]) == [1]
+
+
+def test_counter_does_not_go_below_zero(user, items):
+    favorite = FavoriteRecipe.objects.create(user=user, recipe=items[0])
+    Recipe.objects.filter(pk=items[0].pk).update(favorites_count=0)
+
+    favorite.delete()
+
+    assert counts(Recipe, "favorites_count", items) == [0, 0, 0]
+
+
+def test_recount_repairs_drift(capsys, user, author, items):
+    FavoriteRecipe.objects.create(user=user, recipe=items[0])
+    Subscription.objects.create(user=user, subscribed_to=author)
+    Recipe.objects.filter(pk=items[0].pk).update(favorites_count=5)
+    Recipe.objects.filter(pk=items[1].pk).update(in_carts_count=2)
+    User.objects.filter(pk=author.pk).update(
+        recipes_count=0, subscribers_count=3
+    )
+
+    call_command("recount", "--dry-run")
+    assert counts(Recipe, "favorites_count", items) == [5, 0, 0]
+    assert "recipe.Recipe: 2 rows drifted" in capsys.readouterr().out
+
+    call_command("recount", "--batch-size", "1")
+
+    output = capsys.readouterr().out
+    assert "recipe.Recipe: 2 rows fixed" in output
+    assert "user.User: 1 rows fixed" in output
+    assert counts(Recipe, "favorites_count", items) == [1, 0, 0]
+    assert counts(Recipe, "in_carts_count", items) == [0, 0, 0]
+    assert counts(User, "recipes_count", [author]) == [3]
+    assert counts(User, "subscribers_count", [author]) == [1]
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.datasets import RECIPE_AGE_DAYS, build_dataset
+from recipe.models import Recipe
+
+pytestmark = pytest.mark.django_db
+
+
+def test_recipes_created_at_spread():
+    started = timezone.now()
+
+    build_dataset(users=5, recipes=50, ingredients=20, seed=1)
+
+    created = list(Recipe.objects.values_list("created_at", flat=True))
+    assert len(set(created)) > 40
+    assert min(created) >= started - timedelta(days=RECIPE_AGE_DAYS)
+    assert max(created) <= timezone.now()
+    # Порядок по времени не совпадает с порядком id
+    ids = list(
+        Recipe.objects.order_by("-created_at").values_list("pk", flat=True)
+    )
+    assert ids != sorted(ids, reverse=True)
+
+    # bulk_create снова подставляет время создания
+    assert Recipe._meta.get_field("created_at").auto_now_add
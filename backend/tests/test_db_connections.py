@@ -0,0 +1,117 @@
+import importlib.util
+
+import pytest
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.test import APIClient
+
+from .conftest import make_user
+
+DB_ENV = (
+    "USE_SQLITE",
+    "DB_POOL",
+    "DB_POOL_MIN_SIZE",
+    "DB_POOL_MAX_SIZE",
+    "DB_POOL_TIMEOUT",
+    "DB_POOL_MAX_IDLE",
+    "DB_POOL_MAX_LIFETIME",
+    "DB_CONN_MAX_AGE",
+    "DB_CONN_HEALTH_CHECKS",
+    "DB_REPLICA_HOST",
+    "DB_REPLICA_NAME",
+)
+
+
+@pytest.fixture
+def load_settings(monkeypatch):
+    """Модуль настроек проекта, заново прочитанный с заданным окружением"""
+
+    def load_settings(**env):
+        for name in DB_ENV:
+            monkeypatch.delenv(name, raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        spec = importlib.util.spec_from_file_location(
+            "settings_under_test", settings.BASE_DIR / "backend/settings.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load_settings
+
+
+def test_persistent_connections_by_default(load_settings):
+    default = load_settings().DATABASES["default"]
+
+    assert default["ENGINE"] == "django.db.backends.postgresql"
+    assert default["CONN_MAX_AGE"] == 60
+    assert default["CONN_HEALTH_CHECKS"] is True
+    assert "pool" not in default["OPTIONS"]
+
+
+def test_connection_options_from_environment(load_settings):
+    default = load_settings(
+        DB_CONN_MAX_AGE="0", DB_CONN_HEALTH_CHECKS="0"
+    ).DATABASES["default"]
+
+    assert default["CONN_MAX_AGE"] == 0
+    assert default["CONN_HEALTH_CHECKS"] is False
+
+
+def test_pool_disables_persistent_connections(load_settings):
+    default = load_settings(
+        DB_POOL="1", DB_POOL_MAX_SIZE="20", DB_POOL_TIMEOUT="2.5"
+    ).DATABASES["default"]
+
+    assert default["CONN_MAX_AGE"] == 0
+    assert default["OPTIONS"]["pool"] == {
+        "min_size": 2,
+        "max_size": 20,
+        "timeout": 2.5,
+        "max_idle": 300.0,
+        "max_lifetime": 3600.0,
+    }
+    # Путь поиска схемы сохраняется рядом с настройками пула
+    assert default["OPTIONS"]["options"].startswith("-c search_path=")
+
+
+def test_pool_ignored_on_sqlite(load_settings):
+    default = load_settings(USE_SQLITE="1", DB_POOL="1").DATABASES["default"]
+
+    assert "OPTIONS" not in default
+    assert default["CONN_MAX_AGE"] == 60
+
+
+def test_replica_copies_connection_options(load_settings):
+    databases = load_settings(DB_POOL="1", DB_REPLICA_HOST="replica").DATABASES
+
+    assert databases["replica"]["HOST"] == "replica"
+    assert databases["replica"]["OPTIONS"] == databases["default"]["OPTIONS"]
+    replica_options = databases["replica"]["OPTIONS"]
+    assert replica_options is not databases["default"]["OPTIONS"]
+
+
+@pytest.mark.django_db
+def test_db_stats_reports_configured_mode():
+    admin = make_user(0)
+    admin.is_staff = True
+    admin.save()
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    response = client.get("/api/db-stats/")
+
+    assert response.status_code == 200
+    default = settings.DATABASES[DEFAULT_DB_ALIAS]
+    assert response.data[DEFAULT_DB_ALIAS] == {
+        "mode": "persistent" if default["CONN_MAX_AGE"] else "new",
+        "conn_max_age": default["CONN_MAX_AGE"],
+        "health_checks": default["CONN_HEALTH_CHECKS"],
+    }
+
+
+@pytest.mark.django_db
+def test_db_stats_requires_admin(user_client, anonymous_client):
+    assert anonymous_client.get("/api/db-stats/").status_code == 401
+    assert user_client.get("/api/db-stats/").status_code == 403
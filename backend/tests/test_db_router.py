@@ -0,0 +1,27 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+
+from core.db_router import REPLICA, ReplicaRoutingMiddleware
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASES = {
+        **settings.DATABASES,
+        REPLICA: settings.DATABASES["default"],
+    }
+
+
+def test_replica_requires_shared_cache(replica):
+    with pytest.raises(ImproperlyConfigured):
+        ReplicaRoutingMiddleware(lambda request: HttpResponse())
+
+
+def test_replica_with_shared_cache(replica, shared_cache):
+    assert ReplicaRoutingMiddleware(lambda request: HttpResponse()).enabled
+
+
+def test_process_cache_without_replica():
+    middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse())
+    assert not middleware.enabled
@@ -0,0 +1,72 @@
+"""
+Бюджеты SQL-запросов основных конечных точек на синтетических данных
+нескольких объемов (--endpoint-scale small medium large). Медиана и p95
+сохраняются в JSON (--endpoint-save) и сравниваются с базовой линией
+(--endpoint-compare).
+"""
+
+import json
+
+import pytest
+
+from core.benchmark import (
+    SCALES,
+    budget_failures,
+    endpoint_cases,
+    measure,
+    regressions,
+    save_baseline,
+)
+from core.datasets import build_dataset
+
+# Данные фиксируются: фоновые миниатюры работают в других соединениях
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = metafunc.config.getoption("endpoint_scale") or ["small"]
+        metafunc.parametrize("scale", scales)
+
+
+@pytest.fixture(scope="session")
+def endpoint_results(pytestconfig):
+    results = {}
+    yield results
+    path = pytestconfig.getoption("endpoint_save")
+    if path and results:
+        save_baseline(path, results)
+
+
+@pytest.fixture(scope="session")
+def baseline(pytestconfig):
+    path = pytestconfig.getoption("endpoint_compare")
+    return json.loads(path.read_text()) if path else None
+
+
+def test_endpoint_query_budgets(
+    scale, pytestconfig, endpoint_results, baseline
+):
+    build_dataset(**SCALES[scale], seed=0)
+
+    results = {
+        case.name: measure(
+            case,
+            pytestconfig.getoption("endpoint_repeat"),
+            pytestconfig.getoption("endpoint_warmup"),
+        )
+        for case in endpoint_cases()
+    }
+    endpoint_results[scale] = results
+
+    assert budget_failures({scale: results}) == []
+    if baseline is not None:
+        assert (
+            regressions(
+                baseline,
+                {scale: results},
+                pytestconfig.getoption("endpoint_threshold"),
+                pytestconfig.getoption("endpoint_min_delta_ms"),
+            )
+            == []
+        )
@@ -0,0 +1,66 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/recipes/"
+
+
+@pytest.fixture
+def tagged(make_recipe, tags):
+    """Рецепты с тегами: только завтрак, только обед, оба"""
+    breakfast, lunch = tags
+    recipes = {}
+    for index, (name, recipe_tags) in enumerate(
+        (
+            ("breakfast", [breakfast]),
+            ("lunch", [lunch]),
+            ("both", [breakfast, lunch]),
+        )
+    ):
+        recipe = make_recipe(index)
+        recipe.tags.set(recipe_tags)
+        recipes[recipe.pk] = name
+    return recipes
+
+
+def found(client, tagged, **params):
+    response = client.get(URL, params)
+    assert response.status_code == 200, response.data
+    results = [tagged[recipe["id"]] for recipe in response.data["results"]]
+    assert response.data["count"] == len(results)
+    return sorted(results)
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        ({"tags": ["breakfast"]}, ["both", "breakfast"]),
+        # Рецепт с обоими тегами не повторяется
+        ({"tags": ["breakfast", "lunch"]}, ["both", "breakfast", "lunch"]),
+        (
+            {"tags": ["breakfast", "lunch"], "tags_mode": "any"},
+            ["both", "breakfast", "lunch"],
+        ),
+        ({"tags": ["breakfast", "lunch"], "tags_mode": "all"}, ["both"]),
+        ({"tags": ["lunch"], "tags_mode": "all"}, ["both", "lunch"]),
+        # Повторный слаг не увеличивает требуемое число тегов
+        (
+            {"tags": ["lunch", "lunch"], "tags_mode": "all"},
+            ["both", "lunch"],
+        ),
+        ({"tags": ["unknown"]}, []),
+        ({"tags": ["breakfast", "unknown"]}, ["both", "breakfast"]),
+        ({"tags": ["breakfast", "unknown"], "tags_mode": "all"}, []),
+        ({"tags_mode": "all"}, ["both", "breakfast", "lunch"]),
+    ],
+)
+def test_tags_modes(anonymous_client, tagged, params, expected):
+    assert found(anonymous_client, tagged, **params) == expected
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"tags": ["not a slug"]}, {"tags": ["lunch"], "tags_mode": "none"}],
+)
+def test_invalid_tags_rejected(anonymous_client, tagged, params):
+    assert anonymous_client.get(URL, params).status_code == 400
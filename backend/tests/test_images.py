@@ -0,0 +1,60 @@
+import pytest
+
+from core.images import generate_derivatives, get_variants, record_derivatives
+from recipe.models import Recipe
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def recipe(make_recipe):
+    return make_recipe(0)
+
+
+def image_variants(client, recipe):
+    response = client.get(f"/api/recipes/{recipe.pk}/")
+    assert response.status_code == 200
+    return response.data["image_variants"]
+
+
+def test_variants_appear_when_generation_finishes(
+    settings, anonymous_client, recipe, django_capture_on_commit_callbacks
+):
+    settings.RESPONSE_CACHE_ENABLED = True
+    assert image_variants(anonymous_client, recipe) == {}
+
+    generate_derivatives(recipe.image.name)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert record_derivatives(
+            Recipe, recipe.pk, "image", recipe.image.name
+        )
+
+    # Версия рецепта сброшена: ответ из кэша не отдает пустые варианты
+    assert set(image_variants(anonymous_client, recipe)) == set(get_variants())
+
+
+def test_variants_of_replaced_image_are_not_recorded(recipe):
+    old_name = recipe.image.name
+    Recipe.objects.filter(pk=recipe.pk).update(image="recipes/other.png")
+
+    assert not record_derivatives(Recipe, recipe.pk, "image", old_name)
+
+
+def test_variants_ignore_stale_source(anonymous_client, recipe):
+    Recipe.objects.filter(pk=recipe.pk).update(
+        image_variants={"source": "recipes/old.png", "variants": ["webp"]}
+    )
+
+    assert image_variants(anonymous_client, recipe) == {}
+
+
+def test_serialization_does_not_touch_storage(
+    monkeypatch, anonymous_client, recipe
+):
+    record_derivatives(Recipe, recipe.pk, "image", recipe.image.name)
+    monkeypatch.setattr(
+        "django.core.files.storage.FileSystemStorage.exists",
+        lambda *args: pytest.fail("storage.exists() called"),
+    )
+
+    assert image_variants(anonymous_client, recipe)
@@ -0,0 +1,106 @@
+import pytest
+
+from ingredient import search
+from ingredient.models import Ingredient
+from ingredient.search import IngredientIndex, prefix_distance
+
+NAMES = [
+    (1, "Молоко", "мл"),
+    (2, "молоко топленое", "мл"),
+    (3, "Мука пшеничная", "г"),
+    (4, "Мед", "г"),
+    (5, "Малина", "г"),
+    (6, "Сахар", "г"),
+]
+
+
+@pytest.fixture
+def index():
+    return IngredientIndex(NAMES)
+
+
+def ids(items):
+    return [item["id"] for item in items]
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("мол", [1, 2]),
+        ("  МОЛОКО   т", [2]),
+        ("м", [5, 4, 1, 2, 3]),
+        ("молоко топленое и", []),
+        ("хлеб", []),
+    ],
+)
+def test_prefix(index, query, expected):
+    assert ids(index.prefix(query)) == expected
+
+
+def test_prefix_limit(index):
+    assert ids(index.prefix("м", limit=2)) == [5, 4]
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        # Одна опечатка для коротких запросов
+        ("малоко", [1, 2]),
+        ("сохар", [6]),
+        # Две опечатки для длинных
+        ("мукка пшенишная", [3]),
+        # Короткий запрос без нечеткого поиска
+        ("мд", []),
+        ("ссаахаарр", []),
+    ],
+)
+def test_fuzzy(index, query, expected):
+    assert ids(index.fuzzy(query)) == expected
+
+
+def test_search_adds_fuzzy_after_prefix(index):
+    assert ids(index.search("мол")) == [1, 2]
+    assert ids(index.search("мол", fuzzy=True)) == [1, 2, 5]
+    assert ids(index.search("мол", limit=2, fuzzy=True)) == [1, 2]
+    assert ids(index.search("малоко", fuzzy=True)) == [1, 2]
+
+
+def test_prefix_distance():
+    assert prefix_distance("малоко", "молоко топленое", 2) == 1
+    assert prefix_distance("млко", "молоко", 2) == 2
+    assert prefix_distance("молоко", "молоко топленое", 0) == 0
+    assert prefix_distance("кефир", "молоко", 2) is None
+
+
+@pytest.mark.django_db
+def test_index_follows_database(settings, ingredients):
+    settings.INGREDIENT_INDEX_CHECK_INTERVAL = 0
+    search.invalidate_index()
+    first = search.get_index()
+    assert len(first.items) == len(ingredients)
+    assert search.get_index() is first
+
+    # Изменение в другом процессе: сигналы здесь не срабатывают
+    Ingredient.objects.bulk_create(
+        [Ingredient(name="Новый", measurement_unit="г")]
+    )
+    index = search.get_index()
+    assert index is not first
+    assert ids(index.prefix("нов")) == [
+        Ingredient.objects.get(name="Новый").pk
+    ]
+
+
+@pytest.mark.django_db
+def test_ingredient_list_search(anonymous_client, ingredients):
+    Ingredient.objects.create(name="Молоко", measurement_unit="мл")
+
+    response = anonymous_client.get(
+        "/api/ingredients/", {"name": "малоко", "fuzzy": "1"}
+    )
+    assert [item["name"] for item in response.json()] == ["Молоко"]
+
+    response = anonymous_client.get(
+        "/api/ingredients/", {"name": "инг", "limit": "2"}
+    )
+    assert len(response.json()) == 2
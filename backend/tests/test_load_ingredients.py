@@ -0,0 +1,164 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from ingredient.management.commands.load_ingredients import _json_items
+from ingredient.models import Ingredient
+
+
+def items(text, chunk_size=4):
+    return list(_json_items(io.StringIO(text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        [],
+        [{"name": "соль", "measurement_unit": "г"}],
+        [
+            {"name": 'кавычки " и \\ слеш', "measurement_unit": "°C"},
+            {"name": "вложенный", "extra": {"list": [1, [2, {"3": None}]]}},
+        ],
+        [1234567890.125, -1e-10, "строка, с запятой ]", True, None],
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 3, 64 * 1024])
+def test_json_items_match_json_loads(value, chunk_size):
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+
+    assert items(text, chunk_size) == value
+
+
+def test_json_items_escaped_unicode():
+    assert items('["\\u0441\\u043e\\u043b\\u044c"]', chunk_size=2) == ["соль"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        '{"name": "соль"}',
+        '[{"name": "соль"}',
+        '[{"name": "соль"} {"name": "сахар"}]',
+        '[{"name": "соль"},]',
+        '[{"name": "соль",}]',
+        '["незакрытая строка]',
+    ],
+)
+def test_json_items_malformed(text):
+    with pytest.raises(json.JSONDecodeError):
+        items(text)
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+@pytest.mark.django_db
+def test_load_json_and_rerun(tmp_path, capsys):
+    path = write(
+        tmp_path,
+        "ingredients.json",
+        json.dumps(
+            [
+                {"name": " соль ", "measurement_unit": "г"},
+                {"name": "соль", "measurement_unit": "г"},
+                {"name": "соль", "measurement_unit": "щепотка"},
+                {"name": "", "measurement_unit": "г"},
+                ["не", "объект"],
+                {"name": "сахар"},
+            ],
+            ensure_ascii=False,
+        ),
+    )
+
+    call_command("load_ingredients", str(path), "--batch-size", "1")
+    assert (
+        "created: 2, skipped (already exist): 0, duplicates in file: 1, "
+        "invalid rows: 3"
+    ) in capsys.readouterr().out
+    assert sorted(
+        Ingredient.objects.values_list("name", "measurement_unit")
+    ) == [("соль", "г"), ("соль", "щепотка")]
+
+    call_command("load_ingredients", str(path))
+    assert "created: 0, skipped (already exist): 2" in capsys.readouterr().out
+    assert Ingredient.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_load_csv_dry_run(tmp_path, capsys):
+    path = write(tmp_path, "ingredients.csv", "соль,г\nсахар,г\nбез единицы\n")
+
+    call_command("load_ingredients", str(path), "--dry-run")
+
+    output = capsys.readouterr().out
+    assert "Dry run: created: 2" in output
+    assert "invalid rows: 1" in output
+    assert not Ingredient.objects.exists()
+
+
+@pytest.mark.django_db
+def test_load_invalid_json(tmp_path):
+    path = write(tmp_path, "ingredients.json", '[{"name": "соль"')
+
+    with pytest.raises(CommandError, match="Invalid JSON"):
+        call_command("load_ingredients", str(path))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_duplicates_merged_before_unique_constraint():
+    before = [("ingredient", "0003_ingredient_updated_at")]
+    executor = MigrationExecutor(connection)
+    executor.migrate(before)
+    executor.loader.build_graph()
+    apps = executor.loader.project_state(
+        before
+        + [
+            node
+            for node in executor.loader.graph.leaf_nodes()
+            if node[0] != "ingredient"
+        ]
+    ).apps
+    try:
+        old_ingredient = apps.get_model("ingredient", "Ingredient")
+        old_recipe_ingredient = apps.get_model("recipe", "RecipeIngredient")
+        user = apps.get_model("user", "User").objects.create(
+            username="author", email="author@example.com"
+        )
+        recipe = apps.get_model("recipe", "Recipe").objects.create(
+            name="Рецепт", text="Описание", cooking_time=1, author_id=user.pk
+        )
+        other = apps.get_model("recipe", "Recipe").objects.create(
+            name="Другой", text="Описание", cooking_time=1, author_id=user.pk
+        )
+        keep, first, second = (
+            old_ingredient.objects.create(name="соль", measurement_unit="г")
+            for _ in range(3)
+        )
+        old_recipe_ingredient.objects.create(
+            recipe=recipe, ingredient=keep, amount=1
+        )
+        old_recipe_ingredient.objects.create(
+            recipe=recipe, ingredient=first, amount=2
+        )
+        old_recipe_ingredient.objects.create(
+            recipe=other, ingredient=second, amount=5
+        )
+    finally:
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    assert list(Ingredient.objects.values_list("pk", flat=True)) == [keep.pk]
+    assert sorted(
+        Ingredient.objects.get().recipe_ingredients.values_list(
+            "recipe_id", "amount"
+        )
+    ) == [(recipe.pk, 3), (other.pk, 5)]
@@ -0,0 +1,67 @@
+import pytest
+from django.core.cache import cache
+
+from core import metrics
+
+
+@pytest.fixture
+def histograms(monkeypatch):
+    histograms = metrics.Histograms()
+    monkeypatch.setattr(metrics, "_histograms", histograms)
+    return histograms
+
+
+def other_process(name, snapshot):
+    """Снимок другого процесса gunicorn в кэше"""
+    processes = cache.get(metrics.PROCESSES_KEY) or {}
+    processes[name] = metrics.time.time()
+    cache.set(metrics.PROCESSES_KEY, processes)
+    cache.set(metrics._process_key(name), snapshot)
+
+
+def query_count(text, process):
+    prefix = f'foodgram_db_queries_count{{process="{process}",endpoint="e"}} '
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return int(line.removeprefix(prefix))
+    return None
+
+
+def test_series_exported_per_process(histograms):
+    histograms.observe("foodgram_db_queries", ("e",), 3)
+    other = metrics.Histograms()
+    for _ in range(5):
+        other.observe("foodgram_db_queries", ("e",), 1)
+    other_process("other:1", other.snapshot())
+
+    text = metrics.render()
+
+    assert query_count(text, metrics._process) == 1
+    assert query_count(text, "other:1") == 5
+
+
+def test_expired_process_does_not_lower_other_series(histograms):
+    histograms.observe("foodgram_db_queries", ("e",), 3)
+    other = metrics.Histograms()
+    other.observe("foodgram_db_queries", ("e",), 1)
+    other_process("other:1", other.snapshot())
+    assert query_count(metrics.render(), "other:1") == 1
+
+    # Процесс перезапущен, его снимок истек
+    cache.delete(metrics._process_key("other:1"))
+    histograms.observe("foodgram_db_queries", ("e",), 2)
+    text = metrics.render()
+
+    assert query_count(text, "other:1") is None
+    assert query_count(text, metrics._process) == 2
+
+
+@pytest.mark.django_db
+def test_request_records_render_time(settings, histograms, anonymous_client):
+    settings.METRICS_ENABLED = True
+
+    response = anonymous_client.get("/api/ingredients/")
+
+    assert response.status_code == 200
+    series = histograms.snapshot()["foodgram_render_duration_seconds"]
+    assert series[("ingredients-list",)][-2] == 1
@@ -0,0 +1,71 @@
+import base64
+import json
+
+import pytest
+
+from core.models import Subscription
+from tests.conftest import make_user
+
+pytestmark = pytest.mark.django_db
+
+
+def cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.fixture
+def subscriptions(user):
+    for index in range(2, 5):
+        Subscription.objects.create(user=user, subscribed_to=make_user(index))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"pk": "x"},
+        ["2024-01-01T00:00:00+00:00", "x", 0],
+        ["2024-01-01T00:00:00+00:00", 2**64, 0],
+        ["2024-01-01T00:00:00", 1, 0],
+        ["2024-13-01T00:00:00+00:00", 1, 0],
+        ["not a date", 1, 0],
+        ["2024-01-01T00:00:00+00:00", 1, "yes"],
+    ],
+)
+@pytest.mark.parametrize(
+    "path", ["/api/recipes/", "/api/users/subscriptions/"]
+)
+def test_forged_cursor_is_not_found(user_client, subscriptions, path, value):
+    response = user_client.get(path, {"cursor": cursor(value)})
+
+    assert response.status_code == 404
+
+
+def test_malformed_cursor_is_not_found(user_client):
+    response = user_client.get("/api/recipes/", {"cursor": "%%%"})
+
+    assert response.status_code == 404
+
+
+def test_subscriptions_empty_page_stays_paginated(user_client, subscriptions):
+    # Курсор после последней подписки: пустая страница, а не все подписки
+    response = user_client.get(
+        "/api/users/subscriptions/",
+        {"cursor": cursor(["2000-01-01T00:00:00+00:00", 0, 0])},
+    )
+
+    assert response.status_code == 200
+    assert response.data["results"] == []
+    assert response.data["next"] is None
+
+
+def test_subscriptions_cursor_pages(user_client, subscriptions):
+    response = user_client.get(
+        "/api/users/subscriptions/", {"cursor": "", "limit": 2}
+    )
+    first = [item["id"] for item in response.data["results"]]
+    response = user_client.get(response.data["next"])
+    second = [item["id"] for item in response.data["results"]]
+
+    assert len(first) == 2
+    assert len(second) == 1
+    assert not set(first) & set(second)
@@ -0,0 +1,68 @@
+"""
+Число SQL-запросов списка и карточки рецепта не зависит от размера
+страницы: флаги пользователя аннотируются, связи загружаются заранее.
+Кэш общий, как в развертывании с Redis: валидаторы списка берутся из
+версий в кэше без запросов к БД.
+"""
+
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+LIST_QUERIES = {"anonymous": 4, "authenticated": 4}
+DETAIL_QUERIES = {"anonymous": 4, "authenticated": 4}
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(settings, shared_cache):
+    # Проверяется запрос к БД, а не ответ из кэша
+    settings.RESPONSE_CACHE_ENABLED = False
+
+
+@pytest.fixture(params=["anonymous", "authenticated"])
+def client_kind(request):
+    return request.param
+
+
+@pytest.fixture
+def client(client_kind, anonymous_client, user_client):
+    if client_kind == "anonymous":
+        return anonymous_client
+    return user_client
+
+
+@pytest.mark.parametrize("limit", [1, 5, 15])
+def test_recipe_list_query_count(
+    client, client_kind, recipes, limit, django_assert_num_queries
+):
+    with django_assert_num_queries(LIST_QUERIES[client_kind]):
+        response = client.get("/api/recipes/", {"limit": limit})
+
+    assert response.status_code == 200
+    assert len(response.data["results"]) == limit
+
+
+def test_recipe_detail_query_count(
+    client, client_kind, recipes, django_assert_num_queries
+):
+    with django_assert_num_queries(DETAIL_QUERIES[client_kind]):
+        response = client.get(f"/api/recipes/{recipes[0].pk}/")
+
+    assert response.status_code == 200
+    assert len(response.data["ingredients"]) == 5
+
+
+def test_recipe_flags_for_user(user_client, recipes):
+    response = user_client.get("/api/recipes/", {"limit": 15})
+
+    flags = {
+        item["id"]: (item["is_favorited"], item["is_in_shopping_cart"])
+        for item in response.data["results"]
+    }
+    favorited = {recipe.pk for recipe in recipes[::2]}
+    assert flags == {
+        recipe.pk: (recipe.pk in favorited,) * 2 for recipe in recipes
+    }
+    assert all(
+        item["author"]["is_subscribed"] for item in response.data["results"]
+    )
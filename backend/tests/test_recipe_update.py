@@ -0,0 +1,96 @@
+import base64
+
+import pytest
+from rest_framework.test import APIClient, APIRequestFactory
+
+from recipe.models import RecipeIngredient
+from recipe.views import RecipeViewSet
+from tests.conftest import PNG
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def recipe(make_recipe):
+    return make_recipe(0)
+
+
+@pytest.fixture
+def author_client(author):
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+def rows(recipe):
+    return {
+        item.ingredient_id: (item.id, item.amount)
+        for item in RecipeIngredient.objects.filter(recipe=recipe)
+    }
+
+
+def update(client, recipe, amounts, **fields):
+    data = {
+        "ingredients": [
+            {"id": ingredient_id, "amount": amount}
+            for ingredient_id, amount in amounts.items()
+        ],
+        **fields,
+    }
+    response = client.patch(f"/api/recipes/{recipe.pk}/", data, format="json")
+    assert response.status_code == 200, response.data
+    return response
+
+
+def test_update_keeps_unchanged_ingredient_rows(author_client, recipe):
+    before = rows(recipe)
+    first, second, *rest = before
+    amounts = {ingredient_id: 10 for ingredient_id in before}
+    amounts[first] = 25
+
+    update(author_client, recipe, amounts)
+
+    after = rows(recipe)
+    assert after[first] == (before[first][0], 25)
+    assert {key: after[key] for key in [second, *rest]} == {
+        key: before[key] for key in [second, *rest]
+    }
+
+
+def test_update_deletes_removed_and_adds_new_rows(
+    author_client, recipe, ingredients
+):
+    removed = ingredients[0].id
+    RecipeIngredient.objects.filter(
+        recipe=recipe, ingredient_id=ingredients[1].id
+    ).delete()
+    before = rows(recipe)
+    amounts = {key: 10 for key in before if key != removed}
+    amounts[ingredients[1].id] = 7
+
+    update(author_client, recipe, amounts)
+
+    after = rows(recipe)
+    assert removed not in after
+    assert after[ingredients[1].id][1] == 7
+    assert all(after[key] == before[key] for key in before if key != removed)
+
+
+def test_same_image_is_not_rewritten(author_client, recipe):
+    name = recipe.image.name
+    image = f"data:image/png;base64,{base64.b64encode(PNG).decode()}"
+    amounts = {key: amount for key, (_, amount) in rows(recipe).items()}
+
+    update(author_client, recipe, amounts, image=image, name="Новое")
+
+    recipe.refresh_from_db()
+    assert recipe.image.name == name
+    assert recipe.name == "Новое"
+
+
+def test_update_reads_recipe_under_lock(author):
+    request = APIRequestFactory().patch("/")
+    request.user = author
+    view = RecipeViewSet(action="partial_update", request=request)
+
+    assert view.get_queryset().query.select_for_update
@@ -0,0 +1,53 @@
+import pytest
+from django.core.cache import cache
+
+from core import response_cache
+from recipe.serializers import RecipeSerializer
+from user.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def response_cache_enabled(settings):
+    settings.RESPONSE_CACHE_ENABLED = True
+
+
+def bump_now(*names):
+    # Сброс из другого процесса сразу виден в кэше
+    cache.set_many(
+        {response_cache._version_key(name): "bumped" for name in names}
+    )
+
+
+def test_recipe_detail_served_from_cache(
+    anonymous_client, recipes, django_assert_num_queries
+):
+    url = f"/api/recipes/{recipes[0].pk}/"
+    assert anonymous_client.get(url)["X-Cache"] == "MISS"
+
+    with django_assert_num_queries(0):
+        response = anonymous_client.get(url)
+    assert response["X-Cache"] == "HIT"
+
+
+def test_author_change_during_request_not_cached(
+    monkeypatch, anonymous_client, author, recipes
+):
+    url = f"/api/recipes/{recipes[0].pk}/"
+    to_representation = RecipeSerializer.to_representation
+
+    def change_author(self, instance):
+        # Автор меняется, пока ответ собирается из прочитанных данных
+        User.objects.filter(pk=author.pk).update(first_name="Новое")
+        bump_now(response_cache.user_version(author.pk))
+        return to_representation(self, instance)
+
+    monkeypatch.setattr(RecipeSerializer, "to_representation", change_author)
+    response = anonymous_client.get(url)
+    assert response.data["author"]["first_name"] != "Новое"
+    monkeypatch.undo()
+
+    response = anonymous_client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert response.data["author"]["first_name"] == "Новое"
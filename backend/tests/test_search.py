@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+
+from recipe.models import Recipe
+from recipe.search import search_recipes
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/recipes/"
+
+
+@pytest.fixture
+def soups(make_recipe):
+    """Старый рецепт с запросом в названии, новый - только в описании"""
+    texts = [
+        ("Борщ", "Свекла и капуста"),
+        ("Щи", "Капуста, морковь"),
+        ("Суп дня", "Сегодня борщ"),
+    ]
+    recipes = []
+    for index, (name, text) in enumerate(texts):
+        recipe = make_recipe(index)
+        # UPDATE вместо save(): индекс поддерживается на стороне БД
+        Recipe.objects.filter(pk=recipe.pk).update(name=name, text=text)
+        recipes.append(recipe)
+    return recipes
+
+
+def names(response):
+    assert response.status_code == 200
+    return [recipe["name"] for recipe in response.data["results"]]
+
+
+def test_search_matches_name_and_text(anonymous_client, soups):
+    assert names(anonymous_client.get(URL, {"search": "борщ"})) == [
+        "Борщ",
+        "Суп дня",
+    ]
+
+
+def test_search_ranks_name_above_text(soups):
+    results = search_recipes(Recipe.objects.all(), "борщ")
+
+    assert [recipe.name for recipe in results] == ["Борщ", "Суп дня"]
+    assert results[0].search_rank > results[1].search_rank
+
+
+def test_search_without_matches(anonymous_client, soups):
+    assert names(anonymous_client.get(URL, {"search": "плов"})) == []
+    assert names(anonymous_client.get(URL, {"search": "!!!"})) == []
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="FTS5 matches word prefixes"
+)
+def test_sqlite_search_matches_prefixes(anonymous_client, soups):
+    assert names(anonymous_client.get(URL, {"search": "бор"})) == [
+        "Борщ",
+        "Суп дня",
+    ]
+
+
+def test_fts_index_follows_updates(anonymous_client, soups):
+    Recipe.objects.filter(pk=soups[1].pk).update(name="Борщ зеленый")
+    soups[0].delete()
+
+    assert names(anonymous_client.get(URL, {"search": "борщ"})) == [
+        "Борщ зеленый",
+        "Суп дня",
+    ]
+
+
+def test_search_keeps_relevance_with_cursor(anonymous_client, soups):
+    # Курсор задает порядок по дате: с поиском страницы нумеруются
+    response = anonymous_client.get(
+        URL, {"search": "борщ", "cursor": "", "limit": 1}
+    )
+
+    assert names(response) == ["Борщ"]
+    assert response.data["count"] == 2
+    assert "page=2" in response.data["next"]
+
+
+def test_cursor_used_without_search(anonymous_client, soups):
+    response = anonymous_client.get(URL, {"cursor": "", "limit": 1})
+
+    assert names(response) == ["Суп дня"]
+    assert "cursor=" in response.data["next"]
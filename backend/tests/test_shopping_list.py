@@ -0,0 +1,79 @@
+import pytest
+from django.db import transaction
+
+from core.models import ShoppingCart
+from recipe import shopping_list
+from recipe.models import RecipeIngredient
+from recipe.shopping_list import get_cart_version
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/recipes/download_shopping_cart/"
+
+
+def download(client, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(URL, {"file_format": "json"}, headers=headers)
+
+
+def test_cart_version_follows_database_with_process_cache(
+    user_client, user, recipes
+):
+    etag = download(user_client)["ETag"]
+    assert download(user_client, etag).status_code == 304
+
+    # Версия не хранится в кэше процесса: изменение видно без сброса
+    ShoppingCart.objects.filter(user=user).first().delete()
+    response = download(user_client, etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_cart_version_bumped_after_commit(
+    shared_cache, user, recipes, django_capture_on_commit_callbacks
+):
+    version = get_cart_version(user.id)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        ShoppingCart.objects.filter(user=user).first().delete()
+        assert get_cart_version(user.id) == version
+
+    assert callbacks
+    assert get_cart_version(user.id) != version
+
+
+def test_cached_file_served_until_cart_changes(
+    shared_cache, user_client, user, recipes, django_assert_num_queries
+):
+    b"".join(download(user_client).streaming_content)
+    with django_assert_num_queries(0):
+        response = download(user_client)
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+
+
+def test_recipe_ingredient_rows_bump_carts_once(
+    shared_cache,
+    user,
+    recipes,
+    django_capture_on_commit_callbacks,
+    django_assert_num_queries,
+):
+    recipe = ShoppingCart.objects.filter(user=user).first().recipe
+    version = get_cart_version(user.id)
+
+    # Удаление отправляет сигнал для каждой строки
+    with (
+        django_capture_on_commit_callbacks() as callbacks,
+        transaction.atomic(),
+    ):
+        RecipeIngredient.objects.filter(recipe=recipe).delete()
+    bumps = [
+        callback
+        for callback in callbacks
+        if getattr(callback, "func", None) is shopping_list._bump_recipe_carts
+    ]
+    assert len(bumps) == 1
+
+    with django_assert_num_queries(1):
+        bumps[0]()
+    assert get_cart_version(user.id) != version
@@ -0,0 +1,57 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from core import lru, short_links
+from core.constants import SHORT_LINK_SUFFIX_LENGTH
+from core.models import ShortLink
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def taken(recipes):
+    """Код из id первого рецепта занят ссылкой второго"""
+    recipe, other = recipes[:2]
+    ShortLink.objects.create(
+        recipe=other, short_code=short_links.encode(recipe.id)
+    )
+    return recipe
+
+
+def test_taken_code_gets_suffix(anonymous_client, taken):
+    response = anonymous_client.get(f"/api/recipes/{taken.id}/get-link/")
+
+    assert response.status_code == 200
+    code = response.data["short-link"].rsplit("/", 1)[1]
+    prefix = short_links.encode(taken.id)
+    assert code.startswith(prefix)
+    assert len(code) == len(prefix) + SHORT_LINK_SUFFIX_LENGTH
+    assert short_links.resolve(code) == taken.id
+
+
+def test_generate_short_links_reports_suffixed_codes(taken, recipes):
+    out = StringIO()
+    call_command("generate_short_links", stdout=out)
+
+    assert ShortLink.objects.count() == len(recipes)
+    assert f"created: {len(recipes) - 1}, with suffix: 1" in out.getvalue()
+
+
+def test_resolved_codes_expire_from_process_lru(monkeypatch, recipes):
+    recipe, other = recipes[:2]
+    code = short_links.get_short_code(recipe.id)
+    assert short_links.resolve(code) == recipe.id
+
+    # Ссылка изменена в другом процессе: сброс сюда не дошел
+    ShortLink.objects.filter(short_code=code).update(recipe=other)
+    cache.clear()
+    assert short_links.resolve(code) == recipe.id
+
+    now = lru.time.monotonic()
+    monkeypatch.setattr(
+        lru.time, "monotonic", lambda: now + short_links._resolved.ttl + 1
+    )
+    assert short_links.resolve(code) == other.id
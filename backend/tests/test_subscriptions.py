@@ -0,0 +1,85 @@
+import pytest
+
+from core.models import Subscription
+from recipe.models import Recipe
+from tests.conftest import make_user
+
+pytestmark = pytest.mark.django_db
+
+URL = "/api/users/subscriptions/"
+
+
+@pytest.fixture
+def authors(user, make_recipe):
+    """Подписки на авторов с 5 и 2 рецептами"""
+    authors = [make_user(2), make_user(3)]
+    for author, count in zip(authors, (5, 2)):
+        for index in range(count):
+            make_recipe(f"{author.pk}-{index}", author)
+        Subscription.objects.create(user=user, subscribed_to=author)
+    return authors
+
+
+def recipe_ids(user_client, **params):
+    response = user_client.get(URL, params)
+    assert response.status_code == 200
+    return {
+        row["id"]: [recipe["id"] for recipe in row["recipes"]]
+        for row in response.data["results"]
+    }
+
+
+def newest(author, limit=None):
+    return list(
+        Recipe.objects.filter(author=author)
+        .order_by("-created_at", "-id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+
+def test_recipes_limit_per_author(user_client, authors):
+    first, second = authors
+
+    assert recipe_ids(user_client, recipes_limit=3) == {
+        first.pk: newest(first, 3),
+        second.pk: newest(second),
+    }
+
+
+def test_recipes_limit_with_equal_created_at(user_client, authors):
+    first = authors[0]
+    created_at = Recipe.objects.filter(author=first).first().created_at
+    Recipe.objects.filter(author=first).update(created_at=created_at)
+
+    ids = recipe_ids(user_client, recipes_limit=2)[first.pk]
+    # При равном времени порядок определяет id, как в ROW_NUMBER()
+    assert (
+        ids
+        == sorted(
+            Recipe.objects.filter(author=first).values_list("id", flat=True),
+            reverse=True,
+        )[:2]
+    )
+
+
+@pytest.mark.parametrize("limit", ["0", "-1", "abc", ""])
+def test_invalid_recipes_limit_ignored(user_client, authors, limit):
+    first, second = authors
+
+    assert recipe_ids(user_client, recipes_limit=limit) == {
+        first.pk: newest(first),
+        second.pk: newest(second),
+    }
+
+
+def test_recipes_limit_query_count(
+    user_client, authors, django_assert_max_num_queries
+):
+    # Лимит применяется в одном запросе для всех авторов
+    with django_assert_max_num_queries(3):
+        response = user_client.get(URL, {"recipes_limit": 1})
+    assert response.status_code == 200
+    assert [row["recipes_count"] for row in response.data["results"]] == [
+        2,
+        5,
+    ]
@@ -0,0 +1,36 @@
+from django.db.models import Exists, OuterRef
+
+from core.async_api import (
+    authenticate,
+    error_response,
+    json_response,
+    view_response,
+)
+from core.models import Subscription
+
+from .models import User
+from .serializers import CustomUserSerializer
+from .views import CustomUserViewSet
+
+
+async def _detail(request, id):
+    queryset = User.objects.annotate(
+        is_subscribed=Exists(
+            Subscription.objects.filter(
+                user_id=request.user.id, subscribed_to=OuterRef("pk")
+            )
+        )
+    )
+    try:
+        user = await queryset.aget(pk=id)
+    except User.DoesNotExist:
+        return error_response("No User matches the given query.", 404)
+    serializer = CustomUserSerializer(user, context={"request": request})
+    return json_response(serializer.data)
+
+
+async def user_detail(request, id):
+    request.user = await authenticate(request)
+    return await view_response(
+        CustomUserViewSet, "retrieve", _detail, request, id=id
+    )
@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model("user", "User")
+    counters = {
+        "recipes_count": (apps.get_model("recipe", "Recipe"), "author"),
+        "subscribers_count": (
+            apps.get_model("core", "Subscription"),
+            "subscribed_to",
+        ),
+    }
+    User.objects.update(
+        **{
+            field: Coalesce(
+                Subquery(
+                    related.objects.filter(**{foreign_key: OuterRef("pk")})
+                    .order_by()
+                    .values(foreign_key)
+                    .annotate(total=Count("pk"))
+                    .values("total")
+                ),
+                Value(0),
+            )
+            for field, (related, foreign_key) in counters.items()
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("recipe", "0001_initial"),
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="recipes_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="subscribers_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0002_user_recipes_count_user_subscribers_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -7,37 +7,40 @@ from .constants import NAME_MAX_LENGTH
 class User(AbstractUser):
     email = models.EmailField(unique=True)
     avatar = models.ImageField(upload_to="users/", blank=True, null=True)
+    # Готовые производные аватара, см. core.images
+    avatar_variants = models.JSONField(default=dict, editable=False)
     first_name = models.CharField(max_length=NAME_MAX_LENGTH)
     last_name = models.CharField(max_length=NAME_MAX_LENGTH)
+    # Счетчики поддерживаются сигналами core.signals, см. команду recount
+    recipes_count = models.PositiveIntegerField(default=0, editable=False)
+    subscribers_count = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "first_name", "last_name"]
-
-    def __str__(self):
-        return self.username
-
-
-class Subscription(models.Model):
-    user = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="subscriptions"
-    )
-    subscribed_to = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="subscribers"
+    # Изменяются только через UPDATE (core.counters, core.images)
+    UPDATE_ONLY_FIELDS = (
+        "avatar_variants",
+        "recipes_count",
+        "subscribers_count",
     )
-    created_at = models.DateTimeField(auto_now_add=True)
 
-    class Meta:
-        verbose_name = "Subscription"
-        verbose_name_plural = "Subscriptions"
-        constraints = [
-            models.UniqueConstraint(
-                fields=["user", "subscribed_to"], name="unique_subscription"
-            )
-        ]
-        ordering = ["-created_at"]
+    def save(self, *args, **kwargs):
+        # Полное сохранение не перезаписывает поля UPDATE_ONLY_FIELDS:
+        # экземпляр мог быть загружен до их изменения (пользователь
+        # токена из кэша core.authentication)
+        if (
+            not self._state.adding
+            and self.pk is not None
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.UPDATE_ONLY_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
-        return (
-            f"{self.user.username} subscribed to"
-            f" {self.subscribed_to.username}"
-        )
+        return self.username
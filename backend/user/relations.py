@@ -0,0 +1,43 @@
+from core.models import Subscription
+
+
+class SubscriptionContext:
+    """
+    Подписки пользователя запроса на авторов, загруженные пакетом.
+
+    Хранится на объекте запроса: списочные сериализаторы один раз
+    загружают подписки для всех авторов страницы, после чего
+    ``is_subscribed`` отвечает без обращения к базе данных.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.checked = set()
+        self.subscribed = set()
+
+    @classmethod
+    def for_request(cls, request):
+        context = getattr(request, "_subscription_context", None)
+        if context is None or context.user != request.user:
+            context = cls(request.user)
+            request._subscription_context = context
+        return context
+
+    def load(self, author_ids):
+        if self.user.is_anonymous:
+            return
+        missing = set(author_ids) - self.checked
+        if not missing:
+            return
+        self.subscribed.update(
+            Subscription.objects.filter(
+                user=self.user, subscribed_to_id__in=missing
+            ).values_list("subscribed_to_id", flat=True)
+        )
+        self.checked.update(missing)
+
+    def is_subscribed(self, author_id):
+        if self.user.is_anonymous:
+            return False
+        self.load([author_id])
+        return author_id in self.subscribed
@@ -1,10 +1,13 @@
+from django.db import models
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
-from core.models import Subscription
+from core.fields import ImageVariantsField
 from recipe.models import Recipe
+
 from .models import User
+from .relations import SubscriptionContext
 
 
 class CustomUserCreateSerializer(UserCreateSerializer):
@@ -21,9 +24,31 @@ class CustomUserCreateSerializer(UserCreateSerializer):
         extra_kwargs = {"password": {"write_only": True}}
 
 
+class SubscriptionsListSerializer(serializers.ListSerializer):
+    """Загружает подписки на всех авторов страницы одним запросом"""
+
+    author_id_attr = "id"
+    # Аннотация queryset, при наличии которой загрузка не нужна
+    annotation = "is_subscribed"
+
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        items = list(data)
+        request = self.context.get("request")
+        if request:
+            SubscriptionContext.for_request(request).load(
+                getattr(item, self.author_id_attr)
+                for item in items
+                if not hasattr(item, self.annotation)
+            )
+        return super().to_representation(items)
+
+
 class CustomUserSerializer(UserSerializer):
     is_subscribed = serializers.SerializerMethodField()
     avatar = Base64ImageField(read_only=True, required=False)
+    avatar_variants = ImageVariantsField("avatar")
 
     class Meta:
         model = User
@@ -35,28 +60,41 @@ class CustomUserSerializer(UserSerializer):
             "last_name",
             "is_subscribed",
             "avatar",
+            "avatar_variants",
         )
+        list_serializer_class = SubscriptionsListSerializer
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
         request = self.context.get("request")
-        if not request or request.user.is_anonymous:
+        if not request:
             return False
-        return Subscription.objects.filter(
-            user=request.user, subscribed_to=obj
-        ).exists()
+        return SubscriptionContext.for_request(request).is_subscribed(obj.id)
 
 
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
     image = Base64ImageField(read_only=True, required=False)
+    image_variants = ImageVariantsField("image")
 
     class Meta:
         model = Recipe
-        fields = ("id", "name", "image", "cooking_time")
+        fields = ("id", "name", "image", "image_variants", "cooking_time")
+
+
+def get_recipes_limit(request):
+    """Положительное значение ?recipes_limit= или None"""
+    try:
+        recipes_limit = int(request.query_params.get("recipes_limit"))
+    except (AttributeError, ValueError, TypeError):
+        # Если не удалось преобразовать в число, игнорируем лимит
+        return None
+    return recipes_limit if recipes_limit > 0 else None
 
 
 class UserWithRecipesSerializer(CustomUserSerializer):
     recipes = serializers.SerializerMethodField(source="recipes")
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField()
 
     class Meta(CustomUserSerializer.Meta):
         fields = CustomUserSerializer.Meta.fields + (
@@ -65,26 +103,20 @@ class UserWithRecipesSerializer(CustomUserSerializer):
         )
 
     def get_recipes(self, obj):
-        request = self.context.get("request")
-        recipes_limit = request.query_params.get("recipes_limit")
-        recipes = obj.recipes.all()
-
-        if recipes_limit:
-            try:
-                recipes_limit = int(recipes_limit)
-                if recipes_limit > 0:
-                    recipes = recipes[:recipes_limit]
-            except (ValueError, TypeError):
-                # Если не удалось преобразовать в число, игнорируем лимит
-                pass
+        # Рецепты, выбранные с лимитом в запросе подписок (окно по автору)
+        if hasattr(obj, "latest_recipes"):
+            recipes = obj.latest_recipes
+        else:
+            request = self.context.get("request")
+            recipes = obj.recipes.all()
+            recipes_limit = get_recipes_limit(request)
+            if recipes_limit:
+                recipes = recipes[:recipes_limit]
 
         return RecipeMinifiedSerializer(
             recipes, many=True, context=self.context
         ).data
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
-
 
 class SetAvatarSerializer(serializers.ModelSerializer):
     avatar = Base64ImageField(required=True)
@@ -100,6 +132,13 @@ class SetAvatarSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def update(self, instance, validated_data):
+        # request.user может быть взят из кэша токенов: сохраняется только
+        # аватар, чтобы не перезаписать счетчики устаревшими значениями
+        instance.avatar = validated_data["avatar"]
+        instance.save(update_fields=["avatar"])
+        return instance
+
 
 class SetPasswordSerializer(serializers.Serializer):
     current_password = serializers.CharField()
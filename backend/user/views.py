@@ -1,3 +1,6 @@
+from functools import partial
+
+from django.db.models import Exists, F, OuterRef, Prefetch, Value
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
 from rest_framework import permissions, status
@@ -6,19 +9,27 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import User
+from backend.pagination import SubscriptionPagination
+from core.conditional import USER_FIELDS, ConditionalGetMixin, make_etag
 from core.models import Subscription
+from core.response_cache import AnonymousResponseCacheMixin, user_version
+from recipe.models import Recipe
+
+from .models import User
 from .serializers import (
-    UserSerializer,
+    CustomUserSerializer,
     SetAvatarSerializer,
     SetPasswordSerializer,
     UserWithRecipesSerializer,
+    get_recipes_limit,
 )
 
 
-class CustomUserViewSet(UserViewSet):
+class CustomUserViewSet(
+    ConditionalGetMixin, AnonymousResponseCacheMixin, UserViewSet
+):
     queryset = User.objects.all()
-    serializer_class = UserSerializer
+    serializer_class = CustomUserSerializer
 
     def get_permissions(self):
         if self.action in [
@@ -27,12 +38,53 @@ class CustomUserViewSet(UserViewSet):
             return [AllowAny()]
         return super().get_permissions()
 
+    def get_cache_versions(self, request):
+        if not self.kwargs[self.lookup_field].isdigit():
+            return None
+        return [user_version(int(self.kwargs[self.lookup_field]))]
+
+    def get_validators(self, request):
+        user = request.user
+        if self.action == "me":
+            fields = [getattr(user, field) for field in USER_FIELDS]
+            return make_etag(user.id, user.id, *fields, False), None
+
+        pk = self.kwargs[self.lookup_field]
+        if not pk.isdigit():
+            return None
+        row = (
+            User.objects.filter(pk=pk)
+            .annotate(
+                subscribed=Exists(
+                    Subscription.objects.filter(
+                        user_id=user.id, subscribed_to=OuterRef("pk")
+                    )
+                )
+            )
+            .values_list(*USER_FIELDS, "subscribed")
+            .first()
+        )
+        if row is None:
+            return None
+        return make_etag(user.id, pk, *row), None
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            partial(self.cached_response, super().retrieve),
+            request,
+            *args,
+            **kwargs,
+        )
+
     @action(
         detail=False,
         methods=["get"],
         permission_classes=[permissions.IsAuthenticated],
     )
     def me(self, request):
+        return self.conditional_response(self._me, request)
+
+    def _me(self, request):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
 
@@ -48,7 +100,7 @@ class CustomUserViewSet(UserViewSet):
         if serializer.is_valid():
             user = request.user
             user.set_password(serializer.validated_data["new_password"])
-            user.save()
+            user.save(update_fields=["password"])
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -61,7 +113,7 @@ class CustomUserViewSet(UserViewSet):
         if request.method == "DELETE":
             user = request.user
             user.avatar = None
-            user.save()
+            user.save(update_fields=["avatar"])
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         if "avatar" not in request.data or not request.data["avatar"]:
@@ -85,12 +137,29 @@ class CustomUserViewSet(UserViewSet):
         detail=False,
         methods=["get"],
         permission_classes=[permissions.IsAuthenticated],
+        pagination_class=SubscriptionPagination,
     )
     def subscriptions(self, request):
-        subscribed_users = User.objects.filter(subscribers__user=request.user)
+        subscribed_users = (
+            User.objects.filter(subscribers__user=request.user)
+            .annotate(
+                subscribed_at=F("subscribers__created_at"),
+                is_subscribed=Value(True),
+            )
+            .prefetch_related(
+                Prefetch(
+                    "recipes",
+                    queryset=Recipe.objects.latest_per_author(
+                        get_recipes_limit(request)
+                    ),
+                    to_attr="latest_recipes",
+                )
+            )
+            .order_by("-subscribed_at", "id")
+        )
         page = self.paginate_queryset(subscribed_users)
 
-        if page:
+        if page is not None:
             serializer = UserWithRecipesSerializer(
                 page, many=True, context={"request": request}
             )
@@ -169,5 +238,5 @@ class UserAvatarView(APIView):
     def delete(self, request):
         user = request.user
         user.avatar = None
-        user.save()
+        user.save(update_fields=["avatar"])
         return Response(status=status.HTTP_204_NO_CONTENT)